@@ -13,11 +13,23 @@ CREATE TABLE IF NOT EXISTS public.schema_migrations (
 \i /docker-entrypoint-initdb.d/../migrations/001_initial_product_service.sql
 \i /docker-entrypoint-initdb.d/../migrations/002_initial_recipe_service.sql
 \i /docker-entrypoint-initdb.d/../migrations/003_initial_calculator_service.sql
+\i /docker-entrypoint-initdb.d/../migrations/005_recipes_covering_index.sql
+\i /docker-entrypoint-initdb.d/../migrations/006_recipes_name_id_index.sql
+\i /docker-entrypoint-initdb.d/../migrations/007_recipe_product_catalog_view.sql
+\i /docker-entrypoint-initdb.d/../migrations/008_recipe_ingredients_product_recipe_index.sql
+\i /docker-entrypoint-initdb.d/../migrations/009_recipe_version_patches.sql
+\i /docker-entrypoint-initdb.d/../migrations/010_recipe_hierarchy_max_depth.sql
 
 -- Record migrations as applied
 INSERT INTO public.schema_migrations (version) VALUES ('001_initial_product_service') ON CONFLICT DO NOTHING;
 INSERT INTO public.schema_migrations (version) VALUES ('002_initial_recipe_service') ON CONFLICT DO NOTHING;
 INSERT INTO public.schema_migrations (version) VALUES ('003_initial_calculator_service') ON CONFLICT DO NOTHING;
+INSERT INTO public.schema_migrations (version) VALUES ('005_recipes_covering_index') ON CONFLICT DO NOTHING;
+INSERT INTO public.schema_migrations (version) VALUES ('006_recipes_name_id_index') ON CONFLICT DO NOTHING;
+INSERT INTO public.schema_migrations (version) VALUES ('007_recipe_product_catalog_view') ON CONFLICT DO NOTHING;
+INSERT INTO public.schema_migrations (version) VALUES ('008_recipe_ingredients_product_recipe_index') ON CONFLICT DO NOTHING;
+INSERT INTO public.schema_migrations (version) VALUES ('009_recipe_version_patches') ON CONFLICT DO NOTHING;
+INSERT INTO public.schema_migrations (version) VALUES ('010_recipe_hierarchy_max_depth') ON CONFLICT DO NOTHING;
 
 -- Display applied migrations
 SELECT version, applied_at FROM public.schema_migrations ORDER BY applied_at;
\ No newline at end of file
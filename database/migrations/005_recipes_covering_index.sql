@@ -0,0 +1,14 @@
+-- Migration: 005_recipes_covering_index.sql
+-- Description: Covering index for listing a product's recipe versions
+-- Created: 2026-10-15
+-- Author: System
+
+-- Set search path for this session
+SET search_path TO recipe_service, public;
+
+-- Lets product/version list queries run as index-only scans
+CREATE INDEX IF NOT EXISTS idx_recipes_product_version_covering
+ON recipes(product_id, version) INCLUDE (name, status, created_at);
+
+-- Insert migration tracking
+INSERT INTO public.schema_migrations (version) VALUES ('005_recipes_covering_index') ON CONFLICT DO NOTHING;
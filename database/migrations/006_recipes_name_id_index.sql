@@ -0,0 +1,14 @@
+-- Migration: 006_recipes_name_id_index.sql
+-- Description: Index backing keyset pagination of the recipe list
+-- Created: 2026-10-15
+-- Author: System
+
+-- Set search path for this session
+SET search_path TO recipe_service, public;
+
+-- Recipe lists are ordered by (name, id); cursor pages seek past the last key
+CREATE INDEX IF NOT EXISTS idx_recipes_name_id
+ON recipes(name, id);
+
+-- Insert migration tracking
+INSERT INTO public.schema_migrations (version) VALUES ('006_recipes_name_id_index') ON CONFLICT DO NOTHING;
@@ -0,0 +1,25 @@
+-- Migration: 007_recipe_product_catalog_view.sql
+-- Description: Read-only product catalog view for recipe hierarchy enrichment
+-- Created: 2026-10-15
+-- Author: System
+
+-- Set search path for this session
+SET search_path TO recipe_service, public;
+
+-- Both services share one database, so the recipe service can read product
+-- details directly instead of calling the Product Service per hierarchy request.
+-- A plain view (no copy) always reflects the current catalog.
+CREATE OR REPLACE VIEW product_catalog AS
+SELECT
+    p.id,
+    p.name,
+    p.type::TEXT AS type,
+    p.unit::TEXT AS unit,
+    p.description
+FROM product_service.products p;
+
+-- Grant permissions
+GRANT SELECT ON product_catalog TO recipe_user;
+
+-- Insert migration tracking
+INSERT INTO public.schema_migrations (version) VALUES ('007_recipe_product_catalog_view') ON CONFLICT DO NOTHING;
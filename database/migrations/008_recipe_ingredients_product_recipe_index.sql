@@ -0,0 +1,17 @@
+-- Migration: 008_recipe_ingredients_product_recipe_index.sql
+-- Description: Composite index for finding the recipes that use a product
+-- Created: 2026-10-15
+-- Author: System
+
+-- Set search path for this session
+SET search_path TO recipe_service, public;
+
+-- Product lookups get recipe_id from the index itself; built without blocking writes
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_recipe_ingredients_product_recipe
+ON recipe_ingredients(ingredient_product_id, recipe_id);
+
+-- The single-column index is a prefix of the new one
+DROP INDEX CONCURRENTLY IF EXISTS idx_recipe_ingredients_ingredient_product_id;
+
+-- Insert migration tracking
+INSERT INTO public.schema_migrations (version) VALUES ('008_recipe_ingredients_product_recipe_index') ON CONFLICT DO NOTHING;
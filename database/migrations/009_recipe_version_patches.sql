@@ -0,0 +1,29 @@
+-- Migration: 009_recipe_version_patches.sql
+-- Description: Store recipe versions between checkpoints as patches
+-- Created: 2026-10-15
+-- Author: System
+
+-- Set search path for this session
+SET search_path TO recipe_service, public;
+
+-- Checkpoint versions keep the full snapshot in recipe_data, the others a
+-- JSON Patch against the previous version in patch
+ALTER TABLE recipe_versions ADD COLUMN IF NOT EXISTS patch JSONB;
+ALTER TABLE recipe_versions ALTER COLUMN recipe_data DROP NOT NULL;
+
+-- ADD CONSTRAINT has no IF NOT EXISTS; guard it so the migration can be re-run
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_constraint
+        WHERE conname = 'recipe_versions_snapshot_or_patch'
+          AND conrelid = 'recipe_service.recipe_versions'::regclass
+    ) THEN
+        ALTER TABLE recipe_versions ADD CONSTRAINT recipe_versions_snapshot_or_patch
+            CHECK (recipe_data IS NOT NULL OR patch IS NOT NULL);
+    END IF;
+END
+$$;
+
+-- Insert migration tracking
+INSERT INTO public.schema_migrations (version) VALUES ('009_recipe_version_patches') ON CONFLICT DO NOTHING;
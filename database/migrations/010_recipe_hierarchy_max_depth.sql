@@ -0,0 +1,78 @@
+-- Migration: 010_recipe_hierarchy_max_depth.sql
+-- Description: Bound calculate_recipe_hierarchy by the caller's max depth
+-- Created: 2026-10-15
+-- Author: System
+
+-- Set search path for this session
+SET search_path TO recipe_service, public;
+
+DROP FUNCTION IF EXISTS calculate_recipe_hierarchy(UUID);
+
+-- Recursion stops one level past max_depth. Rows at max_depth + 1 only exist
+-- when the limit is exceeded and are returned first, so the caller can stop
+-- reading at the first row instead of fetching the whole hierarchy.
+CREATE OR REPLACE FUNCTION calculate_recipe_hierarchy(recipe_uuid UUID, max_depth INTEGER DEFAULT 10)
+RETURNS TABLE (
+    ingredient_product_id UUID,
+    ingredient_name TEXT,
+    quantity DECIMAL(10,3),
+    unit ingredient_unit,
+    depth_level INTEGER,
+    path TEXT[]
+) AS $$
+BEGIN
+    RETURN QUERY
+    WITH RECURSIVE recipe_hierarchy AS (
+        -- Base case: direct ingredients
+        SELECT 
+            ri.ingredient_product_id,
+            COALESCE(
+                'Product_' || ri.ingredient_product_id::TEXT,
+                ri.ingredient_product_id::TEXT
+            ) as ingredient_name,
+            ri.quantity,
+            ri.unit,
+            1 as depth_level,
+            ARRAY[ri.ingredient_product_id::TEXT] as path
+        FROM recipe_ingredients ri
+        WHERE ri.recipe_id = recipe_uuid
+        
+        UNION ALL
+        
+        -- Recursive case: ingredients of sub-recipes
+        SELECT 
+            ri.ingredient_product_id,
+            COALESCE(
+                'Product_' || ri.ingredient_product_id::TEXT,
+                ri.ingredient_product_id::TEXT
+            ),
+            -- Scale quantities based on parent requirement
+            ROUND(ri.quantity * rh.quantity, 3)::DECIMAL(10,3) as quantity,
+            ri.unit,
+            rh.depth_level + 1,
+            rh.path || ri.ingredient_product_id::TEXT
+        FROM recipe_hierarchy rh
+        JOIN recipes r ON r.product_id = rh.ingredient_product_id
+            AND r.id != recipe_uuid -- Prevent cycles
+        JOIN recipe_ingredients ri ON ri.recipe_id = r.id
+        WHERE rh.depth_level <= max_depth -- Go one level past the limit to detect it
+        AND NOT (ri.ingredient_product_id::TEXT = ANY(rh.path)) -- Prevent cycles
+        AND r.status = 'active' -- Only include active recipes
+    )
+    SELECT 
+        rh.ingredient_product_id,
+        rh.ingredient_name,
+        rh.quantity,
+        rh.unit,
+        rh.depth_level,
+        rh.path
+    FROM recipe_hierarchy rh
+    ORDER BY rh.depth_level > max_depth DESC, rh.depth_level, rh.ingredient_name;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Grant permissions
+GRANT EXECUTE ON FUNCTION calculate_recipe_hierarchy(UUID, INTEGER) TO recipe_user;
+
+-- Insert migration tracking
+INSERT INTO public.schema_migrations (version) VALUES ('010_recipe_hierarchy_max_depth') ON CONFLICT DO NOTHING;
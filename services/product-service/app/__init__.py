@@ -1,5 +1,6 @@
 """Product Service Flask Application Factory."""
 import logging
+import click
 import structlog
 from flask import Flask, jsonify
 from flask_cors import CORS
@@ -7,8 +8,9 @@ from flask_migrate import Migrate
 from flask_smorest import Api
 
 from .config import get_config
-from .extensions import db, cache
+from .extensions import db, cache, init_redis_pool
 from .resources import products, health, search
+from .services.search_service import ProductSearchService
 from .utils.exceptions import register_error_handlers
 from .docs.api_info import API_INFO
 
@@ -47,6 +49,9 @@ def create_app(config_name: str = None) -> Flask:
     # Add request logging
     add_request_logging(app)
     
+    # Register CLI commands
+    register_commands(app)
+    
     return app
 
 
@@ -65,6 +70,9 @@ def initialize_extensions(app: Flask) -> None:
     # Cache
     cache.init_app(app, config={'CACHE_TYPE': 'redis', 'CACHE_REDIS_URL': app.config['REDIS_URL']})
     
+    # Shared Redis pool for direct structure access (e.g. suggestion index)
+    init_redis_pool(app.config['REDIS_URL'])
+    
     # CORS
     CORS(app, origins=app.config['CORS_ORIGINS'])
     
@@ -111,6 +119,19 @@ def register_blueprints(app: Flask) -> None:
             }), 503
 
 
+def register_commands(app: Flask) -> None:
+    """Register Flask CLI commands.
+    
+    Args:
+        app: Flask application instance
+    """
+    @app.cli.command('rebuild-suggestion-index')
+    def rebuild_suggestion_index():
+        """Rebuild the Redis index behind search suggestions."""
+        count = ProductSearchService().rebuild_suggestion_index()
+        click.echo(f"Indexed {count} product names")
+
+
 def configure_logging(app: Flask) -> None:
     """Configure structured logging.
     
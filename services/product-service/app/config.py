@@ -1,6 +1,9 @@
 """Configuration settings for the Product Service."""
 import os
-from typing import Type
+from types import MappingProxyType
+from typing import Mapping, Type
+
+from .utils.serialization import json_dumps, json_loads
 
 
 class Config:
@@ -27,7 +30,10 @@ class Config:
         'pool_pre_ping': True,
         'connect_args': {
             'options': '-csearch_path=product_service,public'
-        }
+        },
+        # orjson for JSONB columns (e.g. search cache results)
+        'json_serializer': json_dumps,
+        'json_deserializer': json_loads,
     }
     
     # Redis Cache
@@ -47,7 +53,7 @@ class Config:
     OPENAPI_REDOC_URL = 'https://cdn.jsdelivr.net/npm/redoc@next/bundles/redoc.standalone.js'
     
     # CORS
-    CORS_ORIGINS = os.environ.get('CORS_ORIGINS', 'http://localhost:3000').split(',')
+    CORS_ORIGINS = tuple(os.environ.get('CORS_ORIGINS', 'http://localhost:3000').split(','))
     
     # Pagination
     DEFAULT_PAGE_SIZE = 20
@@ -56,6 +62,7 @@ class Config:
     # Search Cache
     SEARCH_CACHE_TTL = 300  # 5 minutes
     SEARCH_CACHE_MAX_ENTRIES = 1000
+    SEARCH_CACHE_ASYNC_WRITES = True  # Persist cache entries on a background writer
     
     # Logging
     LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
@@ -83,6 +90,9 @@ class TestingConfig(Config):
     
     # Disable cache for testing
     CACHE_TYPE = 'null'
+    
+    # Write search cache entries inline so tests see them immediately
+    SEARCH_CACHE_ASYNC_WRITES = False
 
 
 class ProductionConfig(Config):
@@ -103,14 +113,13 @@ class ProductionConfig(Config):
     }
 
 
+_CONFIG_MAP: Mapping[str, Type[Config]] = MappingProxyType({
+    'development': DevelopmentConfig,
+    'testing': TestingConfig,
+    'production': ProductionConfig
+})
+
+
 def get_config() -> Type[Config]:
     """Get configuration based on environment."""
-    env = os.environ.get('FLASK_ENV', 'development').lower()
-    
-    config_map = {
-        'development': DevelopmentConfig,
-        'testing': TestingConfig,
-        'production': ProductionConfig
-    }
-    
-    return config_map.get(env, DevelopmentConfig)
\ No newline at end of file
+    return _CONFIG_MAP.get(os.environ.get('FLASK_ENV', 'development').lower(), DevelopmentConfig)
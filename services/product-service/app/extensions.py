@@ -2,8 +2,33 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_caching import Cache
 from flask_migrate import Migrate
+import redis
 
 # Initialize extensions
 db = SQLAlchemy()
 cache = Cache()
-migrate = Migrate()
\ No newline at end of file
+migrate = Migrate()
+
+# Redis connection pool for shared use
+redis_pool = None
+
+
+def init_redis_pool(redis_url: str):
+    """Initialize Redis connection pool.
+    
+    Args:
+        redis_url: Redis connection URL
+    """
+    global redis_pool
+    redis_pool = redis.ConnectionPool.from_url(redis_url)
+
+
+def get_redis_connection():
+    """Get Redis connection from pool.
+    
+    Returns:
+        Redis connection instance
+    """
+    if redis_pool:
+        return redis.Redis(connection_pool=redis_pool)
+    return None
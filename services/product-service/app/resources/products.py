@@ -10,7 +10,8 @@ from ..services.product_repository import ProductRepository, CategoryRepository,
 from ..schemas.product import (
     ProductCreateSchema, ProductUpdateSchema, ProductResponseSchema,
     ProductListSchema, ProductListQuerySchema, ProductSearchSchema,
-    ProductSearchResponseSchema, ErrorResponseSchema
+    ProductSearchResponseSchema, ProductBatchSchema, ProductBatchResponseSchema,
+    ProductExistsResponseSchema, ErrorResponseSchema
 )
 from ..utils.exceptions import ProductNotFoundError, ProductAlreadyExistsError
 from ..models.product import ProductType, ProductUnit
@@ -95,6 +96,67 @@ class ProductCollection(MethodView):
             abort(500, message="Internal server error while creating product")
 
 
+@blp.route('/batch')
+class ProductBatch(MethodView):
+    """Batch product lookup endpoints."""
+    
+    def __init__(self):
+        self.repository = ProductRepository()
+    
+    @blp.arguments(ProductBatchSchema)
+    @blp.response(200, ProductBatchResponseSchema)
+    @blp.alt_response(400, schema=ErrorResponseSchema, description='Invalid product IDs')
+    def post(self, batch_data):
+        """Get several products by ID.
+        
+        Retrieve the products for a list of IDs in a single request. Unknown
+        IDs are omitted from the response.
+        """
+        product_ids = list(dict.fromkeys(batch_data['ids']))
+        logger.info("Fetching product batch", requested=len(product_ids))
+        
+        try:
+            products = self.repository.get_by_ids(product_ids, include_relationships=True)
+            result = {'products': [product.to_dict(include_relationships=True) for product in products]}
+            
+            logger.info("Product batch fetched successfully", 
+                       requested=len(product_ids), 
+                       found=len(products))
+            return result
+            
+        except Exception as e:
+            logger.error("Error fetching product batch", error=str(e))
+            abort(500, message="Internal server error while fetching products")
+
+
+@blp.route('/exists')
+class ProductExists(MethodView):
+    """Batch product existence endpoints."""
+    
+    def __init__(self):
+        self.repository = ProductRepository()
+    
+    @blp.arguments(ProductBatchSchema)
+    @blp.response(200, ProductExistsResponseSchema)
+    @blp.alt_response(400, schema=ErrorResponseSchema, description='Invalid product IDs')
+    def post(self, batch_data):
+        """Check which products exist.
+        
+        Returns a map of each requested product ID to whether it exists, without
+        loading product details.
+        """
+        product_ids = list(dict.fromkeys(batch_data['ids']))
+        logger.info("Checking product existence", requested=len(product_ids))
+        
+        try:
+            existing_ids = self.repository.get_existing_ids(product_ids)
+            return {'exists': {str(product_id): product_id in existing_ids for product_id in product_ids}}
+            
+        except Exception as e:
+            logger.error("Error checking product existence", error=str(e))
+            abort(500, message="Internal server error while checking products")
+
+
 @blp.route('/<uuid:product_id>')
 class ProductItem(MethodView):
     """Individual product endpoints."""
@@ -128,6 +190,15 @@ class ProductItem(MethodView):
             logger.error("Error fetching product", product_id=str(product_id), error=str(e))
             abort(500, message="Internal server error while fetching product")
     
+    def head(self, product_id):
+        """Check whether a product exists.
+        
+        Answers from an id-only query instead of loading and serializing the product.
+        """
+        if not self.repository.get_existing_ids([product_id]):
+            return '', 404
+        return '', 200
+    
     @blp.arguments(ProductUpdateSchema)
     @blp.response(200, ProductResponseSchema)
     @blp.alt_response(400, schema=ErrorResponseSchema, description='Invalid product data')
@@ -155,6 +155,8 @@ class SearchSuggestions(MethodView):
         
         Provide intelligent search suggestions based on partial query input.
         Useful for implementing autocomplete functionality in the frontend.
+        Queries shorter than three characters return no suggestions. With the
+        Redis suggestion index built, only names starting with the query match.
         """
         logger.info("Getting search suggestions", partial_query=query_args['q'])
         
@@ -183,6 +183,29 @@ class ProductResponseSchema(Schema):
     tags = fields.Nested(ProductTagSchema, many=True, dump_only=True)
 
 
+class ProductBatchSchema(Schema):
+    """Schema for fetching several products by ID."""
+    
+    ids = fields.List(
+        fields.UUID(),
+        required=True,
+        validate=validate.Length(min=1, max=500),
+        metadata={'description': 'Product UUIDs to fetch (up to 500)'}
+    )
+
+
+class ProductBatchResponseSchema(Schema):
+    """Schema for batch product response."""
+    
+    products = fields.Nested(ProductResponseSchema, many=True, required=True)
+
+
+class ProductExistsResponseSchema(Schema):
+    """Schema for batch product existence response."""
+    
+    exists = fields.Dict(keys=fields.Str(), values=fields.Bool(), required=True)
+
+
 class ProductListResponseSchema(Schema):
     """Schema for product list response."""
     
@@ -42,6 +42,38 @@ class ProductRepository:
         
         return query.filter(self.model.id == product_id).first()
     
+    def get_by_ids(self, product_ids: List[UUID], include_relationships: bool = False) -> List[Product]:
+        """Get several products by ID in one query.
+        
+        Args:
+            product_ids: Product UUIDs
+            include_relationships: Whether to include categories and tags
+            
+        Returns:
+            Products found (unknown IDs are omitted)
+        """
+        query = self.session.query(self.model)
+        
+        if include_relationships:
+            query = query.options(
+                joinedload(Product.categories),
+                joinedload(Product.tags)
+            )
+        
+        return query.filter(self.model.id.in_(product_ids)).all()
+    
+    def get_existing_ids(self, product_ids: List[UUID]) -> set:
+        """Get which of the given product IDs exist, without loading the products.
+        
+        Args:
+            product_ids: Product UUIDs
+            
+        Returns:
+            Set of existing product UUIDs
+        """
+        rows = self.session.query(self.model.id).filter(self.model.id.in_(product_ids))
+        return {row.id for row in rows}
+    
     def get_by_name(self, name: str) -> Optional[Product]:
         """Get product by name.
         
@@ -1,16 +1,230 @@
 """Advanced search service for products."""
+import atexit
 import hashlib
+import queue
 import re
+import threading
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional, Tuple
-from sqlalchemy import func, or_, and_, text
-from sqlalchemy.orm import joinedload
+from flask import current_app
+from sqlalchemy import delete, event, func, insert, inspect, or_, and_, text
+from sqlalchemy.orm import Session, joinedload, object_session
 
-from ..extensions import db, cache
+from ..extensions import db, cache, get_redis_connection
 from ..models.product import Product, ProductSearchCache, ProductType, ProductUnit
 from ..services.product_repository import ProductRepository
 
 
+# Redis sorted set holding every product name for prefix suggestions. Members are
+# stored as "<normalized name>\x00<name>" with score 0 so ZRANGEBYLEX can match a
+# normalized query as a prefix while still returning the original name.
+SUGGESTION_INDEX_KEY = 'product_names'
+# Set by rebuild_suggestion_index once the index holds every product. Commit
+# hooks may create a partial set before that, so reads are gated on this key.
+SUGGESTION_INDEX_READY_KEY = 'product_names:ready'
+SUGGESTION_MIN_QUERY_LENGTH = 3
+
+# Session.info key for index changes waiting for their transaction to commit
+_PENDING_INDEX_CHANGES = 'suggestion_index_changes'
+
+
+def _normalize_search_text(value: str) -> str:
+    """Normalize text for matching: lowercase, single spaces, no special characters."""
+    if not value:
+        return ""
+    
+    # Remove extra whitespace and convert to lowercase
+    normalized = re.sub(r'\s+', ' ', value.strip().lower())
+    
+    # Remove special characters but keep alphanumeric and spaces
+    return re.sub(r'[^a-zA-Z0-9\s-]', '', normalized)
+
+
+def _suggestion_member(name: str) -> bytes:
+    """Build the suggestion index member for a product name."""
+    return f"{_normalize_search_text(name)}\x00{name}".encode()
+
+
+def _queue_index_change(target: Product, add: bool, name: str) -> None:
+    """Record a suggestion index change to apply when the session commits."""
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_PENDING_INDEX_CHANGES, []).append(
+            (add, _suggestion_member(name))
+        )
+
+
+@event.listens_for(Product, 'after_insert')
+def _index_product_name(mapper, connection, target) -> None:
+    """Queue a newly inserted product name for the suggestion index."""
+    _queue_index_change(target, True, target.name)
+
+
+@event.listens_for(Product.name, 'set', active_history=True)
+def _load_previous_name(target, value, oldvalue, initiator) -> None:
+    """Load an expired name before a rename so after_update can unindex it."""
+
+
+@event.listens_for(Product, 'after_update')
+def _reindex_product_name(mapper, connection, target) -> None:
+    """Queue the suggestion index update for a renamed product."""
+    history = inspect(target).attrs.name.history
+    if not history.has_changes():
+        return
+    
+    for old_name in history.deleted or ():
+        _queue_index_change(target, False, old_name)
+    _queue_index_change(target, True, target.name)
+
+
+@event.listens_for(Product, 'after_delete')
+def _unindex_product_name(mapper, connection, target) -> None:
+    """Queue the removal of a deleted product name from the suggestion index."""
+    _queue_index_change(target, False, target.name)
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_suggestion_index_changes(session) -> None:
+    """Write the suggestion index changes of a committed transaction to Redis."""
+    changes = session.info.pop(_PENDING_INDEX_CHANGES, None)
+    if not changes:
+        return
+    
+    try:
+        redis_conn = get_redis_connection()
+        if redis_conn is not None:
+            pipe = redis_conn.pipeline()
+            for add, member in changes:
+                if add:
+                    pipe.zadd(SUGGESTION_INDEX_KEY, {member: 0})
+                else:
+                    pipe.zrem(SUGGESTION_INDEX_KEY, member)
+            pipe.execute()
+    except Exception:
+        # The index is an optimization; never fail the write because of it
+        pass
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_suggestion_index_changes(session) -> None:
+    """Drop the suggestion index changes of a rolled back transaction."""
+    session.info.pop(_PENDING_INDEX_CHANGES, None)
+
+
+class _SearchCacheWriter:
+    """Coalesces search cache writes onto a single background thread.
+    
+    Request threads enqueue entries and return immediately; the writer drains
+    up to ``batch_size`` entries at a time and persists them with one DELETE
+    and one executemany INSERT. ``stop`` runs at exit and flushes the queue.
+    """
+    
+    # Queued by stop(); everything ahead of it is written before the thread ends
+    _STOP = object()
+    
+    def __init__(self, maxsize: int = 10_000, batch_size: int = 100, interval: float = 0.5):
+        self.batch_size = batch_size
+        self.interval = interval
+        self._queue: queue.Queue = queue.Queue(maxsize=maxsize)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._atexit_registered = False
+    
+    def submit(self, app, entry: Dict[str, Any]) -> None:
+        """Queue a cache entry for writing, dropping it if the queue is full.
+        
+        Args:
+            app: Flask application used to open an app context in the writer
+            entry: Row values for ProductSearchCache
+        """
+        self._ensure_started(app)
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            pass
+    
+    def stop(self, timeout: float = 5.0) -> None:
+        """Write every queued entry and stop the writer thread.
+        
+        Args:
+            timeout: Seconds to wait for the writer to finish
+        """
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            return
+        
+        self._stopping.set()
+        try:
+            self._queue.put(self._STOP, timeout=timeout)
+        except queue.Full:
+            return
+        thread.join(timeout)
+    
+    def _ensure_started(self, app) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping.clear()
+                self._thread = threading.Thread(
+                    target=self._run, args=(app,), name='search-cache-writer', daemon=True
+                )
+                self._thread.start()
+                if not self._atexit_registered:
+                    atexit.register(self.stop)
+                    self._atexit_registered = True
+    
+    def _run(self, app) -> None:
+        stopped = False
+        while not stopped:
+            entry = self._queue.get()
+            if entry is self._STOP:
+                break
+            batch = [entry]
+            # Give concurrent requests a moment to add to the same batch,
+            # unless shutdown is waiting on the flush
+            self._stopping.wait(self.interval)
+            while len(batch) < self.batch_size:
+                try:
+                    entry = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if entry is self._STOP:
+                    stopped = True
+                    break
+                batch.append(entry)
+            
+            with app.app_context():
+                try:
+                    _write_search_cache_entries(batch)
+                except Exception:
+                    db.session.rollback()
+                finally:
+                    db.session.remove()
+
+
+def _write_search_cache_entries(entries: List[Dict[str, Any]]) -> None:
+    """Persist search cache entries, replacing any existing rows with the same hash.
+    
+    Args:
+        entries: Row values for ProductSearchCache
+    """
+    # Last write wins for duplicate keys within a batch
+    rows = list({entry['search_hash']: entry for entry in entries}.values())
+    
+    db.session.execute(
+        delete(ProductSearchCache).where(
+            ProductSearchCache.search_hash.in_([row['search_hash'] for row in rows])
+        )
+    )
+    db.session.execute(insert(ProductSearchCache), rows)
+    db.session.commit()
+
+
+_cache_writer = _SearchCacheWriter()
+
+
 class ProductSearchService:
     """Advanced search service for products with additional features."""
     
@@ -91,6 +305,11 @@ class ProductSearchService:
     def get_search_suggestions(self, partial_query: str, limit: int = 10) -> List[str]:
         """Get search suggestions based on partial query.
         
+        Queries need at least three characters. Once the Redis index is built
+        (``flask rebuild-suggestion-index``), suggestions are product names that
+        start with the normalized query. Until then, or when Redis is down, the
+        SQL fallback also matches names containing the query and single words.
+        
         Args:
             partial_query: Partial search query
             limit: Maximum number of suggestions
@@ -98,10 +317,16 @@ class ProductSearchService:
         Returns:
             List of suggested search terms
         """
-        if not partial_query or len(partial_query.strip()) < 2:
+        if not partial_query or len(partial_query.strip()) < SUGGESTION_MIN_QUERY_LENGTH:
             return []
         
         normalized_query = self._normalize_query(partial_query)
+        if len(normalized_query) < SUGGESTION_MIN_QUERY_LENGTH:
+            return []
+        
+        indexed_suggestions = self._get_indexed_suggestions(normalized_query, limit)
+        if indexed_suggestions is not None:
+            return indexed_suggestions
         
         try:
             # Get products that start with or contain the query
@@ -135,6 +360,63 @@ class ProductSearchService:
         except Exception:
             return []
     
+    def rebuild_suggestion_index(self) -> int:
+        """Rebuild the Redis suggestion index from the products table.
+        
+        Reads use the index only after this has run once; later inserts,
+        renames and deletes are applied to it when their transaction commits.
+        
+        Returns:
+            Number of product names indexed
+        """
+        redis_conn = get_redis_connection()
+        if redis_conn is None:
+            return 0
+        
+        names = [row.name for row in db.session.query(Product.name).all()]
+        
+        # MULTI/EXEC: readers never see the index emptied or half filled
+        pipe = redis_conn.pipeline()
+        pipe.delete(SUGGESTION_INDEX_KEY)
+        if names:
+            pipe.zadd(SUGGESTION_INDEX_KEY, {_suggestion_member(name): 0 for name in names})
+        pipe.set(SUGGESTION_INDEX_READY_KEY, 1)
+        pipe.execute()
+        
+        return len(names)
+    
+    def _get_indexed_suggestions(self, normalized_query: str, limit: int) -> Optional[List[str]]:
+        """Get prefix suggestions from the Redis suggestion index.
+        
+        Args:
+            normalized_query: Normalized partial query
+            limit: Maximum number of suggestions
+            
+        Returns:
+            List of product names, or None if the index is unavailable
+        """
+        try:
+            redis_conn = get_redis_connection()
+            if redis_conn is None:
+                return None
+            
+            prefix = normalized_query.encode()
+            pipe = redis_conn.pipeline()
+            pipe.exists(SUGGESTION_INDEX_READY_KEY)
+            pipe.zrangebylex(
+                SUGGESTION_INDEX_KEY, b'[' + prefix, b'[' + prefix + b'\xff',
+                start=0, num=limit
+            )
+            index_ready, members = pipe.execute()
+            
+            if not index_ready:
+                return None
+            
+            return [member.split(b'\x00', 1)[-1].decode() for member in members]
+            
+        except Exception:
+            return None
+    
     def get_popular_searches(self, limit: int = 10) -> List[Dict[str, Any]]:
         """Get popular search terms based on search cache.
         
@@ -177,16 +459,7 @@ class ProductSearchService:
         Returns:
             Normalized query string
         """
-        if not query:
-            return ""
-        
-        # Remove extra whitespace and convert to lowercase
-        normalized = re.sub(r'\s+', ' ', query.strip().lower())
-        
-        # Remove special characters but keep alphanumeric and spaces
-        normalized = re.sub(r'[^a-zA-Z0-9\s-]', '', normalized)
-        
-        return normalized
+        return _normalize_search_text(query)
     
     def _perform_filtered_search(
         self,
@@ -398,23 +671,18 @@ class ProductSearchService:
             result: Result to cache
         """
         try:
-            expires_at = datetime.utcnow() + timedelta(seconds=300)  # 5 minutes
-            
-            # Remove existing cache entry
-            db.session.query(ProductSearchCache).filter(
-                ProductSearchCache.search_hash == cache_key
-            ).delete()
-            
-            # Add new cache entry
-            cache_entry = ProductSearchCache(
-                search_hash=cache_key,
-                search_term=result.get('query', ''),
-                results=result,
-                expires_at=expires_at
-            )
+            entry = {
+                'search_hash': cache_key,
+                'search_term': result.get('query', ''),
+                'results': result,
+                'created_at': datetime.utcnow(),
+                'expires_at': datetime.utcnow() + timedelta(seconds=300)  # 5 minutes
+            }
             
-            db.session.add(cache_entry)
-            db.session.commit()
+            if current_app.config.get('SEARCH_CACHE_ASYNC_WRITES', True):
+                _cache_writer.submit(current_app._get_current_object(), entry)
+            else:
+                _write_search_cache_entries([entry])
             
         except Exception:
             # Don't fail the main operation if caching fails
@@ -0,0 +1,28 @@
+"""JSON serialization helpers backed by orjson."""
+from typing import Any
+
+import orjson
+
+
+def json_dumps(value: Any) -> str:
+    """Serialize a value to a JSON string.
+    
+    Args:
+        value: JSON-compatible value (datetimes and UUIDs are supported natively)
+        
+    Returns:
+        JSON string
+    """
+    return orjson.dumps(value, default=str).decode()
+
+
+def json_loads(value: Any) -> Any:
+    """Deserialize a JSON string or bytes.
+    
+    Args:
+        value: JSON document
+        
+    Returns:
+        Deserialized value
+    """
+    return orjson.loads(value)
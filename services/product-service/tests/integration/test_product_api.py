@@ -131,6 +131,62 @@ class TestProductAPI:
             data = json.loads(response.data)
             assert 'not found' in data['message']
     
+    def test_get_products_batch(self, client, app):
+        """Test fetching several products by ID in one request."""
+        with app.app_context():
+            db.create_all()
+            
+            product1 = Product(name="Batch Product 1")
+            product2 = Product(name="Batch Product 2")
+            db.session.add_all([product1, product2])
+            db.session.commit()
+            
+            response = client.post(
+                '/api/v1/products/batch',
+                data=json.dumps({'ids': [str(product1.id), str(product2.id), str(uuid.uuid4())]}),
+                content_type='application/json'
+            )
+            
+            assert response.status_code == 200
+            data = json.loads(response.data)
+            assert {p['name'] for p in data['products']} == {'Batch Product 1', 'Batch Product 2'}
+    
+    def test_products_exist(self, client, app):
+        """Test checking product existence in one request."""
+        with app.app_context():
+            db.create_all()
+            
+            product = Product(name="Existing Product")
+            db.session.add(product)
+            db.session.commit()
+            
+            fake_id = str(uuid.uuid4())
+            response = client.post(
+                '/api/v1/products/exists',
+                data=json.dumps({'ids': [str(product.id), fake_id]}),
+                content_type='application/json'
+            )
+            
+            assert response.status_code == 200
+            data = json.loads(response.data)
+            assert data['exists'] == {str(product.id): True, fake_id: False}
+    
+    def test_head_product(self, client, app):
+        """Test checking a single product's existence with HEAD."""
+        with app.app_context():
+            db.create_all()
+            
+            product = Product(name="Existing Product")
+            db.session.add(product)
+            db.session.commit()
+            
+            response = client.head(f'/api/v1/products/{product.id}')
+            assert response.status_code == 200
+            assert response.data == b''
+            
+            response = client.head(f'/api/v1/products/{uuid.uuid4()}')
+            assert response.status_code == 404
+    
     def test_update_product_success(self, client, app):
         """Test updating product successfully."""
         with app.app_context():
@@ -3,7 +3,10 @@ import pytest
 from unittest.mock import Mock, patch
 from datetime import datetime, timedelta
 
-from app.services.search_service import ProductSearchService
+from app.services.search_service import (
+    ProductSearchService, SUGGESTION_INDEX_KEY, SUGGESTION_INDEX_READY_KEY,
+    _SearchCacheWriter, _suggestion_member, _write_search_cache_entries
+)
 from app.models.product import Product, ProductType, ProductUnit, ProductSearchCache
 from app.extensions import db
 
@@ -230,4 +233,154 @@ class TestProductSearchService:
                 assert True
             except Exception:
                 # Should not reach here
-                assert False, "Exception should have been handled"
\ No newline at end of file
+                assert False, "Exception should have been handled"
+
+
+class TestSuggestionIndex:
+    """Test cases for the Redis suggestion index."""
+    
+    def setup_method(self):
+        """Setup test environment."""
+        self.search_service = ProductSearchService()
+    
+    def test_member_normalized_like_query(self):
+        """Test index members are keyed by the same normalization as queries."""
+        member = _suggestion_member("Crème  Brûlée!")
+        
+        assert member == "crme brle\x00Crème  Brûlée!".encode()
+        assert member.startswith(self.search_service._normalize_query("CRÈME br").encode())
+    
+    @patch('app.services.search_service.get_redis_connection')
+    def test_indexed_suggestions_need_ready_marker(self, mock_get_redis, app):
+        """Test a partial index is not used before a rebuild marks it ready."""
+        with app.app_context():
+            pipe = mock_get_redis.return_value.pipeline.return_value
+            pipe.execute.return_value = [0, [b"flour\x00Flour"]]
+            
+            assert self.search_service._get_indexed_suggestions("flo", 10) is None
+            pipe.exists.assert_called_once_with(SUGGESTION_INDEX_READY_KEY)
+            
+            pipe.execute.return_value = [1, [b"flour\x00Flour"]]
+            
+            assert self.search_service._get_indexed_suggestions("flo", 10) == ["Flour"]
+    
+    @patch('app.services.search_service.get_redis_connection')
+    def test_index_updated_after_commit(self, mock_get_redis, app):
+        """Test product changes reach the index only once committed."""
+        with app.app_context():
+            pipe = mock_get_redis.return_value.pipeline.return_value
+            product = Product(name="Rye Flour")
+            db.session.add(product)
+            db.session.flush()
+            
+            pipe.zadd.assert_not_called()
+            
+            db.session.commit()
+            
+            pipe.zadd.assert_called_once_with(
+                SUGGESTION_INDEX_KEY, {_suggestion_member("Rye Flour"): 0}
+            )
+            
+            product.name = "Spelt Flour"
+            db.session.commit()
+            
+            pipe.zrem.assert_called_once_with(SUGGESTION_INDEX_KEY, _suggestion_member("Rye Flour"))
+            pipe.zadd.assert_called_with(
+                SUGGESTION_INDEX_KEY, {_suggestion_member("Spelt Flour"): 0}
+            )
+    
+    @patch('app.services.search_service.get_redis_connection')
+    def test_index_untouched_after_rollback(self, mock_get_redis, app):
+        """Test changes of a rolled back transaction never reach the index."""
+        with app.app_context():
+            pipe = mock_get_redis.return_value.pipeline.return_value
+            db.session.add(Product(name="Rye Flour"))
+            db.session.flush()
+            db.session.rollback()
+            
+            db.session.add(Product(name="Spelt Flour"))
+            db.session.commit()
+            
+            pipe.zadd.assert_called_once_with(
+                SUGGESTION_INDEX_KEY, {_suggestion_member("Spelt Flour"): 0}
+            )
+    
+    @patch('app.services.search_service.get_redis_connection')
+    def test_rebuild_marks_index_ready(self, mock_get_redis, app):
+        """Test a rebuild replaces the index and sets the ready marker."""
+        with app.app_context():
+            db.session.add_all([Product(name="Rye Flour"), Product(name="Spelt Flour")])
+            db.session.commit()
+            pipe = mock_get_redis.return_value.pipeline.return_value
+            pipe.reset_mock()
+            
+            assert self.search_service.rebuild_suggestion_index() == 2
+            
+            pipe.delete.assert_called_once_with(SUGGESTION_INDEX_KEY)
+            pipe.zadd.assert_called_once_with(SUGGESTION_INDEX_KEY, {
+                _suggestion_member("Rye Flour"): 0,
+                _suggestion_member("Spelt Flour"): 0
+            })
+            pipe.set.assert_called_once_with(SUGGESTION_INDEX_READY_KEY, 1)
+    
+    @patch.object(ProductSearchService, 'rebuild_suggestion_index', return_value=3)
+    def test_rebuild_command(self, mock_rebuild, runner):
+        """Test the CLI command rebuilds the index."""
+        result = runner.invoke(args=['rebuild-suggestion-index'])
+        
+        assert result.exit_code == 0
+        assert "Indexed 3 product names" in result.output
+        mock_rebuild.assert_called_once_with()
+
+
+def _cache_entry(search_hash, search_term):
+    """Build search cache row values that expire in five minutes."""
+    return {
+        'search_hash': search_hash,
+        'search_term': search_term,
+        'results': {'query': search_term},
+        'created_at': datetime.utcnow(),
+        'expires_at': datetime.utcnow() + timedelta(minutes=5)
+    }
+
+
+class TestSearchCacheWriter:
+    """Test cases for the batched search cache writes."""
+    
+    def test_write_entries_one_row_per_key(self, app):
+        """Test duplicate keys in a batch keep only the last entry."""
+        with app.app_context():
+            _write_search_cache_entries([
+                _cache_entry("hash_a", "first"),
+                _cache_entry("hash_b", "other"),
+                _cache_entry("hash_a", "second")
+            ])
+            
+            rows = {row.search_hash: row.search_term
+                    for row in db.session.query(ProductSearchCache).all()}
+            assert rows == {"hash_a": "second", "hash_b": "other"}
+    
+    def test_write_entries_replaces_existing_row(self, app):
+        """Test an entry replaces the stored row with the same key."""
+        with app.app_context():
+            _write_search_cache_entries([_cache_entry("hash_a", "old")])
+            _write_search_cache_entries([_cache_entry("hash_a", "new")])
+            
+            rows = db.session.query(ProductSearchCache).all()
+            assert [(row.search_hash, row.search_term) for row in rows] == [("hash_a", "new")]
+    
+    def test_stop_flushes_queue(self, app):
+        """Test stopping the writer persists entries still waiting in the queue."""
+        # The interval would hold the batch open for a minute without stop()
+        writer = _SearchCacheWriter(batch_size=2, interval=60)
+        for search_hash, search_term in (("hash_a", "one"), ("hash_b", "two"),
+                                         ("hash_c", "three"), ("hash_a", "four")):
+            writer.submit(app, _cache_entry(search_hash, search_term))
+        
+        writer.stop(timeout=5)
+        
+        assert not writer._thread.is_alive()
+        with app.app_context():
+            rows = {row.search_hash: row.search_term
+                    for row in db.session.query(ProductSearchCache).all()}
+            assert rows == {"hash_a": "four", "hash_b": "two", "hash_c": "three"}
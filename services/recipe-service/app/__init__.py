@@ -1,5 +1,6 @@
 """Recipe Service Flask Application Factory."""
 import logging
+import orjson
 import structlog
 from flask import Flask, jsonify
 from flask_cors import CORS
@@ -7,9 +8,12 @@ from flask_migrate import Migrate
 from flask_smorest import Api
 
 from .config import get_config
-from .extensions import db, cache
+from .extensions import db, cache, init_redis_pool
 from .resources import health, recipes
+from .services.product_client import init_product_client
 from .utils.exceptions import register_error_handlers
+from .utils.log_queue import get_output_logger
+from .utils.serialization import OrjsonProvider
 
 
 def create_app(config_name: str = None) -> Flask:
@@ -22,6 +26,7 @@ def create_app(config_name: str = None) -> Flask:
         Configured Flask application
     """
     app = Flask(__name__)
+    app.json = OrjsonProvider(app)
     
     # Load configuration
     config_class = get_config()
@@ -63,6 +68,10 @@ def initialize_extensions(app: Flask) -> None:
     
     # Cache
     cache.init_app(app, config={'CACHE_TYPE': 'redis', 'CACHE_REDIS_URL': app.config['REDIS_URL']})
+    init_redis_pool(app.config['REDIS_URL'])
+    
+    # Product Service client, shared by all requests and threads
+    init_product_client(app)
     
     # CORS
     CORS(app, origins=app.config['CORS_ORIGINS'])
@@ -168,18 +177,30 @@ def configure_logging(app: Flask) -> None:
     Args:
         app: Flask application instance
     """
-    # Configure structlog
+    # JSON lines are rendered by orjson
+    if app.config['LOG_JSON']:
+        renderer = structlog.processors.JSONRenderer(
+            serializer=lambda event, **kwargs: orjson.dumps(event, **kwargs).decode()
+        )
+    else:
+        renderer = structlog.dev.ConsoleRenderer()
+    
+    # Rendered lines go onto a bounded queue; a background listener writes them
+    output_logger = get_output_logger()
+    
+    # Configure structlog; the filtering bound logger drops calls below
+    # LOG_LEVEL before any processor runs
     structlog.configure(
         processors=[
             structlog.processors.TimeStamper(fmt="iso"),
             structlog.processors.add_log_level,
             structlog.processors.StackInfoRenderer(),
-            structlog.dev.ConsoleRenderer()
+            renderer
         ],
         wrapper_class=structlog.make_filtering_bound_logger(
             logging.getLevelName(app.config['LOG_LEVEL'])
         ),
-        logger_factory=structlog.PrintLoggerFactory(),
+        logger_factory=lambda *args: output_logger,
         cache_logger_on_first_use=True,
     )
     
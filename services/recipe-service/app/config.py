@@ -2,6 +2,10 @@
 import os
 from typing import Type
 
+from sqlalchemy.pool import StaticPool
+
+from .utils.serialization import json_dumps, json_loads
+
 
 class Config:
     """Base configuration class."""
@@ -27,7 +31,10 @@ class Config:
         'pool_pre_ping': True,
         'connect_args': {
             'options': '-csearch_path=recipe_service,public'
-        }
+        },
+        # orjson for JSONB columns (version snapshots, audit values)
+        'json_serializer': json_dumps,
+        'json_deserializer': json_loads,
     }
     
     # Redis Cache
@@ -39,6 +46,7 @@ class Config:
     # Service Communication
     PRODUCT_SERVICE_URL = os.environ.get('PRODUCT_SERVICE_URL', 'http://localhost:8001')
     SERVICE_TIMEOUT = int(os.environ.get('SERVICE_TIMEOUT', '30'))  # seconds
+    PRODUCT_SERVICE_HEALTH_TTL = float(os.environ.get('PRODUCT_SERVICE_HEALTH_TTL', '5'))  # seconds
     
     # API Configuration
     API_TITLE = 'Recipe Service API'
@@ -62,12 +70,15 @@ class Config:
     MAX_INGREDIENTS_PER_RECIPE = int(os.environ.get('MAX_INGREDIENTS_PER_RECIPE', '100'))
     
     # Cache Configuration
+    RECIPE_CACHE_ENABLED = True  # Redis look-aside cache for recipe read endpoints
     RECIPE_CACHE_TTL = 300  # 5 minutes
     HIERARCHY_CACHE_TTL = 600  # 10 minutes for hierarchical queries
+    TAGS_CACHE_TTL = 600  # 10 minutes, tags change rarely
     
     # Logging
     LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
     LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    LOG_JSON = False  # Render structlog events as JSON lines instead of console output
 
 
 class DevelopmentConfig(Config):
@@ -86,18 +97,37 @@ class TestingConfig(Config):
     TESTING = True
     DEBUG = True
     
-    # Use in-memory SQLite for tests
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
-    SQLALCHEMY_ENGINE_OPTIONS = {}
+    # The models use PostgreSQL types, so DB-backed tests need TEST_DATABASE_URL
+    # to point at a PostgreSQL database. Without it, in-memory SQLite serves the
+    # tests that never touch the tables; StaticPool keeps the single connection,
+    # and with it the database, alive for the whole test session
+    SQLALCHEMY_DATABASE_URI = os.environ.get('TEST_DATABASE_URL', 'sqlite:///:memory:')
+    if SQLALCHEMY_DATABASE_URI.startswith('sqlite'):
+        SQLALCHEMY_ENGINE_OPTIONS = {
+            'json_serializer': json_dumps,
+            'json_deserializer': json_loads,
+            'poolclass': StaticPool,
+            'connect_args': {'check_same_thread': False},
+        }
+    else:
+        SQLALCHEMY_ENGINE_OPTIONS = {
+            'json_serializer': json_dumps,
+            'json_deserializer': json_loads,
+            'connect_args': {
+                'options': '-csearch_path=recipe_service,public'
+            },
+        }
     
     # Disable CSRF for testing
     WTF_CSRF_ENABLED = False
     
     # Disable cache for testing
     CACHE_TYPE = 'null'
+    RECIPE_CACHE_ENABLED = False
     
     # Mock external services
     PRODUCT_SERVICE_URL = 'http://mock-product-service'
+    PRODUCT_SERVICE_HEALTH_TTL = 0  # Always re-check so mocks take effect
 
 
 class ProductionConfig(Config):
@@ -105,6 +135,8 @@ class ProductionConfig(Config):
     DEBUG = False
     FLASK_ENV = 'production'
     
+    LOG_JSON = True
+    
     # Enhanced security
     SESSION_COOKIE_SECURE = True
     SESSION_COOKIE_HTTPONLY = True
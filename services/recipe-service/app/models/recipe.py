@@ -1,25 +1,52 @@
 """Recipe model and related entities."""
+import re
 import uuid
 import enum
 from datetime import datetime
 from typing import List, Optional, Dict, Any
-from sqlalchemy import Column, String, Text, Enum, DateTime, ForeignKey, Integer, Numeric, Boolean, Table, CheckConstraint
-from sqlalchemy.dialects.postgresql import UUID, JSONB
-from sqlalchemy.orm import relationship, validates
+from sqlalchemy import Column, String, Text, Enum, DateTime, ForeignKey, Index, Integer, Numeric, Boolean, Table, CheckConstraint, insert, select
+from sqlalchemy.dialects.postgresql import UUID, JSONB, insert as pg_insert
+from sqlalchemy.orm import column_property, deferred, object_session, relationship, undefer_group, validates
+from sqlalchemy.orm.attributes import instance_state
 from sqlalchemy.sql import func
 from decimal import Decimal
+from operator import attrgetter, itemgetter
 
 from ..extensions import db
 
+# Hex color code (e.g. #FF0000), mirrors the recipe_tags_color_format constraint
+HEX_COLOR_RE = re.compile(r'^#[0-9A-Fa-f]{6}$')
 
-class RecipeStatus(enum.Enum):
-    """Recipe status enumeration."""
+
+def _field_values(instance, item_getter, attr_getter) -> tuple:
+    """Read to_dict field values, straight from the instance __dict__ when loaded.
+    
+    Indexing the state dict skips the instrumented attribute descriptors; any
+    expired or deferred field falls back to regular attribute access, which
+    loads it.
+    """
+    try:
+        return item_getter(instance.__dict__)
+    except KeyError:
+        return attr_getter(instance)
+
+
+class RecipeStatus(str, enum.Enum):
+    """Recipe status enumeration.
+    
+    Members compare equal to their string values, which is how statuses are
+    stored on Recipe.status.
+    """
     DRAFT = 'draft'
     ACTIVE = 'active'
     ARCHIVED = 'archived'
     DEPRECATED = 'deprecated'
 
 
+# Statuses whose recipes are no longer edited, so their to_dict output can be reused
+IMMUTABLE_STATUSES = frozenset({RecipeStatus.ARCHIVED.value, RecipeStatus.DEPRECATED.value})
+
+
 class IngredientUnit(enum.Enum):
     """Ingredient unit enumeration."""
     PIECE = 'piece'
@@ -49,6 +76,8 @@ class Recipe(db.Model):
     __table_args__ = (
         CheckConstraint("length(trim(name)) > 0", name='recipes_name_not_empty'),
         CheckConstraint("version > 0", name='recipes_version_positive'),
+        CheckConstraint("status IN ('draft', 'active', 'archived', 'deprecated')",
+                       name='recipes_status_valid'),
         CheckConstraint("yield_quantity IS NULL OR yield_quantity > 0", 
                        name='recipes_yield_quantity_positive'),
         CheckConstraint("preparation_time IS NULL OR preparation_time > 0", 
@@ -66,7 +95,7 @@ class Recipe(db.Model):
     name = Column(String(255), nullable=False, index=True)
     description = Column(Text)
     version = Column(Integer, nullable=False, default=1, index=True)
-    status = Column(Enum(RecipeStatus), nullable=False, default=RecipeStatus.DRAFT, index=True)
+    status = Column(String(16), nullable=False, default=RecipeStatus.DRAFT.value, index=True)
     
     # Recipe metadata
     yield_quantity = Column(Numeric(10, 3))
@@ -86,7 +115,8 @@ class Recipe(db.Model):
                              cascade='all, delete-orphan',
                              order_by='RecipeIngredient.sort_order')
     
-    versions = relationship('RecipeVersion', back_populates='recipe', lazy='dynamic')
+    versions = relationship('RecipeVersion', back_populates='recipe', lazy='select',
+                          order_by='RecipeVersion.version_number')
     
     dependencies = relationship('RecipeDependency', back_populates='parent_recipe',
                               foreign_keys='RecipeDependency.parent_recipe_id')
@@ -95,16 +125,30 @@ class Recipe(db.Model):
     
     tags = relationship('RecipeTag', secondary=recipe_tag_assignments, back_populates='recipes')
     
-    audit_entries = relationship('RecipeAudit', lazy='dynamic',
+    # Unbounded, read through get_audit_page() rather than loaded as a collection
+    audit_entries = relationship('RecipeAudit', lazy='raise', viewonly=True,
                                primaryjoin='Recipe.id == RecipeAudit.recipe_id')
     
     # Unique constraint for product-version combination
     __table_args__ = (
         *__table_args__[:-1],  # Unpack existing constraints
         db.UniqueConstraint('product_id', 'version', name='recipes_product_version_unique'),
+        # Covers product/version list queries (index-only scans on PostgreSQL)
+        Index('idx_recipes_product_version_covering', 'product_id', 'version',
+              postgresql_include=['name', 'status', 'created_at']),
+        # Keyset pagination of recipe lists, ordered by (name, id)
+        Index('idx_recipes_name_id', 'name', 'id'),
         {'schema': 'recipe_service'}
     )
     
+    # Fields copied as-is by to_dict, read in one getter call
+    _DICT_FIELDS = (
+        'id', 'product_id', 'name', 'description', 'version', 'status', 'yield_quantity',
+        'preparation_time', 'notes', 'created_at', 'updated_at', 'created_by', 'updated_by'
+    )
+    _dict_values = attrgetter(*_DICT_FIELDS)
+    _dict_items = itemgetter(*_DICT_FIELDS)
+    
     @validates('name')
     def validate_name(self, key, name):
         """Validate recipe name."""
@@ -112,26 +156,10 @@ class Recipe(db.Model):
             raise ValueError("Recipe name cannot be empty")
         return name.strip()
     
-    @validates('version')
-    def validate_version(self, key, version):
-        """Validate recipe version."""
-        if version is not None and version <= 0:
-            raise ValueError("Recipe version must be positive")
-        return version
-    
-    @validates('yield_quantity')
-    def validate_yield_quantity(self, key, quantity):
-        """Validate yield quantity."""
-        if quantity is not None and quantity <= 0:
-            raise ValueError("Yield quantity must be positive")
-        return quantity
-    
-    @validates('preparation_time')
-    def validate_preparation_time(self, key, time):
-        """Validate preparation time."""
-        if time is not None and time <= 0:
-            raise ValueError("Preparation time must be positive")
-        return time
+    @validates('status')
+    def validate_status(self, key, status):
+        """Validate recipe status and store it as a plain string."""
+        return RecipeStatus(status).value
     
     def to_dict(self, include_relationships: bool = False) -> Dict[str, Any]:
         """Convert recipe to dictionary representation.
@@ -142,22 +170,10 @@ class Recipe(db.Model):
         Returns:
             Dictionary representation of the recipe
         """
-        result = {
-            'id': str(self.id),
-            'product_id': str(self.product_id),
-            'name': self.name,
-            'description': self.description,
-            'version': self.version,
-            'status': self.status.value,
-            'yield_quantity': float(self.yield_quantity) if self.yield_quantity else None,
-            'yield_unit': self.yield_unit.value if self.yield_unit else None,
-            'preparation_time': self.preparation_time,
-            'notes': self.notes,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
-            'created_by': str(self.created_by) if self.created_by else None,
-            'updated_by': str(self.updated_by) if self.updated_by else None
-        }
+        if not include_relationships and self.status in IMMUTABLE_STATUSES:
+            return self._immutable_dict().copy()
+        
+        result = self._build_dict()
         
         if include_relationships:
             result['ingredients'] = [ingredient.to_dict() for ingredient in self.ingredients]
@@ -167,16 +183,58 @@ class Recipe(db.Model):
         
         return result
     
+    def _build_dict(self) -> Dict[str, Any]:
+        """Build the column part of the to_dict output."""
+        values = _field_values(self, Recipe._dict_items, Recipe._dict_values)
+        result = dict(zip(self._DICT_FIELDS, values))
+        result['yield_unit'] = self.yield_unit.value if self.yield_unit else None
+        return result
+    
+    def _immutable_dict(self) -> Dict[str, Any]:
+        """Get the column dict of an archived/deprecated recipe, built once per instance.
+        
+        The cached dict is rebuilt if the instance has pending changes or was
+        reloaded with a different updated_at. Callers must copy it.
+        """
+        cached = self.__dict__.get('_cached_dict')
+        if cached is None or cached[0] != self.updated_at or instance_state(self).modified:
+            cached = (self.updated_at, self._build_dict())
+            self.__dict__['_cached_dict'] = cached
+        return cached[1]
+    
     def get_total_ingredients_count(self) -> int:
         """Get total number of ingredients in this recipe."""
-        return len(self.ingredients)
+        if 'ingredients' in self.__dict__:
+            # Collection already loaded, counting it is free
+            return len(self.ingredients)
+        return self.total_ingredients_count
     
     def get_required_ingredients_count(self) -> int:
         """Get number of required (non-optional) ingredients."""
-        return len([ing for ing in self.ingredients if not ing.is_optional])
+        return self.required_ingredients_count
+    
+    def get_audit_page(self, offset: int = 0, limit: int = 50) -> List['RecipeAudit']:
+        """Get a page of audit entries for this recipe, newest first.
+        
+        Args:
+            offset: Number of entries to skip
+            limit: Maximum number of entries to return
+            
+        Returns:
+            List of audit entries
+        """
+        stmt = (
+            select(RecipeAudit)
+            .options(undefer_group('audit_values'))
+            .where(RecipeAudit.recipe_id == self.id)
+            .order_by(RecipeAudit.changed_at.desc())
+            .offset(offset)
+            .limit(limit)
+        )
+        return list(object_session(self).execute(stmt).scalars())
     
     def __repr__(self):
-        return f'<Recipe {self.name} v{self.version} ({self.status.value})>'
+        return f'<Recipe {self.name} v{self.version} ({self.status})>'
 
 
 class RecipeIngredient(db.Model):
@@ -188,6 +246,8 @@ class RecipeIngredient(db.Model):
         CheckConstraint("sort_order >= 0", name='recipe_ingredients_sort_order_non_negative'),
         db.UniqueConstraint('recipe_id', 'ingredient_product_id', 
                           name='recipe_ingredients_unique_ingredient'),
+        # "Which recipes use this product" lookups; also serves product-only filters
+        Index('idx_recipe_ingredients_product_recipe', 'ingredient_product_id', 'recipe_id'),
         {'schema': 'recipe_service'}
     )
     
@@ -199,7 +259,7 @@ class RecipeIngredient(db.Model):
                       nullable=False, index=True)
     
     # Ingredient information
-    ingredient_product_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+    ingredient_product_id = Column(UUID(as_uuid=True), nullable=False)
     quantity = Column(Numeric(10, 3), nullable=False)
     unit = Column(Enum(IngredientUnit), nullable=False)
     
@@ -220,41 +280,67 @@ class RecipeIngredient(db.Model):
     # Relationships
     recipe = relationship('Recipe', back_populates='ingredients')
     
-    @validates('quantity')
-    def validate_quantity(self, key, quantity):
-        """Validate ingredient quantity."""
-        if quantity is not None and quantity <= 0:
-            raise ValueError("Ingredient quantity must be positive")
-        return quantity
+    # Fields copied as-is by to_dict, read in one getter call
+    _DICT_FIELDS = (
+        'id', 'recipe_id', 'ingredient_product_id', 'quantity', 'sort_order', 'ingredient_group',
+        'notes', 'is_optional', 'substitute_ingredients', 'created_at', 'updated_at'
+    )
+    _dict_values = attrgetter(*_DICT_FIELDS)
+    _dict_items = itemgetter(*_DICT_FIELDS)
     
-    @validates('sort_order')
-    def validate_sort_order(self, key, sort_order):
-        """Validate sort order."""
-        if sort_order is not None and sort_order < 0:
-            raise ValueError("Sort order must be non-negative")
-        return sort_order
+    @classmethod
+    def bulk_create(cls, session, recipe_id: uuid.UUID, rows: List[Dict[str, Any]]) -> None:
+        """Insert ingredient rows for a recipe with a single executemany INSERT.
+        
+        Bypasses the unit of work, so rows must already be validated by the
+        request schemas; value rules are enforced by the table constraints.
+        Rows may set different optional keys; the ORM bulk insert batches
+        them by key set instead of keying every row on the first one.
+        The recipe's ``ingredients`` collection is not refreshed.
+        
+        Args:
+            session: SQLAlchemy session
+            recipe_id: Recipe UUID the ingredients belong to
+            rows: Column values for each ingredient
+        """
+        if not rows:
+            return
+        
+        session.execute(
+            insert(cls),
+            [{**row, 'recipe_id': recipe_id} for row in rows]
+        )
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert ingredient to dictionary representation."""
-        return {
-            'id': str(self.id),
-            'recipe_id': str(self.recipe_id),
-            'ingredient_product_id': str(self.ingredient_product_id),
-            'quantity': float(self.quantity),
-            'unit': self.unit.value,
-            'sort_order': self.sort_order,
-            'ingredient_group': self.ingredient_group,
-            'notes': self.notes,
-            'is_optional': self.is_optional,
-            'substitute_ingredients': self.substitute_ingredients,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
+        values = _field_values(self, RecipeIngredient._dict_items, RecipeIngredient._dict_values)
+        result = dict(zip(self._DICT_FIELDS, values))
+        result['unit'] = self.unit.value
+        return result
     
     def __repr__(self):
         return f'<RecipeIngredient {self.ingredient_product_id} ({self.quantity} {self.unit.value})>'
 
 
+# Ingredient counts as deferred scalar subqueries, so counting doesn't load the
+# ingredients collection. Defined here because they reference RecipeIngredient.
+Recipe.total_ingredients_count = column_property(
+    select(func.count(RecipeIngredient.id))
+    .where(RecipeIngredient.recipe_id == Recipe.id)
+    .correlate_except(RecipeIngredient)
+    .scalar_subquery(),
+    deferred=True
+)
+
+Recipe.required_ingredients_count = column_property(
+    select(func.count(RecipeIngredient.id))
+    .where(RecipeIngredient.recipe_id == Recipe.id, RecipeIngredient.is_optional.is_(False))
+    .correlate_except(RecipeIngredient)
+    .scalar_subquery(),
+    deferred=True
+)
+
+
 class RecipeVersion(db.Model):
     """Recipe version model for tracking version history."""
     
@@ -269,7 +355,10 @@ class RecipeVersion(db.Model):
     recipe_id = Column(UUID(as_uuid=True), ForeignKey('recipe_service.recipes.id', ondelete='CASCADE'),
                       nullable=False, index=True)
     version_number = Column(Integer, nullable=False, index=True)
-    recipe_data = Column(JSONB, nullable=False)  # Complete recipe snapshot
+    # Checkpoint versions store the complete recipe snapshot, the others a JSON
+    # Patch against the previous version; both are loaded on access
+    recipe_data = deferred(Column(JSONB(none_as_null=True)))
+    patch = deferred(Column(JSONB(none_as_null=True)))
     change_summary = Column(Text)
     created_at = Column(DateTime(timezone=True), default=func.now(), nullable=False, index=True)
     created_by = Column(UUID(as_uuid=True))
@@ -278,17 +367,26 @@ class RecipeVersion(db.Model):
     recipe = relationship('Recipe', back_populates='versions')
     
     def to_dict(self) -> Dict[str, Any]:
-        """Convert version to dictionary representation."""
+        """Convert version to dictionary representation.
+        
+        ``recipe_data`` is None for patch versions; the snapshot is only
+        rebuilt from the checkpoint by RecipeRepository.iter_versions.
+        """
         return {
-            'id': str(self.id),
-            'recipe_id': str(self.recipe_id),
+            'id': self.id,
+            'recipe_id': self.recipe_id,
             'version_number': self.version_number,
             'recipe_data': self.recipe_data,
             'change_summary': self.change_summary,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'created_by': str(self.created_by) if self.created_by else None
+            'created_at': self.created_at,
+            'created_by': self.created_by
         }
     
+    @property
+    def is_checkpoint(self) -> bool:
+        """Whether this version stores a complete snapshot."""
+        return self.recipe_data is not None
+    
     def __repr__(self):
         return f'<RecipeVersion {self.recipe_id} v{self.version_number}>'
 
@@ -317,15 +415,45 @@ class RecipeDependency(db.Model):
     # Relationships
     parent_recipe = relationship('Recipe', back_populates='dependencies')
     
+    @classmethod
+    def bulk_create(cls, session, parent_recipe_id: uuid.UUID, child_product_ids: List[uuid.UUID]) -> None:
+        """Insert direct ingredient dependencies with a single executemany INSERT.
+        
+        Pairs that already exist are skipped (ON CONFLICT DO NOTHING). Bypasses
+        the unit of work; the recipe's ``dependencies`` collection is not refreshed.
+        
+        Args:
+            session: SQLAlchemy session
+            parent_recipe_id: Recipe UUID
+            child_product_ids: Ingredient product UUIDs
+        """
+        if not child_product_ids:
+            return
+        
+        session.execute(
+            pg_insert(cls.__table__).on_conflict_do_nothing(
+                index_elements=['parent_recipe_id', 'child_product_id']
+            ),
+            [
+                {
+                    'parent_recipe_id': parent_recipe_id,
+                    'child_product_id': child_product_id,
+                    'dependency_type': 'ingredient',
+                    'depth_level': 1
+                }
+                for child_product_id in child_product_ids
+            ]
+        )
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert dependency to dictionary representation."""
         return {
-            'id': str(self.id),
-            'parent_recipe_id': str(self.parent_recipe_id),
-            'child_product_id': str(self.child_product_id),
+            'id': self.id,
+            'parent_recipe_id': self.parent_recipe_id,
+            'child_product_id': self.child_product_id,
             'dependency_type': self.dependency_type,
             'depth_level': self.depth_level,
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            'created_at': self.created_at
         }
     
     def __repr__(self):
@@ -353,14 +481,14 @@ class RecipeNutrition(db.Model):
                       ForeignKey('recipe_service.recipes.id', ondelete='CASCADE'),
                       primary_key=True)
     
-    # Macronutrients per 100g/100ml
-    calories = Column(Numeric(8, 2))
-    protein = Column(Numeric(8, 2))
-    carbohydrates = Column(Numeric(8, 2))
-    fat = Column(Numeric(8, 2))
-    fiber = Column(Numeric(8, 2))
-    sugar = Column(Numeric(8, 2))
-    sodium = Column(Numeric(8, 2))
+    # Macronutrients per 100g/100ml, loaded as floats (no exact arithmetic needed)
+    calories = Column(Numeric(8, 2, asdecimal=False))
+    protein = Column(Numeric(8, 2, asdecimal=False))
+    carbohydrates = Column(Numeric(8, 2, asdecimal=False))
+    fat = Column(Numeric(8, 2, asdecimal=False))
+    fiber = Column(Numeric(8, 2, asdecimal=False))
+    sugar = Column(Numeric(8, 2, asdecimal=False))
+    sodium = Column(Numeric(8, 2, asdecimal=False))
     
     # Calculation metadata
     calculated_at = Column(DateTime(timezone=True), default=func.now(), nullable=False)
@@ -372,15 +500,15 @@ class RecipeNutrition(db.Model):
     def to_dict(self) -> Dict[str, Any]:
         """Convert nutrition to dictionary representation."""
         return {
-            'recipe_id': str(self.recipe_id),
-            'calories': float(self.calories) if self.calories else None,
-            'protein': float(self.protein) if self.protein else None,
-            'carbohydrates': float(self.carbohydrates) if self.carbohydrates else None,
-            'fat': float(self.fat) if self.fat else None,
-            'fiber': float(self.fiber) if self.fiber else None,
-            'sugar': float(self.sugar) if self.sugar else None,
-            'sodium': float(self.sodium) if self.sodium else None,
-            'calculated_at': self.calculated_at.isoformat() if self.calculated_at else None,
+            'recipe_id': self.recipe_id,
+            'calories': self.calories,
+            'protein': self.protein,
+            'carbohydrates': self.carbohydrates,
+            'fat': self.fat,
+            'fiber': self.fiber,
+            'sugar': self.sugar,
+            'sodium': self.sodium,
+            'calculated_at': self.calculated_at,
             'calculation_method': self.calculation_method
         }
     
@@ -418,20 +546,18 @@ class RecipeTag(db.Model):
     @validates('color')
     def validate_color(self, key, color):
         """Validate color format."""
-        if color is not None:
-            import re
-            if not re.match(r'^#[0-9A-Fa-f]{6}$', color):
-                raise ValueError("Color must be a valid hex color code (e.g., #FF0000)")
+        if color is not None and not HEX_COLOR_RE.match(color):
+            raise ValueError("Color must be a valid hex color code (e.g., #FF0000)")
         return color
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert tag to dictionary representation."""
         return {
-            'id': str(self.id),
+            'id': self.id,
             'name': self.name,
             'color': self.color,
             'description': self.description,
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            'created_at': self.created_at
         }
     
     def __repr__(self):
@@ -453,23 +579,24 @@ class RecipeAudit(db.Model):
     ingredient_id = Column(UUID(as_uuid=True))  # NULL for recipe-level changes
     operation = Column(String(20), nullable=False, index=True)
     table_name = Column(String(50), nullable=False)
-    old_values = Column(JSONB)
-    new_values = Column(JSONB)
+    # Snapshots are loaded together on first access
+    old_values = deferred(Column(JSONB), group='audit_values')
+    new_values = deferred(Column(JSONB), group='audit_values')
     changed_by = Column(UUID(as_uuid=True))
     changed_at = Column(DateTime(timezone=True), default=func.now(), nullable=False, index=True)
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert audit entry to dictionary representation."""
         return {
-            'audit_id': str(self.audit_id),
-            'recipe_id': str(self.recipe_id),
-            'ingredient_id': str(self.ingredient_id) if self.ingredient_id else None,
+            'audit_id': self.audit_id,
+            'recipe_id': self.recipe_id,
+            'ingredient_id': self.ingredient_id,
             'operation': self.operation,
             'table_name': self.table_name,
             'old_values': self.old_values,
             'new_values': self.new_values,
-            'changed_by': str(self.changed_by) if self.changed_by else None,
-            'changed_at': self.changed_at.isoformat() if self.changed_at else None
+            'changed_by': self.changed_by,
+            'changed_at': self.changed_at
         }
     
     def __repr__(self):
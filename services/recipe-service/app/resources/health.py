@@ -1,7 +1,10 @@
 """Health check resource for the Recipe Service."""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from flask.views import MethodView
 from flask_smorest import Blueprint
-from flask import jsonify
+from flask import current_app, jsonify, request
 from sqlalchemy import text
 
 from ..extensions import db
@@ -9,6 +12,57 @@ from ..services.product_client import get_product_client
 
 blp = Blueprint('health', __name__, description='Health check operations')
 
+# Built once so every probe reuses the same cached compiled statement
+_HEALTH_PING = text('SELECT 1')
+
+# Product Service health is cached for PRODUCT_SERVICE_HEALTH_TTL seconds so
+# frequent probes don't each make a cross-service HTTP call
+_product_service_health = {'checked_at': None, 'status': None}
+_product_service_health_lock = threading.Lock()
+
+# Runs the Product Service check while the request thread pings the database
+_health_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='health-check')
+PRODUCT_SERVICE_HEALTH_TIMEOUT = 2.0  # seconds to wait for the concurrent check
+
+
+def _check_product_service() -> str:
+    """Check Product Service connectivity.
+    
+    Returns:
+        'connected', 'disconnected' or an 'error: ...' description
+    """
+    try:
+        client = get_product_client()
+        return 'connected' if client.health_check() else 'disconnected'
+    except Exception as e:
+        return f'error: {str(e)}'
+
+
+def _check_product_service_in_context(app) -> str:
+    """Run the cached Product Service check inside an application context."""
+    with app.app_context():
+        return get_product_service_health()
+
+
+def get_product_service_health() -> str:
+    """Get Product Service connectivity, refreshed at most every TTL seconds.
+    
+    Returns:
+        'connected', 'disconnected' or an 'error: ...' description
+    """
+    ttl = current_app.config['PRODUCT_SERVICE_HEALTH_TTL']
+    checked_at = _product_service_health['checked_at']
+    if checked_at is not None and time.monotonic() - checked_at < ttl:
+        return _product_service_health['status']
+    
+    with _product_service_health_lock:
+        # Another thread may have refreshed while we waited for the lock
+        checked_at = _product_service_health['checked_at']
+        if checked_at is None or time.monotonic() - checked_at >= ttl:
+            _product_service_health['status'] = _check_product_service()
+            _product_service_health['checked_at'] = time.monotonic()
+        return _product_service_health['status']
+
 
 @blp.route('/health')
 class HealthCheck(MethodView):
@@ -18,33 +72,43 @@ class HealthCheck(MethodView):
         """Check service health.
         
         Returns health status of the service including database connectivity
-        and external service dependencies.
+        and external service dependencies. The database is only queried when
+        ``?deep=1`` is passed; otherwise the check confirms the connection pool
+        is available (pool_pre_ping already validates connections on checkout).
         """
+        deep = request.args.get('deep', '').lower() in ('1', 'true')
         health_status = {
             'status': 'healthy',
             'service': 'recipe-service',
             'dependencies': {}
         }
         
+        # Test Product Service connection in the background
+        product_service_future = _health_executor.submit(
+            _check_product_service_in_context, current_app._get_current_object()
+        )
+        
         try:
-            # Test database connection
-            db.session.execute(text('SELECT 1'))
-            health_status['dependencies']['database'] = 'connected'
+            if deep:
+                # Test database connection (the session is bound to this thread)
+                db.session.execute(_HEALTH_PING)
+                health_status['dependencies']['database'] = 'connected'
+            else:
+                # Liveness only: no round trip, just confirm the pool exists
+                db.engine.pool.status()
+                health_status['dependencies']['database'] = 'pool_available'
         except Exception as e:
             health_status['dependencies']['database'] = f'disconnected: {str(e)}'
             health_status['status'] = 'unhealthy'
         
-        # Test Product Service connection
         try:
-            client = get_product_client()
-            product_service_healthy = client.health_check()
-            health_status['dependencies']['product_service'] = 'connected' if product_service_healthy else 'disconnected'
-            
-            if not product_service_healthy:
-                health_status['status'] = 'degraded'  # Can function but with limited capability
-        except Exception as e:
-            health_status['dependencies']['product_service'] = f'error: {str(e)}'
-            health_status['status'] = 'degraded'
+            product_service_status = product_service_future.result(timeout=PRODUCT_SERVICE_HEALTH_TIMEOUT)
+        except FutureTimeoutError:
+            product_service_status = 'error: health check timed out'
+        health_status['dependencies']['product_service'] = product_service_status
+        
+        if product_service_status != 'connected' and health_status['status'] == 'healthy':
+            health_status['status'] = 'degraded'  # Can function but with limited capability
         
         # Determine overall status
         if health_status['status'] == 'healthy':
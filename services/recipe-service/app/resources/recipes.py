@@ -1,67 +1,105 @@
 """Recipe resource endpoints."""
+import hashlib
 import structlog
-from datetime import datetime
+from collections import defaultdict
 from uuid import UUID
-from flask import request
+from flask import Response, current_app, request, stream_with_context
 from flask.views import MethodView
 from flask_smorest import Blueprint, abort
 from marshmallow import ValidationError
+from redis.exceptions import RedisError
 
 from ..services.recipe_repository import RecipeRepository, RecipeIngredientRepository, RecipeTagRepository
+from ..services.recipe_analysis import analyze_recipe, get_analysis_task, submit_analysis
 from ..schemas.recipe import (
-    RecipeCreateSchema, RecipeUpdateSchema, RecipeResponseSchema,
-    RecipeListSchema, RecipeListQuerySchema, RecipeValidationResponseSchema,
-    RecipeHierarchyResponseSchema, RecipeIngredientUpdateSchema, ErrorResponseSchema
+    RECIPE_CREATE, RECIPE_UPDATE, RECIPE_RESPONSE, RECIPE_LIST, RECIPE_VALIDATION,
+    RECIPE_HIERARCHY, RecipeListQuerySchema, RecipeHierarchyQuerySchema, RecipeHierarchyExportQuerySchema,
+    RecipeIngredientUpdateSchema, ErrorResponseSchema, dump_recipe
 )
 from ..utils.exceptions import (
     RecipeNotFoundError, RecipeIngredientNotFoundError, RecipeValidationError,
     CircularDependencyError, MaxDepthExceededError, TooManyIngredientsError
 )
 from ..models.recipe import RecipeStatus
+from ..utils.cache import (
+    TAGS_KEY, cache_get, cache_set, recipe_key, recipe_by_product_key, recipe_hierarchy_key,
+    recipes_using_product_key
+)
+from ..utils.serialization import json_dumps
 
 logger = structlog.get_logger("recipe_service.resources")
 blp = Blueprint('recipes', __name__, url_prefix='/api/v1/recipes', description='Recipe operations')
 
+# Status query values are validated by RecipeListQuerySchema, plain dict lookup suffices
+_STATUS_MAP = {status.value: status for status in RecipeStatus}
+
+# Repositories only hold the scoped session proxy, so one instance serves every request
+_recipe_repo = RecipeRepository()
+_ingredient_repo = RecipeIngredientRepository()
+_tag_repo = RecipeTagRepository()
+
+
+def _json_response(body) -> Response:
+    """Wrap an already serialized JSON body in a response."""
+    return Response(body, mimetype='application/json')
+
+
+def _etag_response(body) -> Response:
+    """Wrap a serialized JSON body in a response that answers If-None-Match with 304."""
+    data = body.encode() if isinstance(body, str) else body
+    response = Response(data, mimetype='application/json')
+    response.set_etag(hashlib.blake2b(data, digest_size=8).hexdigest())
+    return response.make_conditional(request)
+
 
 @blp.route('/')
 class RecipeCollection(MethodView):
     """Recipe collection endpoints."""
     
-    def __init__(self):
-        self.repository = RecipeRepository()
+    repository = _recipe_repo
     
     @blp.arguments(RecipeListQuerySchema, location='query')
-    @blp.response(200, RecipeListSchema)
+    @blp.response(200, RECIPE_LIST)
     @blp.alt_response(400, schema=ErrorResponseSchema, description='Invalid query parameters')
     def get(self, query_args):
         """Get list of recipes with pagination and filtering.
         
         Retrieve a paginated list of recipes with optional filtering by status
-        or product. Supports pagination with configurable page size.
+        or product. Supports pagination with configurable page size; pass a
+        page's next_cursor as cursor to fetch the following page without OFFSET.
         """
         logger.info("Fetching recipe list", filters=query_args)
         
         try:
             # Convert string enum to enum instance
-            status = None
-            if query_args.get('status'):
-                status = RecipeStatus(query_args['status'])
-            
-            # Get recipes from repository
-            recipes, pagination_meta = self.repository.get_all(
-                page=query_args['page'],
-                per_page=query_args['per_page'],
-                status=status,
-                product_id=query_args.get('product_id'),
-                include_relationships=query_args['include_relationships']
-            )
-            
-            # Convert to dict format and add ingredients count
-            recipes_data = []
-            for recipe in recipes:
-                recipe_dict = recipe.to_dict(include_relationships=query_args['include_relationships'])
-                recipe_dict['ingredients_count'] = recipe.get_total_ingredients_count()
-                recipes_data.append(recipe_dict)
+            status = _STATUS_MAP.get(query_args.get('status'))
+            
+            if query_args['include_relationships']:
+                # Get recipes from repository
+                recipes, pagination_meta = self.repository.get_all(
+                    page=query_args['page'],
+                    per_page=query_args['per_page'],
+                    status=status,
+                    product_id=query_args.get('product_id'),
+                    include_relationships=True,
+                    cursor=query_args.get('cursor')
+                )
+                
+                # Convert to dict format and add ingredients count
+                recipes_data = []
+                for recipe in recipes:
+                    recipe_dict = recipe.to_dict(include_relationships=True)
+                    recipe_dict['ingredients_count'] = recipe.get_total_ingredients_count()
+                    recipes_data.append(recipe_dict)
+            else:
+                # Plain list view: project columns straight into dicts
+                recipes_data, pagination_meta = self.repository.get_all_as_dicts(
+                    page=query_args['page'],
+                    per_page=query_args['per_page'],
+                    status=status,
+                    product_id=query_args.get('product_id'),
+                    cursor=query_args.get('cursor')
+                )
             
             result = {
                 'recipes': recipes_data,
@@ -69,14 +107,18 @@ class RecipeCollection(MethodView):
             }
             
             logger.info("Recipe list fetched successfully", count=len(recipes_data))
+            if not query_args['include_relationships']:
+                # The projected rows already match RecipeListSchema, so encode
+                # them directly instead of re-dumping every field through it
+                return _json_response(json_dumps(result))
             return result
             
         except Exception as e:
             logger.error("Error fetching recipe list", error=str(e))
             abort(500, message="Internal server error while fetching recipes")
     
-    @blp.arguments(RecipeCreateSchema)
-    @blp.response(201, RecipeResponseSchema)
+    @blp.arguments(RECIPE_CREATE)
+    @blp.response(201, RECIPE_RESPONSE)
     @blp.alt_response(400, schema=ErrorResponseSchema, description='Invalid recipe data')
     @blp.alt_response(409, schema=ErrorResponseSchema, description='Recipe validation failed')
     def post(self, recipe_data):
@@ -124,10 +166,9 @@ class RecipeCollection(MethodView):
 class RecipeItem(MethodView):
     """Individual recipe endpoints."""
     
-    def __init__(self):
-        self.repository = RecipeRepository()
+    repository = _recipe_repo
     
-    @blp.response(200, RecipeResponseSchema)
+    @blp.response(200, RECIPE_RESPONSE)
     @blp.alt_response(404, schema=ErrorResponseSchema, description='Recipe not found')
     def get(self, recipe_id):
         """Get a single recipe by ID.
@@ -135,26 +176,34 @@ class RecipeItem(MethodView):
         Retrieve detailed information about a specific recipe including
         its ingredients, tags, and nutritional information.
         """
-        logger.info("Fetching recipe", recipe_id=str(recipe_id))
+        rid = str(recipe_id)
+        logger.info("Fetching recipe", recipe_id=rid)
+        
+        cache_key = recipe_key(recipe_id)
+        cached = cache_get(cache_key)
+        if cached is not None:
+            return _etag_response(cached)
         
         try:
             recipe = self.repository.get_by_id(recipe_id, include_relationships=True)
             
             if not recipe:
-                logger.warning("Recipe not found", recipe_id=str(recipe_id))
+                logger.warning("Recipe not found", recipe_id=rid)
                 abort(404, message=f"Recipe with ID {recipe_id} not found")
             
             result = recipe.to_dict(include_relationships=True)
+            body = json_dumps(dump_recipe(result))
+            cache_set(cache_key, body)
             
-            logger.info("Recipe fetched successfully", recipe_id=str(recipe_id))
-            return result
+            logger.info("Recipe fetched successfully", recipe_id=rid)
+            return _etag_response(body)
             
         except Exception as e:
-            logger.error("Error fetching recipe", recipe_id=str(recipe_id), error=str(e))
+            logger.error("Error fetching recipe", recipe_id=rid, error=str(e))
             abort(500, message="Internal server error while fetching recipe")
     
-    @blp.arguments(RecipeUpdateSchema)
-    @blp.response(200, RecipeResponseSchema)
+    @blp.arguments(RECIPE_UPDATE)
+    @blp.response(200, RECIPE_RESPONSE)
     @blp.alt_response(400, schema=ErrorResponseSchema, description='Invalid recipe data')
     @blp.alt_response(404, schema=ErrorResponseSchema, description='Recipe not found')
     @blp.alt_response(409, schema=ErrorResponseSchema, description='Validation failed')
@@ -164,7 +213,8 @@ class RecipeItem(MethodView):
         Update an existing recipe with the provided data. Only provided fields
         will be updated. Validates circular dependencies and ingredient existence.
         """
-        logger.info("Updating recipe", recipe_id=str(recipe_id), data=recipe_data)
+        rid = str(recipe_id)
+        logger.info("Updating recipe", recipe_id=rid, data=recipe_data)
         
         try:
             # TODO: Get user ID from authentication context
@@ -175,30 +225,30 @@ class RecipeItem(MethodView):
             # Return updated recipe with relationships
             result = recipe.to_dict(include_relationships=True)
             
-            logger.info("Recipe updated successfully", recipe_id=str(recipe_id))
+            logger.info("Recipe updated successfully", recipe_id=rid)
             return result
             
         except RecipeNotFoundError as e:
-            logger.warning("Recipe update failed - not found", recipe_id=str(recipe_id))
+            logger.warning("Recipe update failed - not found", recipe_id=rid)
             abort(404, message=str(e))
         except RecipeValidationError as e:
             logger.warning("Recipe update failed - validation error", 
-                         recipe_id=str(recipe_id), 
+                         recipe_id=rid, 
                          errors=getattr(e, 'errors', {}))
             abort(400, message=str(e))
         except CircularDependencyError as e:
-            logger.warning("Recipe update failed - circular dependency", recipe_id=str(recipe_id))
+            logger.warning("Recipe update failed - circular dependency", recipe_id=rid)
             abort(409, message=str(e))
         except MaxDepthExceededError as e:
-            logger.warning("Recipe update failed - max depth exceeded", recipe_id=str(recipe_id))
+            logger.warning("Recipe update failed - max depth exceeded", recipe_id=rid)
             abort(400, message=str(e))
         except ValidationError as e:
             logger.warning("Recipe update failed - schema validation", 
-                         recipe_id=str(recipe_id), 
+                         recipe_id=rid, 
                          errors=e.messages)
             abort(400, message="Validation failed", details=e.messages)
         except Exception as e:
-            logger.error("Error updating recipe", recipe_id=str(recipe_id), error=str(e))
+            logger.error("Error updating recipe", recipe_id=rid, error=str(e))
             abort(500, message="Internal server error while updating recipe")
     
     @blp.response(204)
@@ -209,56 +259,99 @@ class RecipeItem(MethodView):
         Permanently delete a recipe. This action cannot be undone.
         All ingredients and version history will also be removed.
         """
-        logger.info("Deleting recipe", recipe_id=str(recipe_id))
+        rid = str(recipe_id)
+        logger.info("Deleting recipe", recipe_id=rid)
         
         try:
             success = self.repository.delete(recipe_id)
             
             if not success:
-                logger.warning("Recipe deletion failed - not found", recipe_id=str(recipe_id))
+                logger.warning("Recipe deletion failed - not found", recipe_id=rid)
                 abort(404, message=f"Recipe with ID {recipe_id} not found")
             
-            logger.info("Recipe deleted successfully", recipe_id=str(recipe_id))
+            logger.info("Recipe deleted successfully", recipe_id=rid)
             return '', 204
             
         except Exception as e:
-            logger.error("Error deleting recipe", recipe_id=str(recipe_id), error=str(e))
+            logger.error("Error deleting recipe", recipe_id=rid, error=str(e))
             abort(500, message="Internal server error while deleting recipe")
 
 
+@blp.route('/<uuid:recipe_id>/versions')
+class RecipeVersionCollection(MethodView):
+    """Recipe version history endpoints."""
+    
+    repository = _recipe_repo
+    
+    @blp.response(200, schema={'type': 'array', 'items': {'type': 'object'}})
+    @blp.alt_response(404, schema=ErrorResponseSchema, description='Recipe not found')
+    def get(self, recipe_id):
+        """Get the version history of a recipe.
+        
+        Stream every stored version snapshot of the recipe, newest first, as
+        a JSON array.
+        """
+        rid = str(recipe_id)
+        logger.info("Fetching recipe versions", recipe_id=rid)
+        
+        if not self.repository.get_by_id(recipe_id):
+            logger.warning("Recipe not found", recipe_id=rid)
+            abort(404, message=f"Recipe with ID {recipe_id} not found")
+        
+        versions = self.repository.iter_versions(recipe_id)
+        
+        def generate():
+            # Emit the array one snapshot at a time
+            yield '['
+            separator = ''
+            for version in versions:
+                yield separator + json_dumps(version)
+                separator = ','
+            yield ']'
+        
+        return Response(stream_with_context(generate()), mimetype='application/json')
+
+
 @blp.route('/by-product/<uuid:product_id>')
 class RecipeByProduct(MethodView):
     """Recipe by product endpoints."""
     
-    def __init__(self):
-        self.repository = RecipeRepository()
+    repository = _recipe_repo
     
-    @blp.response(200, RecipeResponseSchema)
+    @blp.response(200, RECIPE_RESPONSE)
     @blp.alt_response(404, schema=ErrorResponseSchema, description='Recipe not found')
     def get(self, product_id):
         """Get recipe by product ID.
         
         Retrieve the active recipe for a specific product.
         """
-        logger.info("Fetching recipe by product", product_id=str(product_id))
+        pid = str(product_id)
+        logger.info("Fetching recipe by product", product_id=pid)
+        
+        cache_key = recipe_by_product_key(product_id)
+        cached = cache_get(cache_key)
+        if cached is not None:
+            return _etag_response(cached)
         
         try:
             recipe = self.repository.get_by_product_id(product_id, include_relationships=True)
             
             if not recipe:
-                logger.warning("Recipe not found for product", product_id=str(product_id))
+                logger.warning("Recipe not found for product", product_id=pid)
                 abort(404, message=f"No active recipe found for product {product_id}")
             
             result = recipe.to_dict(include_relationships=True)
+            body = json_dumps(dump_recipe(result))
+            cache_set(cache_key, body)
             
             logger.info("Recipe fetched by product successfully", 
                        recipe_id=str(recipe.id), 
-                       product_id=str(product_id))
-            return result
+                       product_id=pid)
+            return _etag_response(body)
             
         except Exception as e:
             logger.error("Error fetching recipe by product", 
-                        product_id=str(product_id), 
+                        product_id=pid, 
                         error=str(e))
             abort(500, message="Internal server error while fetching recipe")
 
@@ -267,10 +360,9 @@ class RecipeByProduct(MethodView):
 class RecipeValidation(MethodView):
     """Recipe validation endpoints."""
     
-    def __init__(self):
-        self.repository = RecipeRepository()
+    repository = _recipe_repo
     
-    @blp.response(200, RecipeValidationResponseSchema)
+    @blp.response(200, RECIPE_VALIDATION)
     @blp.alt_response(404, schema=ErrorResponseSchema, description='Recipe not found')
     def get(self, recipe_id):
         """Validate a recipe.
@@ -278,42 +370,41 @@ class RecipeValidation(MethodView):
         Perform comprehensive validation of a recipe including business rules,
         circular dependency checking, and ingredient validation.
         """
-        logger.info("Validating recipe", recipe_id=str(recipe_id))
+        rid = str(recipe_id)
+        logger.info("Validating recipe", recipe_id=rid)
         
         try:
-            # Check if recipe exists
-            recipe = self.repository.get_by_id(recipe_id)
-            if not recipe:
-                logger.warning("Recipe validation failed - not found", recipe_id=str(recipe_id))
-                abort(404, message=f"Recipe with ID {recipe_id} not found")
-            
-            # Perform validation
+            # Validation returns None for unknown recipes
             validation_result = self.repository.validate_recipe(recipe_id)
-            validation_result['recipe_id'] = str(recipe_id)
-            
-            logger.info("Recipe validation completed", 
-                       recipe_id=str(recipe_id),
-                       is_valid=validation_result['is_valid'],
-                       errors_count=len(validation_result['validation_errors']))
-            
-            return validation_result
-            
         except Exception as e:
-            logger.error("Error validating recipe", recipe_id=str(recipe_id), error=str(e))
+            logger.error("Error validating recipe", recipe_id=rid, error=str(e))
             abort(500, message="Internal server error while validating recipe")
+        
+        if validation_result is None:
+            logger.warning("Recipe validation failed - not found", recipe_id=rid)
+            abort(404, message=f"Recipe with ID {recipe_id} not found")
+        
+        validation_result['recipe_id'] = recipe_id
+        
+        logger.info("Recipe validation completed", 
+                   recipe_id=rid,
+                   is_valid=validation_result['is_valid'],
+                   errors_count=len(validation_result['validation_errors']))
+        
+        return validation_result
 
 
 @blp.route('/<uuid:recipe_id>/hierarchy')
 class RecipeHierarchy(MethodView):
     """Recipe hierarchy endpoints."""
     
-    def __init__(self):
-        self.repository = RecipeRepository()
+    repository = _recipe_repo
     
-    @blp.response(200, RecipeHierarchyResponseSchema)
+    @blp.arguments(RecipeHierarchyQuerySchema, location='query', error_status_code=400)
+    @blp.response(200, RECIPE_HIERARCHY)
     @blp.alt_response(404, schema=ErrorResponseSchema, description='Recipe not found')
     @blp.alt_response(400, schema=ErrorResponseSchema, description='Hierarchy depth exceeded')
-    def get(self, recipe_id):
+    def get(self, query_args, recipe_id):
         """Get recipe hierarchy expansion.
         
         Retrieve the hierarchical expansion of a recipe, showing all nested
@@ -325,18 +416,21 @@ class RecipeHierarchy(MethodView):
         - target_quantity: Scale ingredients to this quantity
         - target_unit: Unit for target quantity (piece/gram)
         """
-        logger.info("Getting recipe hierarchy", recipe_id=str(recipe_id))
+        rid = str(recipe_id)
+        logger.info("Getting recipe hierarchy", recipe_id=rid)
+        
+        max_depth = query_args['max_depth']
+        include_product_details = query_args['include_product_details']
+        target_quantity = query_args.get('target_quantity')
+        target_unit = query_args.get('target_unit')
         
         try:
-            # Get query parameters
-            max_depth = int(request.args.get('max_depth', 10))
-            include_product_details = request.args.get('include_product_details', 'true').lower() == 'true'
-            target_quantity = request.args.get('target_quantity')
-            target_unit = request.args.get('target_unit')
-            
-            # Validate parameters
-            if max_depth < 1 or max_depth > 20:
-                abort(400, message="max_depth must be between 1 and 20")
+            cache_key = recipe_hierarchy_key(
+                recipe_id, max_depth, include_product_details, target_quantity, target_unit
+            )
+            cached = cache_get(cache_key)
+            if cached is not None:
+                return _etag_response(cached)
             
             # Get base hierarchy
             hierarchy = self.repository.get_recipe_hierarchy(
@@ -347,41 +441,36 @@ class RecipeHierarchy(MethodView):
             
             # Apply quantity scaling if requested
             if target_quantity is not None:
-                try:
-                    target_qty = float(target_quantity)
-                    if target_qty <= 0:
-                        abort(400, message="target_quantity must be positive")
+                # Get recipe for scaling calculation
+                recipe = self.repository.get_by_id(recipe_id)
+                if recipe and recipe.yield_quantity:
+                    scale_factor = target_quantity / float(recipe.yield_quantity)
+                    
+                    # Scaling fields are the same for every item, build them once
+                    scaling = {
+                        'scaled_for_quantity': target_quantity,
+                        'scaled_for_unit': target_unit or recipe.yield_unit.value if recipe.yield_unit else None,
+                        'scale_factor': scale_factor
+                    }
                     
-                    # Get recipe for scaling calculation
-                    recipe = self.repository.get_by_id(recipe_id)
-                    if recipe and recipe.yield_quantity:
-                        scale_factor = target_qty / float(recipe.yield_quantity)
-                        
-                        # Scale all quantities in hierarchy
-                        for item in hierarchy:
-                            item['quantity'] = round(float(item['quantity']) * scale_factor, 3)
-                            item['scaled_for_quantity'] = target_qty
-                            item['scaled_for_unit'] = target_unit or recipe.yield_unit.value if recipe.yield_unit else None
-                            item['scale_factor'] = scale_factor
-                    else:
-                        abort(400, message="Recipe must have yield_quantity for scaling")
-                        
-                except ValueError:
-                    abort(400, message="target_quantity must be a valid number")
-            
-            # Calculate maximum actual depth
-            max_actual_depth = max([item['depth_level'] for item in hierarchy], default=0)
-            
-            # Group by depth level for better organization
-            hierarchy_by_depth = {}
+                    # Scale all quantities in hierarchy (already floats from the repository)
+                    for item in hierarchy:
+                        item['quantity'] = round(item['quantity'] * scale_factor, 3)
+                        item.update(scaling)
+                else:
+                    abort(400, message="Recipe must have yield_quantity for scaling")
+            
+            # Group by depth level for better organization, tracking the maximum depth
+            max_actual_depth = 0
+            hierarchy_by_depth = defaultdict(list)
             for item in hierarchy:
                 depth = item['depth_level']
-                if depth not in hierarchy_by_depth:
-                    hierarchy_by_depth[depth] = []
                 hierarchy_by_depth[depth].append(item)
+                if depth > max_actual_depth:
+                    max_actual_depth = depth
             
             result = {
-                'recipe_id': str(recipe_id),
+                'recipe_id': recipe_id,
                 'hierarchy': hierarchy,
                 'hierarchy_by_depth': hierarchy_by_depth,
                 'max_depth': max_actual_depth,
@@ -390,39 +479,87 @@ class RecipeHierarchy(MethodView):
                 'parameters': {
                     'max_depth': max_depth,
                     'include_product_details': include_product_details,
-                    'target_quantity': float(target_quantity) if target_quantity else None,
+                    'target_quantity': target_quantity,
                     'target_unit': target_unit
                 }
             }
             
             logger.info("Recipe hierarchy retrieved successfully", 
-                       recipe_id=str(recipe_id),
+                       recipe_id=rid,
                        hierarchy_items=len(hierarchy),
                        max_depth=max_actual_depth,
                        scaling_applied=target_quantity is not None)
             
-            return result
+            # The result is built in the schema's shape already, skip the dump
+            body = json_dumps(result)
+            cache_set(cache_key, body, current_app.config['HIERARCHY_CACHE_TTL'])
+            return _etag_response(body)
             
         except RecipeNotFoundError as e:
-            logger.warning("Recipe hierarchy failed - not found", recipe_id=str(recipe_id))
+            logger.warning("Recipe hierarchy failed - not found", recipe_id=rid)
             abort(404, message=str(e))
         except MaxDepthExceededError as e:
-            logger.warning("Recipe hierarchy failed - depth exceeded", recipe_id=str(recipe_id))
+            logger.warning("Recipe hierarchy failed - depth exceeded", recipe_id=rid)
             abort(400, message=str(e))
-        except ValueError as e:
-            logger.warning("Recipe hierarchy failed - invalid parameter", recipe_id=str(recipe_id))
-            abort(400, message="Invalid query parameter")
         except Exception as e:
-            logger.error("Error getting recipe hierarchy", recipe_id=str(recipe_id), error=str(e))
+            logger.error("Error getting recipe hierarchy", recipe_id=rid, error=str(e))
             abort(500, message="Internal server error while getting recipe hierarchy")
 
 
+@blp.route('/<uuid:recipe_id>/hierarchy/export')
+class RecipeHierarchyExport(MethodView):
+    """Recipe hierarchy export endpoints."""
+    
+    repository = _recipe_repo
+    
+    @blp.arguments(RecipeHierarchyExportQuerySchema, location='query', error_status_code=400)
+    @blp.response(200, schema={'type': 'string'}, content_type='application/x-ndjson')
+    @blp.alt_response(404, schema=ErrorResponseSchema, description='Recipe not found')
+    @blp.alt_response(400, schema=ErrorResponseSchema, description='Hierarchy depth exceeded')
+    def get(self, query_args, recipe_id):
+        """Export recipe hierarchy expansion.
+        
+        Stream the expanded ingredients as newline-delimited JSON, one item per
+        line, without holding the hierarchy in memory. Intended for reports and
+        exports of large hierarchies; grouping, scaling and caching are only
+        done by the hierarchy endpoint.
+        """
+        rid = str(recipe_id)
+        logger.info("Exporting recipe hierarchy", recipe_id=rid)
+        
+        try:
+            items = self.repository.iter_recipe_hierarchy(
+                recipe_id,
+                query_args['max_depth'],
+                query_args['include_product_details']
+            )
+            # Read the first item before responding, so an exceeded depth is still a 400
+            first = next(items, None)
+        except RecipeNotFoundError as e:
+            logger.warning("Recipe hierarchy export failed - not found", recipe_id=rid)
+            abort(404, message=str(e))
+        except MaxDepthExceededError as e:
+            logger.warning("Recipe hierarchy export failed - depth exceeded", recipe_id=rid)
+            abort(400, message=str(e))
+        except Exception as e:
+            logger.error("Error exporting recipe hierarchy", recipe_id=rid, error=str(e))
+            abort(500, message="Internal server error while exporting recipe hierarchy")
+        
+        def generate():
+            if first is None:
+                return
+            yield json_dumps(first) + '\n'
+            for item in items:
+                yield json_dumps(item) + '\n'
+        
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
 @blp.route('/<uuid:recipe_id>/ingredients/<uuid:ingredient_id>')
 class RecipeIngredientItem(MethodView):
     """Individual recipe ingredient endpoints."""
     
-    def __init__(self):
-        self.repository = RecipeIngredientRepository()
+    repository = _ingredient_repo
     
     @blp.arguments(RecipeIngredientUpdateSchema)
     @blp.response(200, schema={'type': 'object'})
@@ -438,17 +575,6 @@ class RecipeIngredientItem(MethodView):
         
         try:
             ingredient = self.repository.update(ingredient_id, ingredient_data)
-            
-            result = ingredient.to_dict()
-            
-            logger.info("Recipe ingredient updated successfully", 
-                       ingredient_id=str(ingredient_id))
-            return result
-            
-        except RecipeIngredientNotFoundError as e:
-            logger.warning("Recipe ingredient update failed - not found", 
-                         ingredient_id=str(ingredient_id))
-            abort(404, message=str(e))
         except ValidationError as e:
             logger.warning("Recipe ingredient update failed - validation error", 
                          ingredient_id=str(ingredient_id), 
@@ -459,6 +585,15 @@ class RecipeIngredientItem(MethodView):
                         ingredient_id=str(ingredient_id), 
                         error=str(e))
             abort(500, message="Internal server error while updating ingredient")
+        
+        if ingredient is None:
+            logger.warning("Recipe ingredient update failed - not found", 
+                         ingredient_id=str(ingredient_id))
+            abort(404, message=str(RecipeIngredientNotFoundError(str(ingredient_id))))
+        
+        logger.info("Recipe ingredient updated successfully", 
+                   ingredient_id=str(ingredient_id))
+        return ingredient.to_dict()
     
     @blp.response(204)
     @blp.alt_response(404, schema=ErrorResponseSchema, description='Ingredient not found')
@@ -473,29 +608,28 @@ class RecipeIngredientItem(MethodView):
         
         try:
             success = self.repository.delete(ingredient_id)
-            
-            if not success:
-                logger.warning("Recipe ingredient deletion failed - not found", 
-                             ingredient_id=str(ingredient_id))
-                abort(404, message=f"Ingredient with ID {ingredient_id} not found")
-            
-            logger.info("Recipe ingredient deleted successfully", 
-                       ingredient_id=str(ingredient_id))
-            return '', 204
-            
         except Exception as e:
             logger.error("Error deleting recipe ingredient", 
                         ingredient_id=str(ingredient_id), 
                         error=str(e))
             abort(500, message="Internal server error while deleting ingredient")
+        
+        # Aborted outside the try, which would otherwise turn the 404 into a 500
+        if not success:
+            logger.warning("Recipe ingredient deletion failed - not found", 
+                         ingredient_id=str(ingredient_id))
+            abort(404, message=f"Ingredient with ID {ingredient_id} not found")
+        
+        logger.info("Recipe ingredient deleted successfully", 
+                   ingredient_id=str(ingredient_id))
+        return '', 204
 
 
 @blp.route('/tags')
 class RecipeTagCollection(MethodView):
     """Recipe tag collection endpoints."""
     
-    def __init__(self):
-        self.repository = RecipeTagRepository()
+    repository = _tag_repo
     
     @blp.response(200, schema={'type': 'array', 'items': {'$ref': '#/components/schemas/RecipeTag'}})
     def get(self):
@@ -505,12 +639,18 @@ class RecipeTagCollection(MethodView):
         """
         logger.info("Fetching all recipe tags")
         
+        cached = cache_get(TAGS_KEY)
+        if cached is not None:
+            return _json_response(cached)
+        
         try:
             tags = self.repository.get_all()
             result = [tag.to_dict() for tag in tags]
+            body = json_dumps(result)
+            cache_set(TAGS_KEY, body, current_app.config['TAGS_CACHE_TTL'])
             
             logger.info("Recipe tags fetched successfully", count=len(result))
-            return result
+            return _json_response(body)
             
         except Exception as e:
             logger.error("Error fetching recipe tags", error=str(e))
@@ -521,107 +661,89 @@ class RecipeTagCollection(MethodView):
 class RecipeAnalysis(MethodView):
     """Recipe analysis endpoints."""
     
-    def __init__(self):
-        self.repository = RecipeRepository()
+    repository = _recipe_repo
     
     @blp.response(200, schema={'type': 'object'})
+    @blp.alt_response(202, schema={'type': 'object'}, description='Analysis queued (async=true)')
     @blp.alt_response(404, schema=ErrorResponseSchema, description='Recipe not found')
     def get(self, recipe_id):
         """Get comprehensive recipe analysis.
         
         Provides detailed analysis including complexity metrics, dependency analysis,
         and hierarchical structure information for recipe optimization.
+        
+        With ``async=true`` the analysis runs in the background and a task ID is
+        returned; poll ``/api/v1/recipes/analysis/tasks/<task_id>`` for the result.
         """
-        logger.info("Analyzing recipe", recipe_id=str(recipe_id))
+        rid = str(recipe_id)
+        logger.info("Analyzing recipe", recipe_id=rid)
         
-        try:
-            # Check if recipe exists
-            recipe = self.repository.get_by_id(recipe_id)
-            if not recipe:
-                logger.warning("Recipe analysis failed - not found", recipe_id=str(recipe_id))
+        if request.args.get('async', '').lower() in ('1', 'true'):
+            if not self.repository.get_by_id(recipe_id):
+                logger.warning("Recipe analysis failed - not found", recipe_id=rid)
                 abort(404, message=f"Recipe with ID {recipe_id} not found")
             
-            # Get complexity metrics
-            complexity = self.repository.get_recipe_complexity_metrics(recipe_id)
-            
-            # Get dependencies
-            dependencies = self.repository.get_recipe_dependencies(recipe_id)
-            
-            # Get hierarchy for analysis
-            hierarchy = self.repository.get_recipe_hierarchy(recipe_id, max_depth=20, include_product_details=True)
-            
-            # Analyze ingredient distribution by unit
-            unit_distribution = {}
-            for item in hierarchy:
-                unit = item['unit']
-                if unit not in unit_distribution:
-                    unit_distribution[unit] = {'count': 0, 'total_quantity': 0}
-                unit_distribution[unit]['count'] += 1
-                unit_distribution[unit]['total_quantity'] += float(item['quantity'])
-            
-            # Analyze depth distribution
-            depth_distribution = {}
-            for item in hierarchy:
-                depth = item['depth_level']
-                if depth not in depth_distribution:
-                    depth_distribution[depth] = 0
-                depth_distribution[depth] += 1
-            
-            # Performance insights
-            performance_insights = []
-            
-            if complexity['hierarchy_depth'] > 5:
-                performance_insights.append({
-                    'type': 'warning',
-                    'message': 'Deep hierarchy may impact calculation performance',
-                    'recommendation': 'Consider flattening some sub-recipes'
-                })
-            
-            if complexity['ingredient_count'] > 20:
-                performance_insights.append({
-                    'type': 'info',
-                    'message': 'Large number of direct ingredients',
-                    'recommendation': 'Consider grouping ingredients logically'
-                })
-            
-            if len(hierarchy) > 50:
-                performance_insights.append({
-                    'type': 'warning',
-                    'message': 'Large expanded ingredient count may slow calculations',
-                    'recommendation': 'Review recipe structure for optimization'
-                })
-            
-            result = {
-                'recipe_id': str(recipe_id),
-                'complexity_metrics': complexity,
-                'dependencies': dependencies,
-                'hierarchy_analysis': {
-                    'total_expanded_ingredients': len(hierarchy),
-                    'unit_distribution': unit_distribution,
-                    'depth_distribution': depth_distribution
-                },
-                'performance_insights': performance_insights,
-                'analysis_timestamp': datetime.utcnow().isoformat()
-            }
-            
-            logger.info("Recipe analysis completed", 
-                       recipe_id=str(recipe_id),
-                       complexity_level=complexity['complexity_level'],
-                       total_ingredients=len(hierarchy))
-            
-            return result
-            
+            task_id = submit_analysis(current_app._get_current_object(), recipe_id)
+            if task_id is not None:
+                return {
+                    'task_id': task_id,
+                    'status': 'PENDING',
+                    'status_url': f'{blp.url_prefix}/analysis/tasks/{task_id}'
+                }, 202
+            # No task store available, fall back to analyzing inline
+        
+        try:
+            result = analyze_recipe(self.repository, recipe_id)
+        except RecipeNotFoundError:
+            logger.warning("Recipe analysis failed - not found", recipe_id=rid)
+            abort(404, message=f"Recipe with ID {recipe_id} not found")
         except Exception as e:
-            logger.error("Error analyzing recipe", recipe_id=str(recipe_id), error=str(e))
+            logger.error("Error analyzing recipe", recipe_id=rid, error=str(e))
             abort(500, message="Internal server error while analyzing recipe")
+        
+        logger.info("Recipe analysis completed", 
+                   recipe_id=rid,
+                   complexity_level=result['complexity_metrics']['complexity_level'],
+                   total_ingredients=result['hierarchy_analysis']['total_expanded_ingredients'])
+        
+        return result
+
+
+@blp.route('/analysis/tasks/<string:task_id>')
+class RecipeAnalysisTask(MethodView):
+    """Background recipe analysis task endpoints."""
+    
+    @blp.response(200, schema={'type': 'object'})
+    @blp.alt_response(202, schema={'type': 'object'}, description='Analysis still running')
+    @blp.alt_response(404, schema=ErrorResponseSchema, description='Task not found or expired')
+    def get(self, task_id):
+        """Get the state of a background recipe analysis.
+        
+        Returns 202 while the analysis is pending and the analysis result once
+        it has finished.
+        """
+        try:
+            task = get_analysis_task(task_id)
+        except RedisError as e:
+            logger.error("Error reading analysis task", task_id=task_id, error=str(e))
+            abort(503, message="Analysis task store unavailable")
+        
+        if task is None:
+            abort(404, message=f"Analysis task {task_id} not found")
+        
+        if task['status'] == 'PENDING':
+            return task, 202
+        if task['status'] == 'FAILURE':
+            abort(task.get('status_code', 500), message=task['error'])
+        
+        return task['result']
 
 
 @blp.route('/product/<uuid:product_id>')  
 class RecipesByProduct(MethodView):
     """Recipes by product endpoints."""
     
-    def __init__(self):
-        self.repository = RecipeRepository()
+    repository = _recipe_repo
     
     @blp.response(200, schema={'type': 'object'})
     @blp.alt_response(404, schema=ErrorResponseSchema, description='No recipes found')
@@ -631,55 +753,57 @@ class RecipesByProduct(MethodView):
         Retrieve all recipes where the specified product is used as an ingredient,
         useful for impact analysis when modifying products.
         """
-        logger.info("Finding recipes using product", product_id=str(product_id))
+        pid = str(product_id)
+        logger.info("Finding recipes using product", product_id=pid)
+        
+        cache_key = recipes_using_product_key(product_id)
+        cached = cache_get(cache_key)
+        if cached is not None:
+            return _json_response(cached)
         
         try:
             recipes = self.repository.get_recipes_using_product(product_id)
             
             if not recipes:
-                logger.info("No recipes found using product", product_id=str(product_id))
+                logger.info("No recipes found using product", product_id=pid)
                 return {
-                    'product_id': str(product_id),
+                    'product_id': product_id,
                     'recipes': [],
                     'total_count': 0
                 }
             
             # Convert to response format
             recipes_data = []
-            for recipe in recipes:
+            for recipe, ingredient in recipes:
                 recipe_dict = recipe.to_dict(include_relationships=False)
                 # Add usage details
-                ingredient = None
-                for ing in recipe.ingredients:
-                    if str(ing.ingredient_product_id) == str(product_id):
-                        ingredient = ing
-                        break
-                
-                if ingredient:
-                    recipe_dict['usage_details'] = {
-                        'quantity': float(ingredient.quantity),
-                        'unit': ingredient.unit.value,
-                        'is_optional': ingredient.is_optional,
-                        'ingredient_group': ingredient.ingredient_group,
-                        'notes': ingredient.notes
-                    }
+                recipe_dict['usage_details'] = {
+                    'quantity': float(ingredient.quantity),
+                    'unit': ingredient.unit.value,
+                    'is_optional': ingredient.is_optional,
+                    'ingredient_group': ingredient.ingredient_group,
+                    'notes': ingredient.notes
+                }
                 
                 recipes_data.append(recipe_dict)
             
             result = {
-                'product_id': str(product_id),
+                'product_id': product_id,
                 'recipes': recipes_data,
                 'total_count': len(recipes_data)
             }
             
+            body = json_dumps(result)
+            cache_set(cache_key, body)
+            
             logger.info("Recipes using product found", 
-                       product_id=str(product_id),
+                       product_id=pid,
                        recipe_count=len(recipes_data))
             
-            return result
+            return _json_response(body)
             
         except Exception as e:
             logger.error("Error finding recipes using product", 
-                        product_id=str(product_id), 
+                        product_id=pid, 
                         error=str(e))
             abort(500, message="Internal server error while finding recipes")
\ No newline at end of file
@@ -1,44 +1,54 @@
 """Recipe API schemas for request/response validation."""
+from deepfriedmarshmallow import deep_fry_schema_object
 from marshmallow import Schema, fields, validate, validates, ValidationError, post_load, pre_load
 from marshmallow_sqlalchemy import SQLAlchemyAutoSchema
 from uuid import UUID
 from decimal import Decimal
 
 from ..models.recipe import Recipe, RecipeIngredient, RecipeTag, RecipeStatus, IngredientUnit
+from ..utils.pagination import decode_cursor
 
 
-class RecipeStatusField(fields.Field):
-    """Custom field for RecipeStatus enum."""
-    
-    def _serialize(self, value, attr, obj, **kwargs):
-        if value is None:
-            return None
-        return value.value
-    
-    def _deserialize(self, value, attr, data, **kwargs):
-        if value is None:
-            return None
-        try:
-            return RecipeStatus(value)
-        except ValueError:
-            raise ValidationError(f"Invalid recipe status: {value}")
+# Validators are stateless, so one instance of each is shared by every schema
+_UNIT_VALUES = tuple(u.value for u in IngredientUnit)
+_STATUS_VALUES = tuple(s.value for s in RecipeStatus)
+_UNIT_VALIDATOR = validate.OneOf(_UNIT_VALUES)
+_STATUS_VALIDATOR = validate.OneOf(_STATUS_VALUES)
+_NAME_LENGTH = validate.Length(min=1, max=255)
+_GROUP_LENGTH = validate.Length(max=100)
+_TAG_NAME_LENGTH = validate.Length(min=1, max=50)
+_NON_EMPTY = validate.Length(min=1)
+_AT_LEAST_ONE = validate.Range(min=1)
+_POSITIVE_QUANTITY = validate.Range(min=0.001)
+_NON_NEGATIVE = validate.Range(min=0)
 
 
-class IngredientUnitField(fields.Field):
-    """Custom field for IngredientUnit enum."""
-    
-    def _serialize(self, value, attr, obj, **kwargs):
-        if value is None:
-            return None
-        return value.value
-    
-    def _deserialize(self, value, attr, data, **kwargs):
-        if value is None:
-            return None
-        try:
-            return IngredientUnit(value)
-        except ValueError:
-            raise ValidationError(f"Invalid ingredient unit: {value}")
+_HEX_DIGITS = frozenset('0123456789abcdefABCDEF')
+
+
+def _validate_hex_color(value):
+    """Validate a #RRGGBB color code."""
+    if not (len(value) == 7 and value[0] == '#' and _HEX_DIGITS.issuperset(value[1:])):
+        raise ValidationError('Color must be a valid hex color code (e.g., #FF0000)')
+
+
+def _validate_cursor(value):
+    """Validate a keyset pagination cursor."""
+    try:
+        decode_cursor(value)
+    except ValueError:
+        raise ValidationError('Invalid pagination cursor')
+
+
+def _check_duplicate_ingredients(ingredients):
+    """Raise on the first ingredient product that appears twice."""
+    seen = set()
+    add = seen.add
+    for ingredient in ingredients:
+        product_id = ingredient.get('ingredient_product_id')
+        if product_id in seen:
+            raise ValidationError("Duplicate ingredients are not allowed")
+        add(product_id)
 
 
 class RecipeIngredientSchema(Schema):
@@ -52,22 +62,22 @@ class RecipeIngredientSchema(Schema):
     )
     quantity = fields.Decimal(
         required=True,
-        validate=validate.Range(min=0.001),
+        validate=_POSITIVE_QUANTITY,
         metadata={'description': 'Quantity of ingredient needed'}
     )
     unit = fields.Str(
         required=True,
-        validate=validate.OneOf([u.value for u in IngredientUnit]),
+        validate=_UNIT_VALIDATOR,
         metadata={'description': 'Unit of measurement'}
     )
     sort_order = fields.Int(
-        validate=validate.Range(min=0),
+        validate=_NON_NEGATIVE,
         missing=0,
         metadata={'description': 'Display order of ingredient'}
     )
     ingredient_group = fields.Str(
         allow_none=True,
-        validate=validate.Length(max=100),
+        validate=_GROUP_LENGTH,
         metadata={'description': 'Optional grouping (e.g., "Base", "Seasoning")'}
     )
     notes = fields.Str(
@@ -97,13 +107,10 @@ class RecipeTagSchema(Schema):
     """Schema for RecipeTag."""
     
     id = fields.UUID(dump_only=True)
-    name = fields.Str(required=True, validate=validate.Length(min=1, max=50))
+    name = fields.Str(required=True, validate=_TAG_NAME_LENGTH)
     color = fields.Str(
         allow_none=True,
-        validate=validate.Regexp(
-            r'^#[0-9A-Fa-f]{6}$',
-            error='Color must be a valid hex color code (e.g., #FF0000)'
-        )
+        validate=_validate_hex_color
     )
     description = fields.Str(allow_none=True)
     created_at = fields.DateTime(dump_only=True)
@@ -113,13 +120,13 @@ class RecipeNutritionSchema(Schema):
     """Schema for RecipeNutrition."""
     
     recipe_id = fields.UUID(dump_only=True)
-    calories = fields.Decimal(allow_none=True, validate=validate.Range(min=0))
-    protein = fields.Decimal(allow_none=True, validate=validate.Range(min=0))
-    carbohydrates = fields.Decimal(allow_none=True, validate=validate.Range(min=0))
-    fat = fields.Decimal(allow_none=True, validate=validate.Range(min=0))
-    fiber = fields.Decimal(allow_none=True, validate=validate.Range(min=0))
-    sugar = fields.Decimal(allow_none=True, validate=validate.Range(min=0))
-    sodium = fields.Decimal(allow_none=True, validate=validate.Range(min=0))
+    calories = fields.Decimal(allow_none=True, validate=_NON_NEGATIVE)
+    protein = fields.Decimal(allow_none=True, validate=_NON_NEGATIVE)
+    carbohydrates = fields.Decimal(allow_none=True, validate=_NON_NEGATIVE)
+    fat = fields.Decimal(allow_none=True, validate=_NON_NEGATIVE)
+    fiber = fields.Decimal(allow_none=True, validate=_NON_NEGATIVE)
+    sugar = fields.Decimal(allow_none=True, validate=_NON_NEGATIVE)
+    sodium = fields.Decimal(allow_none=True, validate=_NON_NEGATIVE)
     calculated_at = fields.DateTime(dump_only=True)
     calculation_method = fields.Str(
         allow_none=True,
@@ -136,7 +143,7 @@ class RecipeCreateSchema(Schema):
     )
     name = fields.Str(
         required=True,
-        validate=validate.Length(min=1, max=255),
+        validate=_NAME_LENGTH,
         metadata={'description': 'Recipe name'}
     )
     description = fields.Str(
@@ -144,23 +151,23 @@ class RecipeCreateSchema(Schema):
         metadata={'description': 'Recipe description'}
     )
     status = fields.Str(
-        validate=validate.OneOf([s.value for s in RecipeStatus]),
+        validate=_STATUS_VALIDATOR,
         missing='draft',
         metadata={'description': 'Recipe status: draft, active, archived, deprecated'}
     )
     yield_quantity = fields.Decimal(
         allow_none=True,
-        validate=validate.Range(min=0.001),
+        validate=_POSITIVE_QUANTITY,
         metadata={'description': 'Expected yield quantity'}
     )
     yield_unit = fields.Str(
         allow_none=True,
-        validate=validate.OneOf([u.value for u in IngredientUnit]),
+        validate=_UNIT_VALIDATOR,
         metadata={'description': 'Unit for yield quantity'}
     )
     preparation_time = fields.Int(
         allow_none=True,
-        validate=validate.Range(min=1),
+        validate=_AT_LEAST_ONE,
         metadata={'description': 'Preparation time in minutes'}
     )
     notes = fields.Str(
@@ -170,7 +177,7 @@ class RecipeCreateSchema(Schema):
     ingredients = fields.List(
         fields.Nested(RecipeIngredientSchema),
         required=True,
-        validate=validate.Length(min=1),
+        validate=_NON_EMPTY,
         metadata={'description': 'List of recipe ingredients'}
     )
     tag_ids = fields.List(
@@ -195,11 +202,7 @@ class RecipeCreateSchema(Schema):
         """Validate ingredients list."""
         if not value:
             raise ValidationError("Recipe must have at least one ingredient")
-        
-        # Check for duplicate ingredients
-        ingredient_ids = [ing.get('ingredient_product_id') for ing in value]
-        if len(ingredient_ids) != len(set(ingredient_ids)):
-            raise ValidationError("Duplicate ingredients are not allowed")
+        _check_duplicate_ingredients(value)
     
     @post_load
     def trim_name(self, data, **kwargs):
@@ -213,7 +216,7 @@ class RecipeUpdateSchema(Schema):
     """Schema for updating a recipe."""
     
     name = fields.Str(
-        validate=validate.Length(min=1, max=255),
+        validate=_NAME_LENGTH,
         metadata={'description': 'Recipe name'}
     )
     description = fields.Str(
@@ -221,22 +224,22 @@ class RecipeUpdateSchema(Schema):
         metadata={'description': 'Recipe description'}
     )
     status = fields.Str(
-        validate=validate.OneOf([s.value for s in RecipeStatus]),
+        validate=_STATUS_VALIDATOR,
         metadata={'description': 'Recipe status'}
     )
     yield_quantity = fields.Decimal(
         allow_none=True,
-        validate=validate.Range(min=0.001),
+        validate=_POSITIVE_QUANTITY,
         metadata={'description': 'Expected yield quantity'}
     )
     yield_unit = fields.Str(
         allow_none=True,
-        validate=validate.OneOf([u.value for u in IngredientUnit]),
+        validate=_UNIT_VALIDATOR,
         metadata={'description': 'Unit for yield quantity'}
     )
     preparation_time = fields.Int(
         allow_none=True,
-        validate=validate.Range(min=1),
+        validate=_AT_LEAST_ONE,
         metadata={'description': 'Preparation time in minutes'}
     )
     notes = fields.Str(
@@ -245,7 +248,7 @@ class RecipeUpdateSchema(Schema):
     )
     ingredients = fields.List(
         fields.Nested(RecipeIngredientSchema),
-        validate=validate.Length(min=1),
+        validate=_NON_EMPTY,
         metadata={'description': 'List of recipe ingredients'}
     )
     tag_ids = fields.List(
@@ -274,11 +277,7 @@ class RecipeUpdateSchema(Schema):
         if value is not None:
             if not value:
                 raise ValidationError("Recipe must have at least one ingredient")
-            
-            # Check for duplicate ingredients
-            ingredient_ids = [ing.get('ingredient_product_id') for ing in value]
-            if len(ingredient_ids) != len(set(ingredient_ids)):
-                raise ValidationError("Duplicate ingredients are not allowed")
+            _check_duplicate_ingredients(value)
     
     @post_load
     def trim_name(self, data, **kwargs):
@@ -297,7 +296,7 @@ class RecipeResponseSchema(Schema):
     description = fields.Str(allow_none=True)
     version = fields.Int(required=True)
     status = fields.Str(required=True)
-    yield_quantity = fields.Decimal(allow_none=True)
+    yield_quantity = fields.Str(allow_none=True)
     yield_unit = fields.Str(allow_none=True)
     preparation_time = fields.Int(allow_none=True)
     notes = fields.Str(allow_none=True)
@@ -319,7 +318,7 @@ class RecipeListResponseSchema(Schema):
     description = fields.Str(allow_none=True)
     version = fields.Int(required=True)
     status = fields.Str(required=True)
-    yield_quantity = fields.Decimal(allow_none=True)
+    yield_quantity = fields.Str(allow_none=True)
     yield_unit = fields.Str(allow_none=True)
     preparation_time = fields.Int(allow_none=True)
     created_at = fields.DateTime(required=True)
@@ -330,14 +329,18 @@ class RecipeListResponseSchema(Schema):
 class PaginationMetaSchema(Schema):
     """Schema for pagination metadata."""
     
-    page = fields.Int(required=True, metadata={'description': 'Current page number'})
+    page = fields.Int(required=True, allow_none=True,
+                      metadata={'description': 'Current page number (null for cursor pages)'})
     per_page = fields.Int(required=True, metadata={'description': 'Items per page'})
-    total = fields.Int(required=True, metadata={'description': 'Total number of items'})
-    pages = fields.Int(required=True, metadata={'description': 'Total number of pages'})
+    total = fields.Int(required=True, allow_none=True,
+                       metadata={'description': 'Total number of items (null for cursor pages)'})
+    pages = fields.Int(required=True, allow_none=True,
+                       metadata={'description': 'Total number of pages (null for cursor pages)'})
     has_prev = fields.Bool(required=True, metadata={'description': 'Has previous page'})
     has_next = fields.Bool(required=True, metadata={'description': 'Has next page'})
     prev_num = fields.Int(allow_none=True, metadata={'description': 'Previous page number'})
     next_num = fields.Int(allow_none=True, metadata={'description': 'Next page number'})
+    next_cursor = fields.Str(allow_none=True, metadata={'description': 'Cursor for the next page'})
 
 
 class RecipeListSchema(Schema):
@@ -405,17 +408,21 @@ class RecipeListQuerySchema(Schema):
     """Schema for recipe list query parameters."""
     
     page = fields.Int(
-        validate=validate.Range(min=1),
+        validate=_AT_LEAST_ONE,
         missing=1,
         metadata={'description': 'Page number (1-based)'}
     )
+    cursor = fields.Str(
+        validate=_validate_cursor,
+        metadata={'description': 'next_cursor from the previous page; takes precedence over page'}
+    )
     per_page = fields.Int(
         validate=validate.Range(min=1, max=100),
         missing=20,
         metadata={'description': 'Items per page (1-100)'}
     )
     status = fields.Str(
-        validate=validate.OneOf([s.value for s in RecipeStatus]),
+        validate=_STATUS_VALIDATOR,
         metadata={'description': 'Filter by recipe status'}
     )
     product_id = fields.UUID(
@@ -427,24 +434,50 @@ class RecipeListQuerySchema(Schema):
     )
 
 
+class RecipeHierarchyExportQuerySchema(Schema):
+    """Schema for recipe hierarchy export query parameters."""
+    
+    max_depth = fields.Int(
+        validate=validate.Range(min=1, max=20),
+        missing=10,
+        metadata={'description': 'Maximum recursion depth (1-20)'}
+    )
+    include_product_details = fields.Bool(
+        missing=True,
+        metadata={'description': 'Include product information from Product Service'}
+    )
+
+
+class RecipeHierarchyQuerySchema(RecipeHierarchyExportQuerySchema):
+    """Schema for recipe hierarchy query parameters."""
+    
+    target_quantity = fields.Float(
+        validate=validate.Range(min=0, min_inclusive=False),
+        metadata={'description': 'Scale ingredients to this quantity'}
+    )
+    target_unit = fields.Str(
+        metadata={'description': 'Unit for target quantity'}
+    )
+
+
 class RecipeIngredientUpdateSchema(Schema):
     """Schema for updating individual recipe ingredient."""
     
     quantity = fields.Decimal(
-        validate=validate.Range(min=0.001),
+        validate=_POSITIVE_QUANTITY,
         metadata={'description': 'Ingredient quantity'}
     )
     unit = fields.Str(
-        validate=validate.OneOf([u.value for u in IngredientUnit]),
+        validate=_UNIT_VALIDATOR,
         metadata={'description': 'Ingredient unit'}
     )
     sort_order = fields.Int(
-        validate=validate.Range(min=0),
+        validate=_NON_NEGATIVE,
         metadata={'description': 'Display order'}
     )
     ingredient_group = fields.Str(
         allow_none=True,
-        validate=validate.Length(max=100),
+        validate=_GROUP_LENGTH,
         metadata={'description': 'Ingredient grouping'}
     )
     notes = fields.Str(
@@ -458,4 +491,27 @@ class RecipeIngredientUpdateSchema(Schema):
         fields.UUID(),
         allow_none=True,
         metadata={'description': 'Alternative ingredient IDs'}
-    )
\ No newline at end of file
+    )
+
+
+# Shared instances: schema construction happens once at import
+RECIPE_RESPONSE = RecipeResponseSchema()
+RECIPE_LIST = RecipeListSchema()
+RECIPE_CREATE = RecipeCreateSchema()
+RECIPE_UPDATE = RecipeUpdateSchema()
+RECIPE_HIERARCHY = RecipeHierarchyResponseSchema()
+RECIPE_VALIDATION = RecipeValidationResponseSchema()
+
+
+def _jit_schema(schema: Schema) -> Schema:
+    """JIT-compile a schema instance's dump and load with Deep-Fried Marshmallow.
+    
+    Only for instances the views call directly: flask-smorest deep-copies the
+    schemas handed to its decorators, and DFM's method wrappers cannot be
+    deep-copied.
+    """
+    deep_fry_schema_object(schema)
+    return schema
+
+
+dump_recipe = _jit_schema(RecipeResponseSchema()).dump
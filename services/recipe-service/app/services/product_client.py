@@ -1,13 +1,34 @@
 """Client for communicating with Product Service."""
+import threading
+import orjson
 import structlog
-from typing import Optional, Dict, Any, List
+from cachetools import TTLCache
+from typing import TYPE_CHECKING, Optional, Dict, Any, List, Union
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
-from flask import current_app
+from flask import current_app, g, has_app_context
+
+if TYPE_CHECKING:
+    import httpx
 
 logger = structlog.get_logger("recipe_service.product_client")
 
+# Connection pool of the requests session (per-host pools / sockets per host)
+SESSION_POOL_CONNECTIONS = 32
+SESSION_POOL_MAXSIZE = 64
+
+# Connection pool of the shared async client used for batch fetches
+MAX_CONNECTIONS = 100
+MAX_KEEPALIVE_CONNECTIONS = 50
+
+# Largest ID list the Product Service batch endpoint accepts
+BATCH_SIZE = 500
+
+# In-process product cache; short TTL so product changes show up quickly
+PRODUCT_CACHE_SIZE = 10000
+PRODUCT_CACHE_TTL = 60  # seconds
+
 
 class ProductServiceError(Exception):
     """Exception raised when Product Service communication fails."""
@@ -17,6 +38,25 @@ class ProductServiceError(Exception):
         self.status_code = status_code
 
 
+def _parse_json(response: Any) -> Any:
+    """Parse a Product Service response body with orjson.
+    
+    Args:
+        response: requests or httpx response
+        
+    Returns:
+        Deserialized body
+        
+    Raises:
+        ProductServiceError: If the body is not valid JSON
+    """
+    try:
+        return orjson.loads(response.content)
+    except orjson.JSONDecodeError as e:
+        logger.error("Invalid JSON from Product Service", status_code=response.status_code, error=str(e))
+        raise ProductServiceError(f"Invalid JSON from Product Service: {str(e)}", response.status_code)
+
+
 class ProductClient:
     """Client for communicating with Product Service."""
     
@@ -41,7 +81,13 @@ class ProductClient:
             allowed_methods=["HEAD", "GET", "OPTIONS"]
         )
         
-        adapter = HTTPAdapter(max_retries=retry_strategy)
+        # Sized so concurrent request threads don't wait for a free keep-alive connection
+        adapter = HTTPAdapter(
+            max_retries=retry_strategy,
+            pool_connections=SESSION_POOL_CONNECTIONS,
+            pool_maxsize=SESSION_POOL_MAXSIZE,
+            pool_block=False
+        )
         self.session.mount("http://", adapter)
         self.session.mount("https://", adapter)
         
@@ -51,6 +97,46 @@ class ProductClient:
             'Accept': 'application/json',
             'User-Agent': 'Recipe-Service/1.0'
         })
+        
+        # Found products only; misses are never cached
+        self._cache = TTLCache(maxsize=PRODUCT_CACHE_SIZE, ttl=PRODUCT_CACHE_TTL)
+        self._cache_lock = threading.RLock()
+        
+        # Event loop thread and async client for batch fetches, created on first use
+        # (after gunicorn has forked) and shared so connections are kept alive
+        self._loop = None
+        self._aclient = None
+        self._loop_lock = threading.Lock()
+        
+        # Cleared when the Product Service has no batch/exists endpoint (not yet upgraded)
+        self._batch_endpoint_available = True
+        self._exists_endpoint_available = True
+    
+    def _get_cached(self, product_id: str) -> Optional[Dict[str, Any]]:
+        with self._cache_lock:
+            return self._cache.get(product_id)
+    
+    def _set_cached(self, product_id: str, product_data: Dict[str, Any]) -> None:
+        with self._cache_lock:
+            self._cache[product_id] = product_data
+    
+    def invalidate(self, product_id: str) -> None:
+        """Drop a product from the in-process cache.
+        
+        Args:
+            product_id: Product UUID
+        """
+        with self._cache_lock:
+            self._cache.pop(str(product_id), None)
+    
+    def _request_cache(self) -> Optional[Dict[str, Optional[Dict[str, Any]]]]:
+        """Products already looked up during the current request, or None outside an app context."""
+        if not has_app_context():
+            return None
+        cache = g.get('product_cache')
+        if cache is None:
+            g.product_cache = cache = {}
+        return cache
     
     def get_product(self, product_id: str) -> Optional[Dict[str, Any]]:
         """Get product by ID from Product Service.
@@ -64,6 +150,22 @@ class ProductClient:
         Raises:
             ProductServiceError: If communication fails
         """
+        product_id = str(product_id)
+        request_cache = self._request_cache()
+        if request_cache is not None and product_id in request_cache:
+            return request_cache[product_id]
+        
+        product = self._load_product(product_id)
+        if request_cache is not None:
+            request_cache[product_id] = product
+        return product
+    
+    def _load_product(self, product_id: str) -> Optional[Dict[str, Any]]:
+        """Get a product from the in-process cache or Product Service."""
+        cached = self._get_cached(product_id)
+        if cached is not None:
+            return cached
+        
         url = f"{self.base_url}/api/v1/products/{product_id}"
         
         try:
@@ -73,6 +175,7 @@ class ProductClient:
             
             if response.status_code == 404:
                 logger.warning("Product not found", product_id=product_id)
+                self.invalidate(product_id)
                 return None
             
             if response.status_code != 200:
@@ -83,7 +186,8 @@ class ProductClient:
                            response_text=response.text)
                 raise ProductServiceError(error_msg, response.status_code)
             
-            product_data = response.json()
+            product_data = _parse_json(response)
+            self._set_cached(product_id, product_data)
             logger.debug("Product fetched successfully", product_id=product_id)
             
             return product_data
@@ -110,19 +214,18 @@ class ProductClient:
         if not product_ids:
             return {}
         
-        # For now, we'll fetch products individually
-        # TODO: Implement batch endpoint in Product Service
         products = {}
+        failed_ids = []
         
-        for product_id in product_ids:
-            try:
-                product = self.get_product(product_id)
-                if product:
-                    products[product_id] = product
-            except ProductServiceError:
-                # Continue with other products, log error
-                logger.warning("Failed to fetch product in batch", product_id=product_id)
-                continue
+        for product_id, product in self._fetch_products(product_ids).items():
+            if isinstance(product, ProductServiceError):
+                # Continue with other products, log errors once below
+                failed_ids.append(product_id)
+            elif product:
+                products[product_id] = product
+        
+        if failed_ids:
+            logger.warning("Failed to fetch products in batch", failed_ids=failed_ids, count=len(failed_ids))
         
         logger.info("Batch product fetch completed", 
                    requested=len(product_ids), 
@@ -142,12 +245,31 @@ class ProductClient:
         Raises:
             ProductServiceError: If communication fails
         """
+        product_id = str(product_id)
+        if self._get_cached(product_id) is not None:
+            return True
+        
+        # HEAD avoids transferring and parsing the product body
+        url = f"{self.base_url}/api/v1/products/{product_id}"
+        
         try:
-            product = self.get_product(product_id)
-            return product is not None
-        except ProductServiceError:
-            # Re-raise service errors, but treat 404 as False
-            raise
+            response = self.session.head(url, timeout=self.timeout, allow_redirects=True)
+        except requests.exceptions.RequestException as e:
+            logger.error("Product Service communication failed", 
+                        product_id=product_id, 
+                        error=str(e))
+            raise ProductServiceError(f"Failed to communicate with Product Service: {str(e)}")
+        
+        if response.status_code == 200:
+            return True
+        if response.status_code == 404:
+            self.invalidate(product_id)
+            return False
+        
+        logger.error("Product Service error", 
+                   product_id=product_id, 
+                   status_code=response.status_code)
+        raise ProductServiceError(f"Product Service returned {response.status_code}", response.status_code)
     
     def validate_products_exist(self, product_ids: List[str]) -> Dict[str, bool]:
         """Validate that multiple products exist.
@@ -162,16 +284,297 @@ class ProductClient:
             ProductServiceError: If communication fails
         """
         validation_results = {}
+        failed_ids = []
         
-        for product_id in product_ids:
-            try:
-                validation_results[product_id] = self.validate_product_exists(product_id)
-            except ProductServiceError:
-                logger.warning("Failed to validate product existence", product_id=product_id)
+        for product_id, exists in self._check_exists(product_ids).items():
+            if isinstance(exists, ProductServiceError):
+                failed_ids.append(product_id)
                 validation_results[product_id] = False
+            else:
+                validation_results[product_id] = exists
+        
+        if failed_ids:
+            logger.warning("Failed to validate product existence", failed_ids=failed_ids, count=len(failed_ids))
         
         return validation_results
     
+    def exists_batch(self, product_ids: List[str]) -> Dict[str, bool]:
+        """Check which products exist, in a single Product Service round trip.
+        
+        Args:
+            product_ids: List of product UUIDs
+            
+        Returns:
+            Dictionary mapping product_id to existence status
+            
+        Raises:
+            ProductServiceError: If communication fails
+        """
+        results = {}
+        for product_id, exists in self._check_exists(product_ids).items():
+            if isinstance(exists, ProductServiceError):
+                raise exists
+            results[product_id] = exists
+        return results
+    
+    def _check_exists(self, product_ids: List[str]) -> Dict[str, Union[bool, ProductServiceError]]:
+        """Check product existence, answering cached products from memory.
+        
+        Args:
+            product_ids: List of product UUIDs
+            
+        Returns:
+            Dictionary mapping product_id to existence status, or the
+            ProductServiceError raised for that product
+        """
+        request_cache = self._request_cache()
+        results = {}
+        missing_ids = []
+        for product_id in dict.fromkeys(str(product_id) for product_id in product_ids):
+            if request_cache is not None and product_id in request_cache:
+                # Already looked up during this request (None means not found)
+                results[product_id] = request_cache[product_id] is not None
+            elif self._get_cached(product_id) is not None:
+                results[product_id] = True
+            else:
+                missing_ids.append(product_id)
+        
+        if missing_ids:
+            checked = self._check_exists_bulk(missing_ids)
+            if checked is None:
+                # Exists endpoint unavailable, fall back to fetching the products
+                checked = {
+                    product_id: product if isinstance(product, ProductServiceError) else product is not None
+                    for product_id, product in self._fetch_products(missing_ids).items()
+                }
+            results.update(checked)
+        return results
+    
+    def _check_exists_bulk(
+        self,
+        product_ids: List[str]
+    ) -> Optional[Dict[str, Union[bool, ProductServiceError]]]:
+        """Check product existence through the Product Service exists endpoint.
+        
+        Args:
+            product_ids: Distinct product UUIDs
+            
+        Returns:
+            Dictionary mapping product_id to existence status or a
+            ProductServiceError; None if the exists endpoint is unavailable
+        """
+        if not self._exists_endpoint_available:
+            return None
+        
+        url = f"{self.base_url}/api/v1/products/exists"
+        results = {}
+        
+        for start in range(0, len(product_ids), BATCH_SIZE):
+            chunk = product_ids[start:start + BATCH_SIZE]
+            try:
+                response = self.session.post(url, json={'ids': chunk}, timeout=self.timeout)
+            except requests.exceptions.RequestException as e:
+                logger.error("Product Service exists request failed", count=len(chunk), error=str(e))
+                error = ProductServiceError(f"Failed to communicate with Product Service: {str(e)}")
+                results.update(dict.fromkeys(chunk, error))
+                continue
+            
+            if response.status_code in (404, 405):
+                logger.info("Product Service exists endpoint unavailable, fetching products instead")
+                self._exists_endpoint_available = False
+                return None
+            
+            if response.status_code != 200:
+                logger.error("Product Service exists error", 
+                           count=len(chunk), 
+                           status_code=response.status_code)
+                error = ProductServiceError(f"Product Service returned {response.status_code}", response.status_code)
+                results.update(dict.fromkeys(chunk, error))
+                continue
+            
+            try:
+                exists = _parse_json(response)['exists']
+            except ProductServiceError as e:
+                results.update(dict.fromkeys(chunk, e))
+                continue
+            for product_id in chunk:
+                results[product_id] = bool(exists.get(product_id, False))
+        
+        return results
+    
+    def _fetch_products(
+        self,
+        product_ids: List[str]
+    ) -> Dict[str, Union[Optional[Dict[str, Any]], ProductServiceError]]:
+        """Fetch several products concurrently, serving cached products from memory.
+        
+        Args:
+            product_ids: List of product UUIDs
+            
+        Returns:
+            Dictionary mapping product_id to product data, None if not found,
+            or the ProductServiceError raised for that product
+        """
+        request_cache = self._request_cache()
+        results = {}
+        missing_ids = []
+        for product_id in dict.fromkeys(str(product_id) for product_id in product_ids):
+            if request_cache is not None and product_id in request_cache:
+                results[product_id] = request_cache[product_id]
+                continue
+            cached = self._get_cached(product_id)
+            if cached is not None:
+                results[product_id] = cached
+            else:
+                missing_ids.append(product_id)
+        
+        if missing_ids:
+            fetched = self._fetch_products_bulk(missing_ids)
+            if fetched is None:
+                # Batch endpoint unavailable, fetch one by one concurrently instead
+                fetched = self._run_async(self._fetch_products_async(missing_ids))
+            for product_id, product in fetched.items():
+                if isinstance(product, dict):
+                    self._set_cached(product_id, product)
+                elif product is None:
+                    self.invalidate(product_id)
+                results[product_id] = product
+        
+        if request_cache is not None:
+            request_cache.update(
+                (product_id, product) for product_id, product in results.items()
+                if not isinstance(product, ProductServiceError)
+            )
+        return results
+    
+    def _fetch_products_bulk(
+        self,
+        product_ids: List[str]
+    ) -> Optional[Dict[str, Union[Optional[Dict[str, Any]], ProductServiceError]]]:
+        """Fetch products through the Product Service batch endpoint.
+        
+        Args:
+            product_ids: Distinct product UUIDs
+            
+        Returns:
+            Dictionary mapping product_id to product data, None if not found,
+            or a ProductServiceError; None if the batch endpoint is unavailable
+        """
+        if not self._batch_endpoint_available:
+            return None
+        
+        url = f"{self.base_url}/api/v1/products/batch"
+        results = {}
+        
+        for start in range(0, len(product_ids), BATCH_SIZE):
+            chunk = product_ids[start:start + BATCH_SIZE]
+            try:
+                response = self.session.post(url, json={'ids': chunk}, timeout=self.timeout)
+            except requests.exceptions.RequestException as e:
+                logger.error("Product Service batch request failed", count=len(chunk), error=str(e))
+                error = ProductServiceError(f"Failed to communicate with Product Service: {str(e)}")
+                results.update(dict.fromkeys(chunk, error))
+                continue
+            
+            if response.status_code in (404, 405):
+                logger.info("Product Service batch endpoint unavailable, using per-product requests")
+                self._batch_endpoint_available = False
+                return None
+            
+            if response.status_code != 200:
+                logger.error("Product Service batch error", 
+                           count=len(chunk), 
+                           status_code=response.status_code)
+                error = ProductServiceError(f"Product Service returned {response.status_code}", response.status_code)
+                results.update(dict.fromkeys(chunk, error))
+                continue
+            
+            try:
+                products = _parse_json(response)['products']
+            except ProductServiceError as e:
+                results.update(dict.fromkeys(chunk, e))
+                continue
+            found = {product['id']: product for product in products}
+            for product_id in chunk:
+                results[product_id] = found.get(product_id)
+        
+        return results
+    
+    def _run_async(self, coro):
+        """Run a coroutine on the client's event loop thread and wait for its result."""
+        # asyncio and httpx are only needed for batch fetches, keep them off the import path
+        import asyncio
+        
+        if self._loop is None:
+            with self._loop_lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    threading.Thread(
+                        target=loop.run_forever, name='product-client-loop', daemon=True
+                    ).start()
+                    self._loop = loop
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+    
+    def _get_async_client(self) -> 'httpx.AsyncClient':
+        """Get the shared async client (called on the event loop thread only)."""
+        import httpx
+        
+        if self._aclient is None:
+            limits = httpx.Limits(
+                max_connections=MAX_CONNECTIONS,
+                max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS
+            )
+            # HTTP/2 is negotiated over TLS only; plain http stays on HTTP/1.1 keep-alive
+            http2 = self.base_url.startswith('https://')
+            self._aclient = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                headers=dict(self.session.headers),
+                transport=httpx.AsyncHTTPTransport(retries=3, limits=limits, http2=http2)
+            )
+        return self._aclient
+    
+    async def _fetch_products_async(
+        self,
+        product_ids: List[str]
+    ) -> Dict[str, Union[Optional[Dict[str, Any]], ProductServiceError]]:
+        import asyncio
+        
+        client = self._get_async_client()
+        results = await asyncio.gather(
+            *(self._get_product_async(client, product_id) for product_id in product_ids)
+        )
+        return dict(zip(product_ids, results))
+    
+    async def _get_product_async(
+        self,
+        client: 'httpx.AsyncClient',
+        product_id: str
+    ) -> Union[Optional[Dict[str, Any]], ProductServiceError]:
+        import httpx
+        
+        try:
+            response = await client.get(f"/api/v1/products/{product_id}")
+        except httpx.HTTPError as e:
+            logger.error("Product Service communication failed", product_id=product_id, error=str(e))
+            return ProductServiceError(f"Failed to communicate with Product Service: {str(e)}")
+        
+        if response.status_code == 404:
+            logger.warning("Product not found", product_id=product_id)
+            return None
+        
+        if response.status_code != 200:
+            logger.error("Product Service error", 
+                       product_id=product_id, 
+                       status_code=response.status_code,
+                       response_text=response.text)
+            return ProductServiceError(f"Product Service returned {response.status_code}", response.status_code)
+        
+        try:
+            return _parse_json(response)
+        except ProductServiceError as e:
+            return e
+    
     def search_products(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
         """Search products in Product Service.
         
@@ -201,7 +604,7 @@ class ProductClient:
                            response_text=response.text)
                 raise ProductServiceError(error_msg, response.status_code)
             
-            search_data = response.json()
+            search_data = _parse_json(response)
             results = search_data.get('results', [])
             
             logger.debug("Product search completed", 
@@ -232,12 +635,26 @@ class ProductClient:
             return False
 
 
-# Global client instance - lazy initialization
-product_client = None
+def init_product_client(app) -> ProductClient:
+    """Create the application's shared product client.
+    
+    Args:
+        app: Flask application instance
+        
+    Returns:
+        Product client registered on the application
+    """
+    client = ProductClient(app.config['PRODUCT_SERVICE_URL'], app.config['SERVICE_TIMEOUT'])
+    app.extensions['product_client'] = client
+    
+    @app.teardown_request
+    def _drop_request_product_cache(exc):
+        # An app context (and its g) can outlive one request, e.g. when one is already pushed
+        g.pop('product_cache', None)
+    
+    return client
+
 
-def get_product_client():
-    """Get or create product client instance."""
-    global product_client
-    if product_client is None:
-        product_client = ProductClient()
-    return product_client
\ No newline at end of file
+def get_product_client() -> ProductClient:
+    """Get the current application's product client."""
+    return current_app.extensions['product_client']
\ No newline at end of file
@@ -0,0 +1,161 @@
+"""Recipe analysis computation and background analysis tasks."""
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+import structlog
+from redis.exceptions import RedisError
+
+from ..extensions import db, get_redis_connection
+from ..services.recipe_repository import RecipeRepository
+from ..utils.exceptions import RecipeNotFoundError
+from ..utils.serialization import json_dumps, json_loads, utc_now_iso
+
+logger = structlog.get_logger("recipe_service.analysis")
+
+ANALYSIS_TASK_TTL = 300  # seconds a finished task result stays available
+
+# Runs analyses requested with ?async=true off the request worker
+_analysis_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='recipe-analysis')
+
+
+def analyze_recipe(repository: RecipeRepository, recipe_id: UUID) -> Dict[str, Any]:
+    """Build the full analysis of a recipe.
+    
+    Args:
+        repository: Recipe repository
+        recipe_id: Recipe UUID
+    
+    Returns:
+        Analysis result dictionary
+    
+    Raises:
+        RecipeNotFoundError: If recipe doesn't exist
+    """
+    # Get complexity metrics (raises RecipeNotFoundError for unknown recipes)
+    complexity = repository.get_recipe_complexity_metrics(recipe_id)
+    
+    # Get dependencies
+    dependencies = repository.get_recipe_dependencies(recipe_id)
+    
+    # Get hierarchy for analysis
+    hierarchy = repository.get_recipe_hierarchy(recipe_id, max_depth=20, include_product_details=True)
+    
+    # Analyze ingredient distribution by unit and by depth in one pass
+    unit_distribution = defaultdict(lambda: {'count': 0, 'total_quantity': 0})
+    depth_distribution = defaultdict(int)
+    for item in hierarchy:
+        unit_stats = unit_distribution[item['unit']]
+        unit_stats['count'] += 1
+        unit_stats['total_quantity'] += float(item['quantity'])
+        depth_distribution[item['depth_level']] += 1
+    
+    # Performance insights
+    performance_insights = []
+    
+    if complexity['hierarchy_depth'] > 5:
+        performance_insights.append({
+            'type': 'warning',
+            'message': 'Deep hierarchy may impact calculation performance',
+            'recommendation': 'Consider flattening some sub-recipes'
+        })
+    
+    if complexity['ingredient_count'] > 20:
+        performance_insights.append({
+            'type': 'info',
+            'message': 'Large number of direct ingredients',
+            'recommendation': 'Consider grouping ingredients logically'
+        })
+    
+    if len(hierarchy) > 50:
+        performance_insights.append({
+            'type': 'warning',
+            'message': 'Large expanded ingredient count may slow calculations',
+            'recommendation': 'Review recipe structure for optimization'
+        })
+    
+    return {
+        'recipe_id': recipe_id,
+        'complexity_metrics': complexity,
+        'dependencies': dependencies,
+        'hierarchy_analysis': {
+            'total_expanded_ingredients': len(hierarchy),
+            'unit_distribution': unit_distribution,
+            'depth_distribution': depth_distribution
+        },
+        'performance_insights': performance_insights,
+        'analysis_timestamp': utc_now_iso()
+    }
+
+
+def _task_key(task_id: str) -> str:
+    return f'recipe:analysis-task:{task_id}'
+
+
+def _store_task(redis_conn, task_id: str, task: Dict[str, Any]) -> None:
+    redis_conn.setex(_task_key(task_id), ANALYSIS_TASK_TTL, json_dumps(task))
+
+
+def _run_analysis_task(app, task_id: str, recipe_id: UUID) -> None:
+    """Run an analysis in the background and store its outcome."""
+    with app.app_context():
+        redis_conn = get_redis_connection()
+        try:
+            result = analyze_recipe(RecipeRepository(), recipe_id)
+            task = {'task_id': task_id, 'status': 'SUCCESS', 'result': result}
+        except RecipeNotFoundError as e:
+            task = {'task_id': task_id, 'status': 'FAILURE', 'error': str(e), 'status_code': 404}
+        except Exception as e:
+            logger.error("Error analyzing recipe", recipe_id=str(recipe_id), task_id=task_id, error=str(e))
+            task = {'task_id': task_id, 'status': 'FAILURE',
+                    'error': 'Internal server error while analyzing recipe', 'status_code': 500}
+        finally:
+            db.session.remove()
+        
+        try:
+            _store_task(redis_conn, task_id, task)
+        except RedisError as e:
+            logger.error("Error storing analysis result", task_id=task_id, error=str(e))
+
+
+def submit_analysis(app, recipe_id: UUID) -> Optional[str]:
+    """Queue a recipe analysis on the background executor.
+    
+    Args:
+        app: Flask application used to open an app context in the worker
+        recipe_id: Recipe UUID
+    
+    Returns:
+        Task ID, or None if the task store (Redis) is unavailable
+    """
+    redis_conn = get_redis_connection()
+    if redis_conn is None:
+        return None
+    
+    task_id = uuid.uuid4().hex
+    try:
+        _store_task(redis_conn, task_id, {'task_id': task_id, 'status': 'PENDING'})
+    except RedisError as e:
+        logger.warning("Analysis task store unavailable", error=str(e))
+        return None
+    
+    _analysis_executor.submit(_run_analysis_task, app, task_id, recipe_id)
+    return task_id
+
+
+def get_analysis_task(task_id: str) -> Optional[Dict[str, Any]]:
+    """Get the state of an analysis task.
+    
+    Args:
+        task_id: Task ID returned by submit_analysis
+    
+    Returns:
+        Task dictionary with status (and result or error), or None if unknown/expired
+    """
+    redis_conn = get_redis_connection()
+    if redis_conn is None:
+        return None
+    data = redis_conn.get(_task_key(task_id))
+    return json_loads(data) if data is not None else None
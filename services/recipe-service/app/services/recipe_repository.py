@@ -1,11 +1,14 @@
 """Recipe repository for data access layer."""
+import threading
 import structlog
 from datetime import datetime
-from typing import List, Optional, Dict, Any, Tuple
+from typing import Iterable, Iterator, List, Optional, Dict, Any, Tuple
 from uuid import UUID
+from cachetools import TTLCache
 from flask import current_app
-from sqlalchemy import or_, and_, func, text
-from sqlalchemy.orm import joinedload
+from math import ceil
+from sqlalchemy import bindparam, delete, func, select, text, tuple_
+from sqlalchemy.orm import joinedload, load_only, make_transient_to_detached, raiseload, selectinload, undefer
 from sqlalchemy.exc import IntegrityError
 
 from ..extensions import db
@@ -14,13 +17,149 @@ from ..models.recipe import (
     RecipeNutrition, RecipeTag, RecipeAudit, RecipeStatus, IngredientUnit
 )
 from ..utils.exceptions import (
-    RecipeNotFoundError, RecipeIngredientNotFoundError, CircularDependencyError,
+    RecipeNotFoundError, CircularDependencyError,
     RecipeValidationError, MaxDepthExceededError, TooManyIngredientsError
 )
 from ..services.product_client import get_product_client, ProductServiceError
+from ..utils.cache import invalidate_recipe, invalidate_tags
+from ..utils.pagination import decode_cursor, encode_cursor
+from ..utils.serialization import json_dumps, json_loads
 
 logger = structlog.get_logger("recipe_service.repository")
 
+# Rows fetched per round trip when streaming recipe hierarchies
+HIERARCHY_FETCH_SIZE = 500
+
+# Every Nth version snapshot stores the complete recipe; the versions in
+# between store a patch against their predecessor, so rebuilding any version
+# replays at most N - 1 patches
+VERSION_CHECKPOINT_INTERVAL = 10
+
+# Tag columns by tag ID. Tags are never updated or deleted, so assigning a
+# cached tag only needs the row to have existed once
+TAG_CACHE_SIZE = 2048
+TAG_CACHE_TTL = 300  # seconds
+_tag_cache = TTLCache(maxsize=TAG_CACHE_SIZE, ttl=TAG_CACHE_TTL)
+_tag_cache_lock = threading.Lock()
+
+# Hierarchy rows, optionally joined to the product catalog view (migration 007)
+# so product details come from the database instead of a Product Service call.
+# WITH ORDINALITY keeps the function's row order through the join. The
+# function stops recursing one level past :max_depth and returns any rows
+# beyond the limit first (migration 010).
+_HIERARCHY_SQL = text(
+    "SELECT ingredient_product_id, ingredient_name, quantity, unit, depth_level, path "
+    "FROM recipe_service.calculate_recipe_hierarchy(:recipe_id, :max_depth)"
+).execution_options(stream_results=True, yield_per=HIERARCHY_FETCH_SIZE)
+_HIERARCHY_WITH_PRODUCTS_SQL = text(
+    "SELECT h.ingredient_product_id, h.ingredient_name, h.quantity, h.unit, h.depth_level, h.path, "
+    "p.name, p.type, p.unit, p.description "
+    "FROM recipe_service.calculate_recipe_hierarchy(:recipe_id, :max_depth) WITH ORDINALITY "
+    "AS h(ingredient_product_id, ingredient_name, quantity, unit, depth_level, path, position) "
+    "LEFT JOIN recipe_service.product_catalog p ON p.id = h.ingredient_product_id "
+    "ORDER BY h.position"
+).execution_options(stream_results=True, yield_per=HIERARCHY_FETCH_SIZE)
+
+
+def _snapshot_patch(previous: Dict[str, Any], current: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Diff two recipe snapshots as a JSON Patch (RFC 6902) of top-level fields.
+    
+    Unchanged fields, including unchanged ingredient and tag lists, are left
+    out of the patch.
+    
+    Args:
+        previous: Snapshot of the previous version
+        current: Snapshot of the new version
+        
+    Returns:
+        List of add/replace/remove operations
+    """
+    operations = []
+    for key, value in current.items():
+        if key not in previous:
+            operations.append({'op': 'add', 'path': _patch_path(key), 'value': value})
+        elif previous[key] != value:
+            operations.append({'op': 'replace', 'path': _patch_path(key), 'value': value})
+    for key in previous.keys() - current.keys():
+        operations.append({'op': 'remove', 'path': _patch_path(key)})
+    return operations
+
+
+def _apply_snapshot_patch(snapshot: Dict[str, Any], patch: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Apply a patch produced by _snapshot_patch to a copy of a snapshot."""
+    result = dict(snapshot)
+    for operation in patch:
+        key = operation['path'][1:].replace('~1', '/').replace('~0', '~')
+        if operation['op'] == 'remove':
+            result.pop(key, None)
+        else:
+            result[key] = operation['value']
+    return result
+
+
+def _patch_path(key: str) -> str:
+    """JSON Pointer (RFC 6901) to a top-level field."""
+    return '/' + key.replace('~', '~0').replace('/', '~1')
+
+
+def _latest_version_data(recipe_id: UUID) -> Tuple[Optional[Dict[str, Any]], int]:
+    """Rebuild the latest stored version snapshot of a recipe.
+    
+    Args:
+        recipe_id: Recipe UUID
+        
+    Returns:
+        Tuple of (snapshot or None if the recipe has no versions, number of
+        versions read from the last checkpoint onwards)
+    """
+    last_checkpoint = (
+        select(func.max(RecipeVersion.version_number))
+        .where(RecipeVersion.recipe_id == recipe_id, RecipeVersion.recipe_data.isnot(None))
+        .scalar_subquery()
+    )
+    rows = db.session.execute(
+        select(RecipeVersion.recipe_data, RecipeVersion.patch)
+        .where(RecipeVersion.recipe_id == recipe_id, RecipeVersion.version_number >= last_checkpoint)
+        .order_by(RecipeVersion.version_number)
+    ).all()
+    
+    snapshot = None
+    for recipe_data, patch in rows:
+        snapshot = recipe_data if recipe_data is not None else _apply_snapshot_patch(snapshot, patch)
+    return snapshot, len(rows)
+
+
+# Eager loads for to_dict(include_relationships=True). Collections use
+# selectinload (one extra SELECT per relationship, not per recipe) so list
+# queries don't multiply rows the way a joinedload of two collections does.
+RECIPE_RELATIONSHIP_LOADS = (
+    selectinload(Recipe.ingredients),
+    selectinload(Recipe.tags),
+    joinedload(Recipe.nutrition)
+)
+
+# Hot lookups built once at import. Executing the same statement object reuses
+# its memoized cache key and compiled SQL; only the parameters are bound per call.
+_RECIPE_BY_ID = select(Recipe).where(Recipe.id == bindparam('recipe_id')).limit(1)
+_RECIPE_WITH_RELATIONSHIPS_BY_ID = _RECIPE_BY_ID.options(*RECIPE_RELATIONSHIP_LOADS)
+_RECIPE_EXISTS = select(Recipe.id).where(Recipe.id == bindparam('recipe_id')).limit(1)
+_ACTIVE_RECIPE_BY_PRODUCT = select(Recipe).where(
+    Recipe.product_id == bindparam('product_id'),
+    Recipe.status == RecipeStatus.ACTIVE
+).limit(1)
+_ACTIVE_RECIPE_WITH_RELATIONSHIPS_BY_PRODUCT = _ACTIVE_RECIPE_BY_PRODUCT.options(*RECIPE_RELATIONSHIP_LOADS)
+_RECIPES_USING_PRODUCT = select(Recipe, RecipeIngredient).join(
+    RecipeIngredient,
+    Recipe.id == RecipeIngredient.recipe_id
+).where(
+    RecipeIngredient.ingredient_product_id == bindparam('product_id')
+)
+_INGREDIENT_BY_ID = select(RecipeIngredient).where(RecipeIngredient.id == bindparam('ingredient_id')).limit(1)
+_INGREDIENTS_BY_RECIPE = select(RecipeIngredient).where(
+    RecipeIngredient.recipe_id == bindparam('recipe_id')
+).order_by(RecipeIngredient.sort_order)
+_TAG_BY_ID = select(RecipeTag).where(RecipeTag.id == bindparam('tag_id')).limit(1)
+
 
 class RecipeRepository:
     """Repository for Recipe entity operations."""
@@ -39,16 +178,8 @@ class RecipeRepository:
         Returns:
             Recipe instance or None if not found
         """
-        query = self.session.query(self.model)
-        
-        if include_relationships:
-            query = query.options(
-                joinedload(Recipe.ingredients),
-                joinedload(Recipe.tags),
-                joinedload(Recipe.nutrition)
-            )
-        
-        return query.filter(self.model.id == recipe_id).first()
+        stmt = _RECIPE_WITH_RELATIONSHIPS_BY_ID if include_relationships else _RECIPE_BY_ID
+        return self.session.execute(stmt, {'recipe_id': recipe_id}).scalars().first()
     
     def get_by_product_id(self, product_id: UUID, include_relationships: bool = False) -> Optional[Recipe]:
         """Get recipe by product ID.
@@ -60,22 +191,9 @@ class RecipeRepository:
         Returns:
             Recipe instance or None if not found
         """
-        query = self.session.query(self.model)
-        
-        if include_relationships:
-            query = query.options(
-                joinedload(Recipe.ingredients),
-                joinedload(Recipe.tags),
-                joinedload(Recipe.nutrition)
-            )
-        
         # Get the active recipe for this product
-        return query.filter(
-            and_(
-                self.model.product_id == product_id,
-                self.model.status == RecipeStatus.ACTIVE
-            )
-        ).first()
+        stmt = _ACTIVE_RECIPE_WITH_RELATIONSHIPS_BY_PRODUCT if include_relationships else _ACTIVE_RECIPE_BY_PRODUCT
+        return self.session.execute(stmt, {'product_id': product_id}).scalars().first()
     
     def get_all(
         self,
@@ -83,19 +201,24 @@ class RecipeRepository:
         per_page: int = 20,
         status: Optional[RecipeStatus] = None,
         product_id: Optional[UUID] = None,
-        include_relationships: bool = False
+        include_relationships: bool = False,
+        cursor: Optional[str] = None
     ) -> Tuple[List[Recipe], Dict[str, Any]]:
         """Get all recipes with filtering and pagination.
         
         Args:
-            page: Page number (1-based)
+            page: Page number (1-based), ignored when cursor is given
             per_page: Items per page
             status: Filter by recipe status
             product_id: Filter by product ID
             include_relationships: Whether to include ingredients and tags
+            cursor: next_cursor of the previous page, for keyset pagination
             
         Returns:
             Tuple of (recipes list, pagination metadata)
+            
+        Raises:
+            ValueError: If the cursor is malformed
         """
         query = self.session.query(self.model)
         
@@ -107,14 +230,23 @@ class RecipeRepository:
             query = query.filter(self.model.product_id == product_id)
         
         if include_relationships:
-            query = query.options(
-                joinedload(Recipe.ingredients),
-                joinedload(Recipe.tags),
-                joinedload(Recipe.nutrition)
-            )
+            # Read-only list: anything not eagerly loaded is a bug, not a lazy load
+            query = query.options(*RECIPE_RELATIONSHIP_LOADS, raiseload('*'))
+        else:
+            # Ingredients aren't loaded, so fetch their count in the same SELECT
+            # instead of one deferred count query per recipe
+            query = query.options(undefer(Recipe.total_ingredients_count))
+        
+        # Order by name, with id as tie-breaker so the order is a valid keyset
+        query = query.order_by(self.model.name, self.model.id)
         
-        # Order by name
-        query = query.order_by(self.model.name)
+        if cursor is not None:
+            # Keyset page: an index seek past the cursor, no OFFSET and no COUNT
+            query = query.filter(self._after_cursor(cursor))
+            recipes = query.limit(per_page + 1).all()
+            has_next = len(recipes) > per_page
+            recipes = recipes[:per_page]
+            return recipes, self._cursor_metadata(per_page, self._next_cursor(recipes, has_next))
         
         # Paginate
         paginated = query.paginate(
@@ -131,11 +263,139 @@ class RecipeRepository:
             'has_prev': paginated.has_prev,
             'has_next': paginated.has_next,
             'prev_num': paginated.prev_num,
-            'next_num': paginated.next_num
+            'next_num': paginated.next_num,
+            'next_cursor': self._next_cursor(paginated.items, paginated.has_next)
         }
         
         return paginated.items, metadata
     
+    def get_all_as_dicts(
+        self,
+        page: int = 1,
+        per_page: int = 20,
+        status: Optional[RecipeStatus] = None,
+        product_id: Optional[UUID] = None,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """Get recipe list rows as plain dictionaries.
+        
+        Selects only the list columns plus an ingredient count subquery, so no
+        ORM instances are built. Use get_all() when relationships are needed.
+        
+        Args:
+            page: Page number (1-based), ignored when cursor is given
+            per_page: Items per page
+            status: Filter by recipe status
+            product_id: Filter by product ID
+            cursor: next_cursor of the previous page, for keyset pagination
+            
+        Returns:
+            Tuple of (recipe dictionaries, pagination metadata)
+            
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        stmt = select(
+            Recipe.id,
+            Recipe.product_id,
+            Recipe.name,
+            Recipe.description,
+            Recipe.version,
+            Recipe.status,
+            Recipe.yield_quantity,
+            Recipe.yield_unit,
+            Recipe.preparation_time,
+            Recipe.created_at,
+            Recipe.updated_at,
+            Recipe.total_ingredients_count.label('ingredients_count')
+        )
+        count_stmt = select(func.count(Recipe.id))
+        
+        # Apply filters
+        if status:
+            stmt = stmt.where(Recipe.status == status)
+            count_stmt = count_stmt.where(Recipe.status == status)
+        
+        if product_id:
+            stmt = stmt.where(Recipe.product_id == product_id)
+            count_stmt = count_stmt.where(Recipe.product_id == product_id)
+        
+        stmt = stmt.order_by(Recipe.name, Recipe.id)
+        if cursor is not None:
+            # Keyset page: an index seek past the cursor, no OFFSET and no COUNT
+            stmt = stmt.where(self._after_cursor(cursor)).limit(per_page + 1)
+        else:
+            stmt = stmt.limit(per_page).offset((page - 1) * per_page)
+        
+        recipes = []
+        for row in self.session.execute(stmt).mappings():
+            recipe = dict(row)
+            recipe['yield_unit'] = row['yield_unit'].value if row['yield_unit'] else None
+            recipes.append(recipe)
+        
+        if cursor is not None:
+            has_next = len(recipes) > per_page
+            recipes = recipes[:per_page]
+            next_cursor = encode_cursor(recipes[-1]['name'], recipes[-1]['id']) if has_next else None
+            return recipes, self._cursor_metadata(per_page, next_cursor)
+        
+        total = self.session.execute(count_stmt).scalar()
+        metadata = self._pagination_metadata(page, per_page, total)
+        if metadata['has_next'] and recipes:
+            metadata['next_cursor'] = encode_cursor(recipes[-1]['name'], recipes[-1]['id'])
+        
+        return recipes, metadata
+    
+    @staticmethod
+    def _after_cursor(cursor: str):
+        """Filter for rows sorting after the (name, id) key encoded in a cursor."""
+        last_name, last_id = decode_cursor(cursor)
+        return tuple_(Recipe.name, Recipe.id) > tuple_(last_name, last_id)
+    
+    @staticmethod
+    def _next_cursor(recipes: List[Recipe], has_next: bool) -> Optional[str]:
+        """Cursor for the page after the given recipes, if there is one."""
+        if not (has_next and recipes):
+            return None
+        return encode_cursor(recipes[-1].name, recipes[-1].id)
+    
+    @staticmethod
+    def _cursor_metadata(per_page: int, next_cursor: Optional[str]) -> Dict[str, Any]:
+        """Build pagination metadata for a keyset page.
+        
+        Page numbers and totals are unknown without a COUNT, so they are None.
+        """
+        return {
+            'page': None,
+            'per_page': per_page,
+            'total': None,
+            'pages': None,
+            'has_prev': True,
+            'has_next': next_cursor is not None,
+            'prev_num': None,
+            'next_num': None,
+            'next_cursor': next_cursor
+        }
+    
+    @staticmethod
+    def _pagination_metadata(page: int, per_page: int, total: int) -> Dict[str, Any]:
+        """Build pagination metadata matching Flask-SQLAlchemy's paginate()."""
+        pages = ceil(total / per_page) if total else 0
+        has_prev = page > 1
+        has_next = page < pages
+        
+        return {
+            'page': page,
+            'per_page': per_page,
+            'total': total,
+            'pages': pages,
+            'has_prev': has_prev,
+            'has_next': has_next,
+            'prev_num': page - 1 if has_prev else None,
+            'next_num': page + 1 if has_next else None,
+            'next_cursor': None
+        }
+    
     def create(self, recipe_data: Dict[str, Any], created_by: Optional[UUID] = None) -> Recipe:
         """Create a new recipe.
         
@@ -151,9 +411,14 @@ class RecipeRepository:
             CircularDependencyError: If circular dependency detected
         """
         try:
-            # Validate product exists
+            # Validate ingredient rules on the request data, before any writes
+            self._validate_recipe(ing.get('is_optional', False) for ing in recipe_data.get('ingredients', ()))
+            
+            # Validate the recipe product and all ingredient products in one round trip
             product_id = recipe_data['product_id']
-            if not get_product_client().validate_product_exists(product_id):
+            ingredient_ids = [ing['ingredient_product_id'] for ing in recipe_data.get('ingredients', ())]
+            validation_results = get_product_client().validate_products_exist([product_id, *ingredient_ids])
+            if not validation_results.get(str(product_id)):
                 raise RecipeValidationError(f"Product {product_id} does not exist")
             
             # Create recipe
@@ -175,22 +440,22 @@ class RecipeRepository:
             
             # Handle ingredients
             if 'ingredients' in recipe_data:
-                self._create_ingredients(recipe, recipe_data['ingredients'])
+                self._create_ingredients(recipe, recipe_data['ingredients'], validation_results)
             
             # Handle tags
             if 'tag_ids' in recipe_data:
                 self._assign_tags(recipe, recipe_data['tag_ids'])
             
-            # Validate recipe
-            self._validate_recipe(recipe)
-            
             # Update dependencies
             self._update_dependencies(recipe)
             
+            # Flush first so to_dict() sees the ingredients and defaults
+            self.session.flush()
+            self._create_version_snapshot(recipe, "Initial version", created_by)
+            
             self.session.commit()
             
-            # Create version snapshot
-            self._create_version_snapshot(recipe, "Initial version", created_by)
+            invalidate_recipe(recipe.id, recipe.product_id)
             
             logger.info("Recipe created successfully", recipe_id=str(recipe.id))
             return recipe
@@ -232,8 +497,11 @@ class RecipeRepository:
             raise RecipeNotFoundError(str(recipe_id))
         
         try:
-            # Store old values for version tracking
-            old_data = recipe.to_dict(include_relationships=True)
+            # Validate ingredient rules on the new list, or the loaded one if unchanged
+            if 'ingredients' in recipe_data:
+                self._validate_recipe(ing.get('is_optional', False) for ing in recipe_data['ingredients'])
+            else:
+                self._validate_recipe(ing.is_optional for ing in recipe.ingredients)
             
             # Update basic fields
             if 'name' in recipe_data:
@@ -255,31 +523,27 @@ class RecipeRepository:
             
             # Handle ingredient updates
             if 'ingredients' in recipe_data:
-                # Remove existing ingredients
-                for ingredient in recipe.ingredients[:]:
-                    self.session.delete(ingredient)
-                
-                # Add new ingredients
-                self._create_ingredients(recipe, recipe_data['ingredients'])
+                self._sync_ingredients(recipe, recipe_data['ingredients'])
             
             # Handle tag updates
             if 'tag_ids' in recipe_data:
                 self._assign_tags(recipe, recipe_data['tag_ids'])
             
-            # Validate recipe
-            self._validate_recipe(recipe)
-            
             # Update dependencies
             self._update_dependencies(recipe)
             
-            # Increment version if significant changes
-            if self._should_increment_version(old_data, recipe_data):
+            # Increment version if significant changes, and snapshot the updated
+            # recipe; flush first so onupdate columns hold their new values
+            if self._should_increment_version(recipe_data):
                 recipe.version += 1
+                self.session.flush()
                 change_summary = recipe_data.get('change_summary', 'Recipe updated')
                 self._create_version_snapshot(recipe, change_summary, updated_by)
             
             self.session.commit()
             
+            invalidate_recipe(recipe.id, recipe.product_id)
+            
             logger.info("Recipe updated successfully", recipe_id=str(recipe.id))
             return recipe
             
@@ -299,14 +563,24 @@ class RecipeRepository:
         Returns:
             True if deleted, False if not found
         """
-        recipe = self.get_by_id(recipe_id)
-        if not recipe:
-            return False
+        # One DELETE ... RETURNING instead of loading the recipe first; the
+        # ingredients, tag assignments and dependencies go with the ON DELETE
+        # CASCADE foreign keys
+        stmt = (
+            delete(Recipe)
+            .where(Recipe.id == recipe_id)
+            .returning(Recipe.product_id)
+        )
         
         try:
-            self.session.delete(recipe)
+            product_id = self.session.execute(stmt).scalar()
+            if product_id is None:
+                self.session.rollback()
+                return False
             self.session.commit()
             
+            invalidate_recipe(recipe_id, product_id)
+            
             logger.info("Recipe deleted successfully", recipe_id=str(recipe_id))
             return True
         except Exception:
@@ -319,7 +593,7 @@ class RecipeRepository:
         Args:
             recipe_id: Recipe UUID
             max_depth: Maximum recursion depth
-            include_product_details: Whether to fetch product details from Product Service
+            include_product_details: Whether to add product details from the product catalog
             
         Returns:
             List of hierarchical ingredient data
@@ -328,85 +602,122 @@ class RecipeRepository:
             RecipeNotFoundError: If recipe doesn't exist
             MaxDepthExceededError: If max depth exceeded
         """
-        recipe = self.get_by_id(recipe_id)
-        if not recipe:
+        hierarchy = list(self.iter_recipe_hierarchy(recipe_id, max_depth, include_product_details))
+        
+        logger.info("Recipe hierarchy calculated", 
+                   recipe_id=str(recipe_id),
+                   hierarchy_items=len(hierarchy),
+                   max_depth=max((item['depth_level'] for item in hierarchy), default=0))
+        
+        return hierarchy
+    
+    def iter_recipe_hierarchy(
+        self,
+        recipe_id: UUID,
+        max_depth: int = 10,
+        include_product_details: bool = True
+    ) -> Iterator[Dict[str, Any]]:
+        """Stream the hierarchical expansion of a recipe one item at a time.
+        
+        Rows come from a server-side cursor ``HIERARCHY_FETCH_SIZE`` at a time,
+        so memory stays bounded by one batch however large the hierarchy is.
+        The recipe is checked here; rows are only read as the iterator is
+        consumed.
+        
+        Args:
+            recipe_id: Recipe UUID
+            max_depth: Maximum recursion depth
+            include_product_details: Whether to add product details from the product catalog
+            
+        Returns:
+            Iterator of hierarchical ingredient data
+            
+        Raises:
+            RecipeNotFoundError: If recipe doesn't exist
+            MaxDepthExceededError: From the iterator, if max depth exceeded
+        """
+        if not self.session.execute(_RECIPE_EXISTS, {'recipe_id': recipe_id}).first():
             raise RecipeNotFoundError(str(recipe_id))
         
+        return self._stream_hierarchy(recipe_id, max_depth, include_product_details)
+    
+    def _stream_hierarchy(
+        self,
+        recipe_id: UUID,
+        max_depth: int,
+        include_product_details: bool
+    ) -> Iterator[Dict[str, Any]]:
+        """Generate hierarchy items for iter_recipe_hierarchy."""
         try:
-            # Use database function for hierarchical query
+            # Use database function for hierarchical query; columns are listed
+            # explicitly so rows can be unpacked positionally
             result = self.session.execute(
-                text("SELECT * FROM recipe_service.calculate_recipe_hierarchy(:recipe_id)"),
-                {'recipe_id': recipe_id}
+                _HIERARCHY_WITH_PRODUCTS_SQL if include_product_details else _HIERARCHY_SQL,
+                {'recipe_id': recipe_id, 'max_depth': max_depth}
             )
-            
-            hierarchy = []
-            product_ids = set()
-            
-            for row in result:
-                hierarchy_item = {
-                    'ingredient_product_id': str(row.ingredient_product_id),
-                    'ingredient_name': row.ingredient_name,
-                    'quantity': float(row.quantity),
-                    'unit': row.unit,
-                    'depth_level': row.depth_level,
-                    'path': row.path
-                }
-                hierarchy.append(hierarchy_item)
-                product_ids.add(str(row.ingredient_product_id))
-            
-            # Check depth limit
-            max_actual_depth = max([item['depth_level'] for item in hierarchy], default=0)
-            if max_actual_depth > max_depth:
-                raise MaxDepthExceededError(max_depth)
-            
-            # Fetch product details if requested
-            if include_product_details and product_ids:
-                try:
-                    product_details = get_product_client().get_products_batch(list(product_ids))
-                    
-                    # Update hierarchy with product details
-                    for item in hierarchy:
-                        product_id = item['ingredient_product_id']
-                        if product_id in product_details:
-                            product = product_details[product_id]
-                            item.update({
-                                'ingredient_name': product.get('name', item['ingredient_name']),
-                                'product_type': product.get('type'),
-                                'product_unit': product.get('unit'),
-                                'product_description': product.get('description')
-                            })
-                except ProductServiceError as e:
-                    logger.warning("Failed to fetch product details for hierarchy", 
-                                 recipe_id=str(recipe_id), 
-                                 error=str(e))
-                    # Continue without product details
-            
-            logger.info("Recipe hierarchy calculated", 
-                       recipe_id=str(recipe_id),
-                       hierarchy_items=len(hierarchy),
-                       max_depth=max_actual_depth)
-            
-            return hierarchy
-            
         except Exception:
             logger.error("Error calculating recipe hierarchy", recipe_id=str(recipe_id))
             raise
+        
+        try:
+            for row in result:
+                ingredient_product_id, ingredient_name, quantity, unit, depth_level, path = row[:6]
+                
+                # Rows past the limit come first, so an exceeded limit
+                # raises on the first row without reading the rest
+                if depth_level > max_depth:
+                    raise MaxDepthExceededError(max_depth)
+                
+                item = {
+                    'ingredient_product_id': str(ingredient_product_id),
+                    'ingredient_name': ingredient_name,
+                    'quantity': float(quantity),
+                    'unit': unit,
+                    'depth_level': depth_level,
+                    'path': path
+                }
+                
+                if include_product_details:
+                    product_name, product_type, product_unit, product_description = row[6:]
+                    # Products missing from the catalog keep the bare hierarchy row
+                    if product_name is not None:
+                        item['ingredient_name'] = product_name
+                        item['product_type'] = product_type
+                        item['product_unit'] = product_unit
+                        item['product_description'] = product_description
+                
+                yield item
+        finally:
+            # Release the server-side cursor even if the consumer stops early
+            result.close()
     
-    def validate_recipe(self, recipe_id: UUID) -> Dict[str, Any]:
+    def validate_recipe(self, recipe_id: UUID) -> Optional[Dict[str, Any]]:
         """Validate a recipe using database function.
         
+        The existence check and the validation run in one statement: the
+        function is joined laterally to the recipe row, so an unknown recipe
+        yields no row.
+        
         Args:
             recipe_id: Recipe UUID
             
         Returns:
-            Validation results
+            Validation results, or None if recipe doesn't exist
         """
         try:
             result = self.session.execute(
-                text("SELECT * FROM recipe_service.validate_recipe(:recipe_id)"),
+                text(
+                    "SELECT v.is_valid, v.validation_errors "
+                    "FROM recipe_service.recipes r "
+                    "CROSS JOIN LATERAL recipe_service.validate_recipe(r.id) v "
+                    "WHERE r.id = :recipe_id"
+                ),
                 {'recipe_id': recipe_id}
             ).first()
             
+            if result is None:
+                return None
+            
             return {
                 'is_valid': result.is_valid,
                 'validation_errors': result.validation_errors or []
@@ -414,43 +725,119 @@ class RecipeRepository:
             
         except Exception:
             logger.error("Error validating recipe", recipe_id=str(recipe_id))
+            self.session.rollback()
+            if not self.session.query(Recipe.id).filter(Recipe.id == recipe_id).scalar():
+                return None
             return {
                 'is_valid': False,
                 'validation_errors': ['Validation function failed']
             }
     
-    def _create_ingredients(self, recipe: Recipe, ingredients_data: List[Dict[str, Any]]) -> None:
+    def _create_ingredients(
+        self,
+        recipe: Recipe,
+        ingredients_data: List[Dict[str, Any]],
+        validation_results: Optional[Dict[str, bool]] = None
+    ) -> None:
         """Create ingredients for a recipe.
         
         Args:
             recipe: Recipe instance
             ingredients_data: List of ingredient data
+            validation_results: Product existence already fetched by the caller,
+                keyed by product ID string; fetched here when omitted
         """
         if len(ingredients_data) > current_app.config['MAX_INGREDIENTS_PER_RECIPE']:
             raise TooManyIngredientsError(current_app.config['MAX_INGREDIENTS_PER_RECIPE'])
         
-        # Validate all ingredient products exist
-        product_ids = [ing['ingredient_product_id'] for ing in ingredients_data]
-        validation_results = get_product_client().validate_products_exist(product_ids)
+        # Validate all ingredient products exist (one Product Service request)
+        product_ids = list(dict.fromkeys(str(ing['ingredient_product_id']) for ing in ingredients_data))
+        if validation_results is None:
+            validation_results = get_product_client().validate_products_exist(product_ids)
         
-        invalid_products = [pid for pid, exists in validation_results.items() if not exists]
+        invalid_products = [pid for pid in product_ids if not validation_results.get(pid)]
         if invalid_products:
             raise RecipeValidationError(f"Invalid product IDs: {invalid_products}")
         
+        rows = [
+            {
+                'ingredient_product_id': ingredient_data['ingredient_product_id'],
+                'quantity': ingredient_data['quantity'],
+                'unit': IngredientUnit(ingredient_data['unit']),
+                'sort_order': ingredient_data.get('sort_order', idx),
+                'ingredient_group': ingredient_data.get('ingredient_group'),
+                'notes': ingredient_data.get('notes'),
+                'is_optional': ingredient_data.get('is_optional', False),
+                'substitute_ingredients': ingredient_data.get('substitute_ingredients')
+            }
+            for idx, ingredient_data in enumerate(ingredients_data)
+        ]
+        
+        # Flush pending changes (e.g. removed ingredients) before the Core INSERT
+        self.session.flush()
+        RecipeIngredient.bulk_create(self.session, recipe.id, rows)
+        
+        # Reload the collection so validation and serialization see the new rows
+        self.session.expire(recipe, ['ingredients'])
+    
+    def _sync_ingredients(self, recipe: Recipe, ingredients_data: List[Dict[str, Any]]) -> None:
+        """Replace a recipe's ingredients, writing only the rows that changed.
+        
+        Ingredients are matched by product: matching rows are updated in place
+        (the ORM emits an UPDATE only for changed columns), products no longer
+        listed are deleted with one statement, and only new products are
+        validated against the Product Service and inserted.
+        
+        Args:
+            recipe: Recipe instance with its ingredients loaded
+            ingredients_data: Complete new list of ingredient data
+        """
+        if len(ingredients_data) > current_app.config['MAX_INGREDIENTS_PER_RECIPE']:
+            raise TooManyIngredientsError(current_app.config['MAX_INGREDIENTS_PER_RECIPE'])
+        
+        existing = {ingredient.ingredient_product_id: ingredient for ingredient in recipe.ingredients}
+        new_rows = []
+        
         for idx, ingredient_data in enumerate(ingredients_data):
-            ingredient = RecipeIngredient(
-                recipe_id=recipe.id,
-                ingredient_product_id=ingredient_data['ingredient_product_id'],
-                quantity=ingredient_data['quantity'],
-                unit=IngredientUnit(ingredient_data['unit']),
-                sort_order=ingredient_data.get('sort_order', idx),
-                ingredient_group=ingredient_data.get('ingredient_group'),
-                notes=ingredient_data.get('notes'),
-                is_optional=ingredient_data.get('is_optional', False),
-                substitute_ingredients=ingredient_data.get('substitute_ingredients')
+            values = {
+                'quantity': ingredient_data['quantity'],
+                'unit': IngredientUnit(ingredient_data['unit']),
+                'sort_order': ingredient_data.get('sort_order', idx),
+                'ingredient_group': ingredient_data.get('ingredient_group'),
+                'notes': ingredient_data.get('notes'),
+                'is_optional': ingredient_data.get('is_optional', False),
+                'substitute_ingredients': ingredient_data.get('substitute_ingredients')
+            }
+            ingredient = existing.pop(ingredient_data['ingredient_product_id'], None)
+            if ingredient is None:
+                new_rows.append({'ingredient_product_id': ingredient_data['ingredient_product_id'], **values})
+                continue
+            for key, value in values.items():
+                if getattr(ingredient, key) != value:
+                    setattr(ingredient, key, value)
+        
+        if new_rows:
+            product_ids = [str(row['ingredient_product_id']) for row in new_rows]
+            validation_results = get_product_client().validate_products_exist(product_ids)
+            invalid_products = [pid for pid in product_ids if not validation_results.get(pid)]
+            if invalid_products:
+                raise RecipeValidationError(f"Invalid product IDs: {invalid_products}")
+        
+        # Flush in-place updates before the Core DELETE/INSERT
+        self.session.flush()
+        
+        if existing:
+            removed_ids = [ingredient.id for ingredient in existing.values()]
+            self.session.execute(
+                RecipeIngredient.__table__.delete().where(RecipeIngredient.id.in_(removed_ids))
             )
-            
-            recipe.ingredients.append(ingredient)
+            for ingredient in existing.values():
+                self.session.expunge(ingredient)
+        
+        RecipeIngredient.bulk_create(self.session, recipe.id, new_rows)
+        
+        # Reload the collection so validation and serialization see the new rows
+        self.session.expire(recipe, ['ingredients'])
     
     def _assign_tags(self, recipe: Recipe, tag_ids: List[UUID]) -> None:
         """Assign tags to a recipe.
@@ -459,30 +846,55 @@ class RecipeRepository:
             recipe: Recipe instance
             tag_ids: List of tag UUIDs
         """
-        if tag_ids:
-            tags = self.session.query(RecipeTag).filter(
-                RecipeTag.id.in_(tag_ids)
-            ).all()
-            recipe.tags = tags
+        if not tag_ids:
+            return
+        
+        tag_ids = list(dict.fromkeys(tag_ids))
+        with _tag_cache_lock:
+            cached = {tag_id: _tag_cache[tag_id] for tag_id in tag_ids if tag_id in _tag_cache}
+        
+        missing = [tag_id for tag_id in tag_ids if tag_id not in cached]
+        tags = []
+        if missing:
+            tags = self.session.query(RecipeTag).filter(RecipeTag.id.in_(missing)).all()
+            with _tag_cache_lock:
+                for tag in tags:
+                    _tag_cache[tag.id] = tag.to_dict()
+        
+        for values in cached.values():
+            # Attach the cached tag to the session without a SELECT
+            tag = RecipeTag(**values)
+            make_transient_to_detached(tag)
+            tags.append(self.session.merge(tag, load=False))
+        
+        recipe.tags = tags
     
-    def _validate_recipe(self, recipe: Recipe) -> None:
+    def _validate_recipe(self, optional_flags: Iterable[bool]) -> None:
         """Validate recipe business rules.
         
+        Runs on the ingredient data being written, so the ingredients
+        collection doesn't have to be reloaded after the insert.
+        
         Args:
-            recipe: Recipe instance
+            optional_flags: is_optional of each of the recipe's ingredients
             
         Raises:
             RecipeValidationError: If validation fails
         """
         errors = []
+        ingredient_count = 0
+        has_required = False
+        for is_optional in optional_flags:
+            ingredient_count += 1
+            if not is_optional:
+                has_required = True
         
         # Must have at least one ingredient
-        if not recipe.ingredients:
+        if not ingredient_count:
             errors.append("Recipe must have at least one ingredient")
         
         # Check for required ingredients
-        required_ingredients = [ing for ing in recipe.ingredients if not ing.is_optional]
-        if not required_ingredients:
+        if not has_required:
             errors.append("Recipe must have at least one required ingredient")
         
         if errors:
@@ -494,26 +906,25 @@ class RecipeRepository:
         Args:
             recipe: Recipe instance
         """
-        # Remove existing dependencies
-        self.session.query(RecipeDependency).filter(
+        child_product_ids = {ingredient.ingredient_product_id for ingredient in recipe.ingredients}
+        
+        # Remove dependencies on products that are no longer ingredients
+        delete_stmt = RecipeDependency.__table__.delete().where(
             RecipeDependency.parent_recipe_id == recipe.id
-        ).delete()
-        
-        # Add new dependencies
-        for ingredient in recipe.ingredients:
-            dependency = RecipeDependency(
-                parent_recipe_id=recipe.id,
-                child_product_id=ingredient.ingredient_product_id,
-                dependency_type='ingredient',
-                depth_level=1
-            )
-            self.session.add(dependency)
+        )
+        if child_product_ids:
+            delete_stmt = delete_stmt.where(RecipeDependency.child_product_id.notin_(child_product_ids))
+        self.session.execute(delete_stmt)
+        
+        # Add the new ones; existing pairs are left as they are
+        RecipeDependency.bulk_create(self.session, recipe.id, list(child_product_ids))
     
-    def _should_increment_version(self, old_data: Dict[str, Any], new_data: Dict[str, Any]) -> bool:
+    def _should_increment_version(self, new_data: Dict[str, Any]) -> bool:
         """Determine if recipe changes warrant version increment.
         
+        Only the fields present in the update matter, not their old values.
+        
         Args:
-            old_data: Old recipe data
             new_data: New recipe data
             
         Returns:
@@ -527,24 +938,87 @@ class RecipeRepository:
         
         return False
     
-    def _create_version_snapshot(self, recipe: Recipe, change_summary: str, created_by: Optional[UUID]) -> None:
-        """Create a version snapshot of the recipe.
+    def _create_version_snapshot(
+        self,
+        recipe: Recipe,
+        change_summary: str,
+        created_by: Optional[UUID]
+    ) -> None:
+        """Add a version snapshot of a recipe to the current transaction.
+        
+        The first version and every VERSION_CHECKPOINT_INTERVAL-th one after it
+        store the complete snapshot; the others store only a patch against the
+        previous version. The caller commits it together with the recipe.
         
         Args:
-            recipe: Recipe instance
+            recipe: Recipe instance, flushed
             change_summary: Description of changes
             created_by: User who made the changes
         """
+        # Compare in stored JSON form, so UUIDs, Decimals and datetimes match
+        # what comes back from the previous versions
+        snapshot = json_loads(json_dumps(recipe.to_dict(include_relationships=True)))
+        previous, chain_length = _latest_version_data(recipe.id)
+        
         version = RecipeVersion(
             recipe_id=recipe.id,
             version_number=recipe.version,
-            recipe_data=recipe.to_dict(include_relationships=True),
             change_summary=change_summary,
             created_by=created_by
         )
-        
+        if previous is None or chain_length >= VERSION_CHECKPOINT_INTERVAL:
+            version.recipe_data = snapshot
+        else:
+            version.patch = _snapshot_patch(previous, snapshot)
         self.session.add(version)
     
+    def iter_versions(self, recipe_id: UUID, batch_size: int = 100) -> Iterator[Dict[str, Any]]:
+        """Iterate over a recipe's version snapshots, newest first.
+        
+        Rows are fetched through a server-side cursor ``batch_size`` at a time.
+        Patch versions are held until their checkpoint row arrives (at most
+        VERSION_CHECKPOINT_INTERVAL rows) and are then rebuilt from it, so only
+        one batch plus one checkpoint run of snapshots is held in memory.
+        
+        Args:
+            recipe_id: Recipe UUID
+            batch_size: Number of rows fetched per round trip
+            
+        Returns:
+            Iterator of version dictionaries with complete recipe_data
+        """
+        stmt = (
+            select(RecipeVersion)
+            .options(undefer(RecipeVersion.recipe_data), undefer(RecipeVersion.patch))
+            .where(RecipeVersion.recipe_id == recipe_id)
+            .order_by(RecipeVersion.version_number.desc())
+            .execution_options(yield_per=batch_size)
+        )
+        
+        pending = []
+        for version in self.session.execute(stmt).scalars():
+            pending.append(version)
+            if not version.is_checkpoint:
+                continue
+            
+            # Replay the run oldest first, then emit it newest first
+            rebuilt = []
+            snapshot = None
+            for pending_version in reversed(pending):
+                if pending_version.is_checkpoint:
+                    snapshot = pending_version.recipe_data
+                else:
+                    snapshot = _apply_snapshot_patch(snapshot, pending_version.patch)
+                rebuilt.append({**pending_version.to_dict(), 'recipe_data': snapshot})
+            yield from reversed(rebuilt)
+            pending = []
+        
+        if pending:
+            logger.warning("Recipe versions without a checkpoint", recipe_id=str(recipe_id),
+                           count=len(pending))
+            for version in pending:
+                yield version.to_dict()
+    
     def get_recipe_dependencies(self, recipe_id: UUID) -> List[Dict[str, Any]]:
         """Get all dependencies for a recipe.
         
@@ -565,24 +1039,21 @@ class RecipeRepository:
             logger.error("Error fetching recipe dependencies", recipe_id=str(recipe_id))
             raise
     
-    def get_recipes_using_product(self, product_id: UUID) -> List[Recipe]:
+    def get_recipes_using_product(self, product_id: UUID) -> List[Tuple[Recipe, RecipeIngredient]]:
         """Get all recipes that use a specific product as ingredient.
         
+        A recipe lists each ingredient product at most once, so every recipe
+        appears once, paired with its ingredient row for the product.
+        
         Args:
             product_id: Product UUID
             
         Returns:
-            List of recipes using this product
+            List of (recipe, matching ingredient) tuples
         """
         try:
-            recipes = self.session.query(Recipe).join(
-                RecipeIngredient,
-                Recipe.id == RecipeIngredient.recipe_id
-            ).filter(
-                RecipeIngredient.ingredient_product_id == product_id
-            ).distinct().all()
-            
-            return recipes
+            rows = self.session.execute(_RECIPES_USING_PRODUCT, {'product_id': product_id})
+            return [tuple(row) for row in rows]
             
         except Exception:
             logger.error("Error finding recipes using product", product_id=str(product_id))
@@ -598,22 +1069,44 @@ class RecipeRepository:
             Dictionary with complexity metrics
         """
         try:
-            recipe = self.get_by_id(recipe_id, include_relationships=True)
+            # Only the ingredient columns the metrics read are fetched
+            recipe = self.session.query(Recipe).options(
+                load_only(Recipe.id),
+                selectinload(Recipe.ingredients).load_only(
+                    RecipeIngredient.ingredient_group,
+                    RecipeIngredient.is_optional
+                )
+            ).filter(Recipe.id == recipe_id).first()
             if not recipe:
                 raise RecipeNotFoundError(str(recipe_id))
             
-            # Get hierarchy for complexity analysis
-            hierarchy = self.get_recipe_hierarchy(recipe_id, include_product_details=False)
+            # Stream the hierarchy through running counters instead of building the list
+            hierarchy_depth = 1
+            total_expanded = 0
+            for item in self.iter_recipe_hierarchy(recipe_id, include_product_details=False):
+                total_expanded += 1
+                if item['depth_level'] > hierarchy_depth:
+                    hierarchy_depth = item['depth_level']
+            
+            # Count ingredients, optional ones and groups in one pass
+            ingredient_count = optional_count = 0
+            groups = set()
+            for ingredient in recipe.ingredients:
+                ingredient_count += 1
+                if ingredient.is_optional:
+                    optional_count += 1
+                if ingredient.ingredient_group:
+                    groups.add(ingredient.ingredient_group)
             
             # Calculate metrics
             metrics = {
-                'ingredient_count': len(recipe.ingredients),
-                'hierarchy_depth': max([item['depth_level'] for item in hierarchy], default=1),
-                'total_ingredients_expanded': len(hierarchy),
+                'ingredient_count': ingredient_count,
+                'hierarchy_depth': hierarchy_depth,
+                'total_ingredients_expanded': total_expanded,
                 'complexity_score': 0,
-                'ingredient_groups': len(set(ing.ingredient_group for ing in recipe.ingredients if ing.ingredient_group)),
-                'optional_ingredients': len([ing for ing in recipe.ingredients if ing.is_optional]),
-                'required_ingredients': len([ing for ing in recipe.ingredients if not ing.is_optional])
+                'ingredient_groups': len(groups),
+                'optional_ingredients': optional_count,
+                'required_ingredients': ingredient_count - optional_count
             }
             
             # Calculate complexity score
@@ -651,15 +1144,13 @@ class RecipeIngredientRepository:
     
     def get_by_id(self, ingredient_id: UUID) -> Optional[RecipeIngredient]:
         """Get recipe ingredient by ID."""
-        return self.session.query(self.model).filter(self.model.id == ingredient_id).first()
+        return self.session.execute(_INGREDIENT_BY_ID, {'ingredient_id': ingredient_id}).scalars().first()
     
     def get_by_recipe(self, recipe_id: UUID) -> List[RecipeIngredient]:
         """Get all ingredients for a recipe."""
-        return self.session.query(self.model).filter(
-            self.model.recipe_id == recipe_id
-        ).order_by(self.model.sort_order).all()
+        return self.session.execute(_INGREDIENTS_BY_RECIPE, {'recipe_id': recipe_id}).scalars().all()
     
-    def update(self, ingredient_id: UUID, ingredient_data: Dict[str, Any]) -> RecipeIngredient:
+    def update(self, ingredient_id: UUID, ingredient_data: Dict[str, Any]) -> Optional[RecipeIngredient]:
         """Update a recipe ingredient.
         
         Args:
@@ -667,14 +1158,11 @@ class RecipeIngredientRepository:
             ingredient_data: Updated ingredient data
             
         Returns:
-            Updated RecipeIngredient instance
-            
-        Raises:
-            RecipeIngredientNotFoundError: If ingredient doesn't exist
+            Updated RecipeIngredient instance, or None if not found
         """
         ingredient = self.get_by_id(ingredient_id)
         if not ingredient:
-            raise RecipeIngredientNotFoundError(str(ingredient_id))
+            return None
         
         try:
             # Update fields
@@ -694,6 +1182,8 @@ class RecipeIngredientRepository:
                 ingredient.substitute_ingredients = ingredient_data['substitute_ingredients']
             
             self.session.commit()
+            
+            invalidate_recipe(ingredient.recipe_id, ingredient.recipe.product_id)
             return ingredient
             
         except Exception:
@@ -714,8 +1204,11 @@ class RecipeIngredientRepository:
             return False
         
         try:
+            recipe_id, product_id = ingredient.recipe_id, ingredient.recipe.product_id
             self.session.delete(ingredient)
             self.session.commit()
+            
+            invalidate_recipe(recipe_id, product_id)
             return True
         except Exception:
             self.session.rollback()
@@ -735,11 +1228,12 @@ class RecipeTagRepository:
     
     def get_by_id(self, tag_id: UUID) -> Optional[RecipeTag]:
         """Get tag by ID."""
-        return self.session.query(self.model).filter(self.model.id == tag_id).first()
+        return self.session.execute(_TAG_BY_ID, {'tag_id': tag_id}).scalars().first()
     
     def create(self, tag_data: Dict[str, Any]) -> RecipeTag:
         """Create a new tag."""
         tag = RecipeTag(**tag_data)
         self.session.add(tag)
         self.session.commit()
+        invalidate_tags()
         return tag
\ No newline at end of file
@@ -0,0 +1,127 @@
+"""Redis look-aside cache for serialized recipe responses."""
+from typing import Any, Optional, Union
+from uuid import UUID
+
+import structlog
+from flask import current_app
+from redis.exceptions import RedisError
+
+from ..extensions import get_redis_connection
+
+logger = structlog.get_logger("recipe_service.cache")
+
+# Entries derived from many recipes carry this counter in their key; any
+# recipe write bumps it, so the old entries are never read again and expire
+GENERATION_KEY = 'recipe:generation'
+
+TAGS_KEY = 'recipe:tags:all'
+
+
+def recipe_key(recipe_id: UUID) -> str:
+    """Cache key for a recipe with relationships."""
+    return f'recipe:{recipe_id}:full'
+
+
+def recipe_by_product_key(product_id: UUID) -> str:
+    """Cache key for the active recipe of a product."""
+    return f'recipe:by-product:{product_id}'
+
+
+def recipes_using_product_key(product_id: UUID) -> str:
+    """Cache key for the recipes that use a product as ingredient."""
+    return f'recipe:using-product:g{_generation()}:{product_id}'
+
+
+def recipe_hierarchy_key(recipe_id: UUID, *params: Any) -> str:
+    """Cache key for a recipe hierarchy expansion with the given query parameters."""
+    return (
+        f'recipe:hierarchy:g{_generation()}:{recipe_id}:'
+        + ':'.join(str(param) for param in params)
+    )
+
+
+def _connection():
+    if not current_app.config['RECIPE_CACHE_ENABLED']:
+        return None
+    return get_redis_connection()
+
+
+def _generation() -> int:
+    """Current generation of the entries derived from many recipes."""
+    redis_conn = _connection()
+    if redis_conn is None:
+        return 0
+    try:
+        return int(redis_conn.get(GENERATION_KEY) or 0)
+    except RedisError as e:
+        logger.warning("Cache read failed", key=GENERATION_KEY, error=str(e))
+        return 0
+
+
+def cache_get(key: str) -> Optional[bytes]:
+    """Get a cached response body.
+    
+    Args:
+        key: Cache key
+    
+    Returns:
+        Serialized JSON body, or None on a miss or when Redis is unavailable
+    """
+    redis_conn = _connection()
+    if redis_conn is None:
+        return None
+    try:
+        return redis_conn.get(key)
+    except RedisError as e:
+        logger.warning("Cache read failed", key=key, error=str(e))
+        return None
+
+
+def cache_set(key: str, body: Union[str, bytes], ttl: Optional[int] = None) -> None:
+    """Store a serialized response body.
+    
+    Args:
+        key: Cache key
+        body: Serialized JSON body
+        ttl: Time to live in seconds (defaults to RECIPE_CACHE_TTL)
+    """
+    redis_conn = _connection()
+    if redis_conn is None:
+        return
+    try:
+        redis_conn.setex(key, ttl or current_app.config['RECIPE_CACHE_TTL'], body)
+    except RedisError as e:
+        logger.warning("Cache write failed", key=key, error=str(e))
+
+
+def invalidate_recipe(recipe_id: UUID, product_id: Optional[UUID] = None) -> None:
+    """Drop every cached response a recipe write can change.
+    
+    Args:
+        recipe_id: Recipe UUID
+        product_id: Product the recipe belongs to
+    """
+    redis_conn = _connection()
+    if redis_conn is None:
+        return
+    try:
+        keys = [recipe_key(recipe_id)]
+        if product_id is not None:
+            keys.append(recipe_by_product_key(product_id))
+        pipe = redis_conn.pipeline()
+        pipe.delete(*keys)
+        pipe.incr(GENERATION_KEY)
+        pipe.execute()
+    except RedisError as e:
+        logger.warning("Cache invalidation failed", recipe_id=str(recipe_id), error=str(e))
+
+
+def invalidate_tags() -> None:
+    """Drop the cached tag list after a tag write."""
+    redis_conn = _connection()
+    if redis_conn is None:
+        return
+    try:
+        redis_conn.delete(TAGS_KEY)
+    except RedisError as e:
+        logger.warning("Cache invalidation failed", key=TAGS_KEY, error=str(e))
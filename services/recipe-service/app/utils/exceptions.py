@@ -1,11 +1,15 @@
 """Custom exceptions and error handlers for the Recipe Service."""
+import re
+from typing import Any, Dict, Optional
+
 import structlog
-from flask import Flask, jsonify
+from flask import Flask, Response
 from marshmallow import ValidationError
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from werkzeug.exceptions import HTTPException
 
 from ..services.product_client import ProductServiceError
+from .serialization import json_dumps
 
 logger = structlog.get_logger("recipe_service.exceptions")
 
@@ -74,150 +78,218 @@ class TooManyIngredientsError(RecipeServiceError):
         super().__init__(f"Recipe exceeds maximum allowed ingredients ({max_ingredients})", 400)
 
 
+def _error_body(error: str, status_code: int, details: Optional[Dict[str, Any]] = None) -> str:
+    """Serialize an error response body.
+    
+    Args:
+        error: Error summary
+        status_code: HTTP status code
+        details: Optional error details
+        
+    Returns:
+        JSON string
+    """
+    body = {'error': error, 'status_code': status_code}
+    if details:
+        body['details'] = details
+    return json_dumps(body)
+
+
+def _json_response(body: str, status_code: int) -> Response:
+    """Wrap a serialized error body in a JSON response."""
+    return Response(body, status=status_code, mimetype='application/json')
+
+
+# Error bodies that never change, serialized once at import
+_PRODUCT_RECIPE_EXISTS_BODY = _error_body(
+    'Recipe for this product already exists', 409,
+    {'field': 'product_id', 'message': 'A recipe for this product already exists'}
+)
+_FOREIGN_KEY_BODY = _error_body(
+    'Invalid reference to related entity', 400,
+    {'message': 'Referenced entity does not exist'}
+)
+_CONSTRAINT_VIOLATION_BODY = _error_body(
+    'Database constraint violation', 409,
+    {'message': 'The operation violates a database constraint'}
+)
+_DATABASE_ERROR_BODY = _error_body(
+    'Database error occurred', 500,
+    {'message': 'An internal database error occurred'}
+)
+_NOT_FOUND_BODY = _error_body(
+    'Resource not found', 404,
+    {'message': 'The requested resource was not found'}
+)
+_METHOD_NOT_ALLOWED_BODY = _error_body(
+    'Method not allowed', 405,
+    {'message': 'The HTTP method is not allowed for this resource'}
+)
+_INTERNAL_ERROR_BODY = _error_body(
+    'Internal server error', 500,
+    {'message': 'An unexpected error occurred'}
+)
+
+
+# Unique (product_id, version) constraint: named in the models, default name
+# from the SQL schema's unnamed UNIQUE clause
+_PRODUCT_VERSION_CONSTRAINTS = frozenset({
+    'recipes_product_version_unique',
+    'recipes_product_id_version_key'
+})
+
+
+def _unique_violation_response(orig) -> Response:
+    """Response for a unique_violation reported by PostgreSQL."""
+    if getattr(orig.diag, 'constraint_name', None) in _PRODUCT_VERSION_CONSTRAINTS:
+        return _json_response(_PRODUCT_RECIPE_EXISTS_BODY, 409)
+    return _json_response(_CONSTRAINT_VIOLATION_BODY, 409)
+
+
+def _foreign_key_violation_response(orig) -> Response:
+    """Response for a foreign_key_violation reported by PostgreSQL."""
+    return _json_response(_FOREIGN_KEY_BODY, 400)
+
+
+# Integrity error responses by PostgreSQL SQLSTATE
+_SQLSTATE_RESPONSES = {
+    '23505': _unique_violation_response,
+    '23503': _foreign_key_violation_response
+}
+
+# Message patterns for drivers without SQLSTATE codes (SQLite in tests)
+_UNIQUE_MESSAGE_RE = re.compile(r'unique constraint', re.IGNORECASE)
+_FOREIGN_KEY_MESSAGE_RE = re.compile(r'foreign key', re.IGNORECASE)
+
+
+def handle_recipe_service_error(error: RecipeServiceError):
+    """Handle custom Recipe Service errors."""
+    logger.error(
+        "Recipe service error",
+        error=error.message,
+        status_code=error.status_code,
+        payload=error.payload
+    )
+    
+    return _json_response(
+        _error_body(error.message, error.status_code, error.payload),
+        error.status_code
+    )
+
+
+def handle_product_service_error(error: ProductServiceError):
+    """Handle Product Service communication errors."""
+    # Connection failures carry no status code; they answer 503
+    message = str(error)
+    status_code = error.status_code or 503
+    logger.error(
+        "Product service communication error",
+        error=message,
+        status_code=status_code
+    )
+    
+    return _json_response(
+        _error_body('External service communication failed', status_code, {'message': message}),
+        status_code
+    )
+
+
+def handle_validation_error(error: ValidationError):
+    """Handle Marshmallow validation errors."""
+    logger.warning(
+        "Validation error",
+        errors=error.messages if hasattr(error, 'messages') else str(error)
+    )
+    
+    if hasattr(error, 'messages'):
+        details = error.messages
+    else:
+        details = {'message': str(error)}
+    return _json_response(_error_body('Validation failed', 400, details), 400)
+
+
+def handle_integrity_error(error: IntegrityError):
+    """Handle database integrity errors."""
+    logger.error("Database integrity error", error=str(error))
+    
+    # Dispatch on the SQLSTATE and constraint name when the driver reports them
+    pgcode = getattr(error.orig, 'pgcode', None)
+    if pgcode is not None:
+        respond = _SQLSTATE_RESPONSES.get(pgcode)
+        if respond is not None:
+            return respond(error.orig)
+        return _json_response(_CONSTRAINT_VIOLATION_BODY, 409)
+    
+    # Otherwise parse the driver message
+    error_msg = str(error.orig)
+    
+    if _UNIQUE_MESSAGE_RE.search(error_msg):
+        if any(name in error_msg for name in _PRODUCT_VERSION_CONSTRAINTS):
+            return _json_response(_PRODUCT_RECIPE_EXISTS_BODY, 409)
+    
+    if _FOREIGN_KEY_MESSAGE_RE.search(error_msg):
+        return _json_response(_FOREIGN_KEY_BODY, 400)
+    
+    return _json_response(_CONSTRAINT_VIOLATION_BODY, 409)
+
+
+def handle_database_error(error: SQLAlchemyError):
+    """Handle general database errors."""
+    logger.error("Database error", error=str(error))
+    
+    return _json_response(_DATABASE_ERROR_BODY, 500)
+
+
+def handle_http_exception(error: HTTPException):
+    """Handle HTTP exceptions."""
+    logger.warning(
+        "HTTP exception",
+        status_code=error.code,
+        description=error.description
+    )
+    
+    return _json_response(
+        _error_body(error.name, error.code, {'message': error.description}),
+        error.code
+    )
+
+
+def handle_not_found(error):
+    """Handle 404 errors."""
+    return _json_response(_NOT_FOUND_BODY, 404)
+
+
+def handle_method_not_allowed(error):
+    """Handle 405 errors."""
+    return _json_response(_METHOD_NOT_ALLOWED_BODY, 405)
+
+
+def handle_internal_error(error):
+    """Handle 500 errors."""
+    logger.error("Internal server error", error=str(error))
+    
+    return _json_response(_INTERNAL_ERROR_BODY, 500)
+
+
+# Handlers by exception class or status code, registered in this order
+_HANDLERS = (
+    (RecipeServiceError, handle_recipe_service_error),
+    (ProductServiceError, handle_product_service_error),
+    (ValidationError, handle_validation_error),
+    (IntegrityError, handle_integrity_error),
+    (SQLAlchemyError, handle_database_error),
+    (HTTPException, handle_http_exception),
+    (404, handle_not_found),
+    (405, handle_method_not_allowed),
+    (500, handle_internal_error)
+)
+
+
 def register_error_handlers(app: Flask) -> None:
     """Register error handlers for the Flask application.
     
     Args:
         app: Flask application instance
     """
-    
-    @app.errorhandler(RecipeServiceError)
-    def handle_recipe_service_error(error: RecipeServiceError):
-        """Handle custom Recipe Service errors."""
-        logger.error(
-            "Recipe service error",
-            error=error.message,
-            status_code=error.status_code,
-            payload=error.payload
-        )
-        
-        response = {
-            'error': error.message,
-            'status_code': error.status_code
-        }
-        
-        if error.payload:
-            response['details'] = error.payload
-            
-        return jsonify(response), error.status_code
-    
-    @app.errorhandler(ProductServiceError)
-    def handle_product_service_error(error: ProductServiceError):
-        """Handle Product Service communication errors."""
-        logger.error(
-            "Product service communication error",
-            error=str(error),
-            status_code=getattr(error, 'status_code', None)
-        )
-        
-        status_code = getattr(error, 'status_code', 503)
-        return jsonify({
-            'error': 'External service communication failed',
-            'status_code': status_code,
-            'details': {'message': str(error)}
-        }), status_code
-    
-    @app.errorhandler(ValidationError)
-    def handle_validation_error(error: ValidationError):
-        """Handle Marshmallow validation errors."""
-        logger.warning(
-            "Validation error",
-            errors=error.messages if hasattr(error, 'messages') else str(error)
-        )
-        
-        if hasattr(error, 'messages'):
-            return jsonify({
-                'error': 'Validation failed',
-                'status_code': 400,
-                'details': error.messages
-            }), 400
-        else:
-            return jsonify({
-                'error': 'Validation failed',
-                'status_code': 400,
-                'details': {'message': str(error)}
-            }), 400
-    
-    @app.errorhandler(IntegrityError)
-    def handle_integrity_error(error: IntegrityError):
-        """Handle database integrity errors."""
-        logger.error("Database integrity error", error=str(error))
-        
-        # Parse common integrity errors
-        error_msg = str(error.orig)
-        
-        if 'unique constraint' in error_msg.lower():
-            if 'recipes_product_id_unique' in error_msg:
-                return jsonify({
-                    'error': 'Recipe for this product already exists',
-                    'status_code': 409,
-                    'details': {'field': 'product_id', 'message': 'A recipe for this product already exists'}
-                }), 409
-        
-        if 'foreign key' in error_msg.lower():
-            return jsonify({
-                'error': 'Invalid reference to related entity',
-                'status_code': 400,
-                'details': {'message': 'Referenced entity does not exist'}
-            }), 400
-        
-        return jsonify({
-            'error': 'Database constraint violation',
-            'status_code': 409,
-            'details': {'message': 'The operation violates a database constraint'}
-        }), 409
-    
-    @app.errorhandler(SQLAlchemyError)
-    def handle_database_error(error: SQLAlchemyError):
-        """Handle general database errors."""
-        logger.error("Database error", error=str(error))
-        
-        return jsonify({
-            'error': 'Database error occurred',
-            'status_code': 500,
-            'details': {'message': 'An internal database error occurred'}
-        }), 500
-    
-    @app.errorhandler(HTTPException)
-    def handle_http_exception(error: HTTPException):
-        """Handle HTTP exceptions."""
-        logger.warning(
-            "HTTP exception",
-            status_code=error.code,
-            description=error.description
-        )
-        
-        return jsonify({
-            'error': error.name,
-            'status_code': error.code,
-            'details': {'message': error.description}
-        }), error.code
-    
-    @app.errorhandler(404)
-    def handle_not_found(error):
-        """Handle 404 errors."""
-        return jsonify({
-            'error': 'Resource not found',
-            'status_code': 404,
-            'details': {'message': 'The requested resource was not found'}
-        }), 404
-    
-    @app.errorhandler(405)
-    def handle_method_not_allowed(error):
-        """Handle 405 errors."""
-        return jsonify({
-            'error': 'Method not allowed',
-            'status_code': 405,
-            'details': {'message': 'The HTTP method is not allowed for this resource'}
-        }), 405
-    
-    @app.errorhandler(500)
-    def handle_internal_error(error):
-        """Handle 500 errors."""
-        logger.error("Internal server error", error=str(error))
-        
-        return jsonify({
-            'error': 'Internal server error',
-            'status_code': 500,
-            'details': {'message': 'An unexpected error occurred'}
-        }), 500
\ No newline at end of file
+    for exception, handler in _HANDLERS:
+        app.register_error_handler(exception, handler)
@@ -0,0 +1,65 @@
+"""Non-blocking output for structlog events."""
+import atexit
+import logging
+import queue
+import sys
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+# Rendered events waiting for the writer; further events are dropped when full
+LOG_QUEUE_SIZE = 10_000
+
+OUTPUT_LOGGER_NAME = 'recipe_service.output'
+
+_listener: Optional[QueueListener] = None
+_listener_lock = threading.Lock()
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that drops records when the queue is full.
+    
+    A burst of errors then costs lost log lines instead of blocked request
+    threads or unbounded memory.
+    """
+    
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+    
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def get_output_logger() -> logging.Logger:
+    """Get the stdlib logger that structlog writes rendered events to.
+    
+    Request threads only put records on a bounded queue; a QueueListener
+    thread, started on first use and stopped at exit, does the stdout writes.
+    
+    Returns:
+        Logger for already rendered event lines
+    """
+    global _listener
+    output = logging.getLogger(OUTPUT_LOGGER_NAME)
+    if _listener is not None:
+        return output
+    
+    with _listener_lock:
+        if _listener is None:
+            log_queue: queue.Queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+            stream_handler = logging.StreamHandler(sys.stdout)
+            stream_handler.setFormatter(logging.Formatter('%(message)s'))
+            
+            # structlog filters by level before rendering, so pass everything
+            output.addHandler(DroppingQueueHandler(log_queue))
+            output.setLevel(logging.DEBUG)
+            output.propagate = False
+            
+            _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+            _listener.start()
+            atexit.register(_listener.stop)
+    return output
@@ -0,0 +1,43 @@
+"""Opaque cursors for keyset pagination of recipe lists."""
+import base64
+import binascii
+from typing import Tuple
+from uuid import UUID
+
+import orjson
+
+
+def encode_cursor(name: str, recipe_id: UUID) -> str:
+    """Encode the sort key of the last row on a page as a cursor.
+    
+    Args:
+        name: Recipe name of the last row
+        recipe_id: Recipe UUID of the last row
+    
+    Returns:
+        URL-safe cursor string
+    """
+    payload = orjson.dumps([name, str(recipe_id)])
+    return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[str, UUID]:
+    """Decode a cursor produced by encode_cursor.
+    
+    Args:
+        cursor: Cursor string
+    
+    Returns:
+        Tuple of (recipe name, recipe UUID)
+    
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        name, recipe_id = orjson.loads(base64.urlsafe_b64decode(padded))
+        if not isinstance(name, str):
+            raise ValueError(name)
+        return name, UUID(recipe_id)
+    except (binascii.Error, orjson.JSONDecodeError, AttributeError, TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
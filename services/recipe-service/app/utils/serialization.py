@@ -0,0 +1,79 @@
+"""JSON serialization helpers backed by orjson."""
+import time
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any, Union
+
+import orjson
+from flask.json.provider import DefaultJSONProvider
+
+# Naive datetimes are treated as UTC so every timestamp is emitted as ...Z
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z
+
+# (epoch second, formatted timestamp) of the last utc_now_iso() call
+_iso_now_cache = (0, '')
+
+
+def _default(value: Any) -> Any:
+    """Serialize types orjson does not handle natively."""
+    if isinstance(value, Decimal):
+        return str(value)
+    if hasattr(value, '__html__'):
+        return str(value.__html__())
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def json_dumps(value: Any) -> str:
+    """Serialize a value to a JSON string.
+    
+    Args:
+        value: Value to serialize (UUIDs, datetimes and enums are supported natively)
+        
+    Returns:
+        JSON string
+    """
+    return orjson.dumps(value, default=_default, option=ORJSON_OPTIONS).decode()
+
+
+def json_loads(value: Any) -> Any:
+    """Deserialize a JSON string or bytes.
+    
+    Args:
+        value: JSON document
+        
+    Returns:
+        Deserialized value
+    """
+    return orjson.loads(value)
+
+
+def utc_now_iso() -> str:
+    """Current UTC time as an ISO 8601 string, at second granularity.
+    
+    The formatted string is reused for every call within the same second.
+    
+    Returns:
+        Timestamp such as ``2024-01-01T12:00:00Z``
+    """
+    global _iso_now_cache
+    second = int(time.time())
+    cached_second, cached_iso = _iso_now_cache
+    if second != cached_second:
+        cached_iso = datetime.fromtimestamp(second, timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+        _iso_now_cache = (second, cached_iso)
+    return cached_iso
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider that serializes responses with orjson."""
+    
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        option = ORJSON_OPTIONS
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=_default, option=option).decode()
+    
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        return orjson.loads(s)
@@ -1,24 +1,69 @@
 """Pytest configuration and fixtures for Recipe Service tests."""
+import sqlite3
+
 import pytest
 from unittest.mock import Mock, patch
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
 from app import create_app
 from app.extensions import db
 
 
-@pytest.fixture
+@event.listens_for(Engine, 'connect')
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Trade durability for speed on the throwaway test database.
+    
+    Registered on all engines at import, before create_app, so it also runs
+    for the one connection StaticPool keeps for the session.
+    """
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA journal_mode=MEMORY')
+    cursor.execute('PRAGMA synchronous=OFF')
+    cursor.execute('PRAGMA temp_store=MEMORY')
+    cursor.close()
+
+
+@pytest.fixture(scope='session')
 def app():
-    """Create application for testing."""
+    """Create application for testing, shared by the whole session."""
     app = create_app('TestingConfig')
     app.config.update({
         'TESTING': True,
-        'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
         'PRODUCT_SERVICE_URL': 'http://mock-product-service'
     })
     
     with app.app_context():
-        db.create_all()
         yield app
-        db.drop_all()
+
+
+@pytest.fixture(scope='session')
+def database(app):
+    """Build the schema once per session for the DB-backed tests."""
+    if db.engine.dialect.name != 'postgresql':
+        pytest.skip('DB-backed tests need PostgreSQL; set TEST_DATABASE_URL')
+    
+    db.session.execute(text('CREATE SCHEMA IF NOT EXISTS recipe_service'))
+    db.session.commit()
+    db.create_all()
+    yield db
+    db.session.remove()
+    db.drop_all()
+
+
+@pytest.fixture
+def clean_tables(database):
+    """Empty every table after a DB-backed test instead of rebuilding the schema.
+    
+    Opt in per module with ``pytestmark = pytest.mark.usefixtures('clean_tables')``.
+    """
+    yield
+    # Drop whatever the test left in the session, then delete children first
+    db.session.remove()
+    for table in reversed(db.metadata.sorted_tables):
+        db.session.execute(table.delete())
+    db.session.commit()
 
 
 @pytest.fixture
@@ -34,17 +79,18 @@ def runner(app):
 
 
 @pytest.fixture
-def mock_product_client():
+def mock_product_client(app):
     """Mock Product Service client."""
-    with patch('app.services.product_client.product_client') as mock:
-        # Configure default mock responses
-        mock.get_product.return_value = {
-            'id': 'test-product-id',
-            'name': 'Test Product',
-            'type': 'standard',
-            'unit': 'piece',
-            'description': 'Test product description'
-        }
-        mock.validate_product_exists.return_value = True
-        mock.health_check.return_value = True
+    mock = Mock()
+    # Configure default mock responses
+    mock.get_product.return_value = {
+        'id': 'test-product-id',
+        'name': 'Test Product',
+        'type': 'standard',
+        'unit': 'piece',
+        'description': 'Test product description'
+    }
+    mock.validate_product_exists.return_value = True
+    mock.health_check.return_value = True
+    with patch.dict(app.extensions, {'product_client': mock}):
         yield mock
\ No newline at end of file
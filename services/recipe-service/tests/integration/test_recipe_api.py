@@ -3,10 +3,14 @@ import pytest
 import json
 import uuid
 
-from app.models.recipe import Recipe, RecipeIngredient, RecipeStatus, IngredientUnit
+from app.models.recipe import Recipe, RecipeIngredient, RecipeStatus, RecipeVersion, IngredientUnit
 from app.extensions import db
 
 
+# Tables are emptied after each test; needs PostgreSQL via TEST_DATABASE_URL
+pytestmark = pytest.mark.usefixtures('clean_tables')
+
+
 class TestRecipeAPI:
     """Test cases for Recipe API endpoints."""
     
@@ -123,6 +127,27 @@ class TestRecipeAPI:
             assert data['status'] == 'active'
             assert len(data['ingredients']) == 1
     
+    def test_get_recipe_conditional(self, client, app, mock_product_client):
+        """Test getting an unchanged recipe with If-None-Match returns 304."""
+        with app.app_context():
+            db.create_all()
+            
+            recipe = Recipe(
+                product_id=uuid.uuid4(),
+                name="Conditional Recipe",
+                status=RecipeStatus.ACTIVE
+            )
+            db.session.add(recipe)
+            db.session.commit()
+            
+            response = client.get(f'/api/v1/recipes/{recipe.id}')
+            etag = response.headers['ETag']
+            
+            response = client.get(f'/api/v1/recipes/{recipe.id}', headers={'If-None-Match': etag})
+            
+            assert response.status_code == 304
+            assert response.data == b''
+    
     def test_get_recipe_not_found(self, client, app):
         """Test getting nonexistent recipe returns 404."""
         with app.app_context():
@@ -217,6 +242,55 @@ class TestRecipeAPI:
             assert data['status'] == 'active'
             assert data['description'] == 'Updated description'
     
+    def test_update_recipe_ingredients_in_place(self, client, app, mock_product_client):
+        """Test that updating ingredients keeps unchanged products' rows."""
+        with app.app_context():
+            db.create_all()
+            
+            kept_product_id = uuid.uuid4()
+            removed_product_id = uuid.uuid4()
+            added_product_id = uuid.uuid4()
+            
+            recipe = Recipe(
+                product_id=uuid.uuid4(),
+                name="Ingredient Update Recipe",
+                status=RecipeStatus.DRAFT
+            )
+            kept = RecipeIngredient(ingredient_product_id=kept_product_id, quantity=100.0, unit=IngredientUnit.GRAM)
+            recipe.ingredients.append(kept)
+            recipe.ingredients.append(
+                RecipeIngredient(ingredient_product_id=removed_product_id, quantity=50.0, unit=IngredientUnit.GRAM)
+            )
+            db.session.add(recipe)
+            db.session.commit()
+            kept_id = str(kept.id)
+            
+            mock_product_client.validate_products_exist.return_value = {str(added_product_id): True}
+            
+            update_data = {
+                'ingredients': [
+                    {'ingredient_product_id': str(kept_product_id), 'quantity': 150.0, 'unit': 'gram'},
+                    {'ingredient_product_id': str(added_product_id), 'quantity': 10.0, 'unit': 'gram'}
+                ]
+            }
+            
+            response = client.put(
+                f'/api/v1/recipes/{recipe.id}',
+                data=json.dumps(update_data),
+                content_type='application/json'
+            )
+            
+            assert response.status_code == 200
+            ingredients = {
+                ing['ingredient_product_id']: ing for ing in json.loads(response.data)['ingredients']
+            }
+            assert set(ingredients) == {str(kept_product_id), str(added_product_id)}
+            assert ingredients[str(kept_product_id)]['id'] == kept_id
+            assert float(ingredients[str(kept_product_id)]['quantity']) == 150.0
+            
+            # Only the newly added product is validated against the Product Service
+            mock_product_client.validate_products_exist.assert_called_once_with([str(added_product_id)])
+    
     def test_update_recipe_not_found(self, client, app):
         """Test updating nonexistent recipe returns 404."""
         with app.app_context():
@@ -317,6 +391,38 @@ class TestRecipeAPI:
             assert data['pagination']['total'] == 5
             assert data['pagination']['pages'] == 2
     
+    def test_get_recipes_list_with_cursor(self, client, app, mock_product_client):
+        """Test walking the recipe list with keyset cursors."""
+        with app.app_context():
+            db.create_all()
+            
+            for i in range(5):
+                db.session.add(Recipe(
+                    product_id=uuid.uuid4(),
+                    name=f"Recipe {i}",
+                    status=RecipeStatus.ACTIVE
+                ))
+            
+            db.session.commit()
+            
+            response = client.get('/api/v1/recipes/?per_page=2')
+            data = json.loads(response.data)
+            names = [recipe['name'] for recipe in data['recipes']]
+            cursor = data['pagination']['next_cursor']
+            
+            while cursor:
+                response = client.get(f'/api/v1/recipes/?per_page=2&cursor={cursor}')
+                assert response.status_code == 200
+                data = json.loads(response.data)
+                assert data['pagination']['total'] is None
+                names.extend(recipe['name'] for recipe in data['recipes'])
+                cursor = data['pagination']['next_cursor']
+            
+            assert names == [f"Recipe {i}" for i in range(5)]
+            
+            response = client.get('/api/v1/recipes/?cursor=not-a-cursor')
+            assert response.status_code in (400, 422)
+    
     def test_validate_recipe(self, client, app, mock_product_client):
         """Test recipe validation endpoint."""
         with app.app_context():
@@ -431,6 +537,33 @@ class TestRecipeAPI:
             
             assert response.status_code == 400
     
+    def test_export_recipe_hierarchy_not_found(self, client, app):
+        """Test hierarchy export for non-existent recipe."""
+        with app.app_context():
+            db.create_all()
+            
+            fake_id = uuid.uuid4()
+            response = client.get(f'/api/v1/recipes/{fake_id}/hierarchy/export')
+            
+            assert response.status_code == 404
+    
+    def test_get_recipe_hierarchy_invalid_target_quantity(self, client, app):
+        """Test hierarchy with non-positive target quantity."""
+        with app.app_context():
+            db.create_all()
+            
+            recipe = Recipe(
+                product_id=uuid.uuid4(),
+                name="Test Recipe",
+                status=RecipeStatus.ACTIVE
+            )
+            db.session.add(recipe)
+            db.session.commit()
+            
+            response = client.get(f'/api/v1/recipes/{recipe.id}/hierarchy?target_quantity=0')
+            
+            assert response.status_code == 400
+    
     def test_recipe_analysis_success(self, client, app, mock_product_client):
         """Test recipe analysis endpoint."""
         with app.app_context():
@@ -483,6 +616,89 @@ class TestRecipeAPI:
             
             assert response.status_code == 404
     
+    def test_recipe_analysis_async_not_found(self, client, app):
+        """Test async recipe analysis rejects unknown recipes before queueing."""
+        with app.app_context():
+            db.create_all()
+            
+            fake_id = uuid.uuid4()
+            response = client.get(f'/api/v1/recipes/{fake_id}/analysis?async=true')
+            
+            assert response.status_code == 404
+    
+    def test_get_recipe_versions(self, client, app):
+        """Test streaming a recipe's version history."""
+        with app.app_context():
+            db.create_all()
+            
+            recipe = Recipe(
+                product_id=uuid.uuid4(),
+                name='Versioned Recipe',
+                status=RecipeStatus.DRAFT
+            )
+            db.session.add(recipe)
+            db.session.flush()
+            
+            for version_number in (1, 2):
+                db.session.add(RecipeVersion(
+                    recipe_id=recipe.id,
+                    version_number=version_number,
+                    recipe_data={'name': 'Versioned Recipe', 'version': version_number}
+                ))
+            db.session.commit()
+            
+            response = client.get(f'/api/v1/recipes/{recipe.id}/versions')
+            
+            assert response.status_code == 200
+            data = json.loads(response.data)
+            assert [version['version_number'] for version in data] == [2, 1]
+            assert data[0]['recipe_data']['version'] == 2
+    
+    def test_get_recipe_versions_rebuilds_patches(self, client, app):
+        """Test that patch versions are returned as complete snapshots."""
+        with app.app_context():
+            db.create_all()
+            
+            recipe = Recipe(
+                product_id=uuid.uuid4(),
+                name='Patched Recipe',
+                status=RecipeStatus.DRAFT
+            )
+            db.session.add(recipe)
+            db.session.flush()
+            
+            db.session.add(RecipeVersion(
+                recipe_id=recipe.id,
+                version_number=1,
+                recipe_data={'name': 'Patched Recipe', 'version': 1, 'notes': 'first'}
+            ))
+            db.session.add(RecipeVersion(
+                recipe_id=recipe.id,
+                version_number=2,
+                patch=[
+                    {'op': 'replace', 'path': '/version', 'value': 2},
+                    {'op': 'remove', 'path': '/notes'}
+                ]
+            ))
+            db.session.commit()
+            
+            response = client.get(f'/api/v1/recipes/{recipe.id}/versions')
+            
+            assert response.status_code == 200
+            data = json.loads(response.data)
+            assert data[0]['recipe_data'] == {'name': 'Patched Recipe', 'version': 2}
+            assert data[1]['recipe_data'] == {'name': 'Patched Recipe', 'version': 1, 'notes': 'first'}
+    
+    def test_get_recipe_versions_not_found(self, client, app):
+        """Test version history for non-existent recipe."""
+        with app.app_context():
+            db.create_all()
+            
+            fake_id = uuid.uuid4()
+            response = client.get(f'/api/v1/recipes/{fake_id}/versions')
+            
+            assert response.status_code == 404
+    
     def test_recipes_by_product_success(self, client, app, mock_product_client):
         """Test getting recipes that use a specific product."""
         with app.app_context():
@@ -638,6 +854,24 @@ class TestRecipeAPI:
             data = json.loads(response.data)
             assert len(data['ingredients']) == 0
     
+    def test_recipe_ingredient_not_found(self, client, app):
+        """Test updating and deleting a non-existent recipe ingredient."""
+        with app.app_context():
+            db.create_all()
+            
+            recipe_id = uuid.uuid4()
+            ingredient_id = uuid.uuid4()
+            
+            response = client.put(
+                f'/api/v1/recipes/{recipe_id}/ingredients/{ingredient_id}',
+                data=json.dumps({'quantity': 150.0}),
+                content_type='application/json'
+            )
+            assert response.status_code == 404
+            
+            response = client.delete(f'/api/v1/recipes/{recipe_id}/ingredients/{ingredient_id}')
+            assert response.status_code == 404
+    
     def test_recipe_validation_edge_cases(self, client, app, mock_product_client):
         """Test recipe validation with edge cases."""
         with app.app_context():
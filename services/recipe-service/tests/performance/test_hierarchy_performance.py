@@ -10,6 +10,10 @@ from app.services.recipe_repository import RecipeRepository
 from app.extensions import db
 
 
+# Tables are emptied after each test; needs PostgreSQL via TEST_DATABASE_URL
+pytestmark = pytest.mark.usefixtures('clean_tables')
+
+
 class TestHierarchyPerformance:
     """Performance test cases for recipe hierarchy operations."""
     
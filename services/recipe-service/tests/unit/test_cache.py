@@ -0,0 +1,68 @@
+"""Unit tests for the recipe response cache."""
+import uuid
+from unittest.mock import Mock, patch
+
+import pytest
+from redis.exceptions import RedisError
+
+from app.utils.cache import (
+    GENERATION_KEY, invalidate_recipe, recipe_by_product_key, recipe_hierarchy_key, recipe_key,
+    recipes_using_product_key
+)
+
+
+@pytest.fixture
+def redis_conn(app):
+    """Mocked Redis connection holding the generation counter, with the cache enabled."""
+    store = {}
+    conn = Mock()
+    conn.get.side_effect = store.get
+    pipe = conn.pipeline.return_value
+    pipe.incr.side_effect = lambda key: store.__setitem__(key, store.get(key, 0) + 1)
+    
+    with patch.dict(app.config, {'RECIPE_CACHE_ENABLED': True}), \
+            patch('app.utils.cache.get_redis_connection', return_value=conn):
+        yield conn
+
+
+class TestCacheInvalidation:
+    """Test cases for generation-based invalidation of derived entries."""
+    
+    def test_keys_carry_generation(self, redis_conn):
+        """Test derived keys embed the current generation counter."""
+        recipe_id = uuid.uuid4()
+        product_id = uuid.uuid4()
+        
+        assert recipe_hierarchy_key(recipe_id, 5, True) == f'recipe:hierarchy:g0:{recipe_id}:5:True'
+        assert recipes_using_product_key(product_id) == f'recipe:using-product:g0:{product_id}'
+    
+    def test_invalidate_recipe_bumps_generation(self, redis_conn):
+        """Test a recipe write deletes its own keys and moves derived keys to a new generation."""
+        recipe_id = uuid.uuid4()
+        product_id = uuid.uuid4()
+        hierarchy_before = recipe_hierarchy_key(recipe_id, 5)
+        using_before = recipes_using_product_key(product_id)
+        
+        invalidate_recipe(recipe_id, product_id)
+        
+        pipe = redis_conn.pipeline.return_value
+        pipe.delete.assert_called_once_with(recipe_key(recipe_id), recipe_by_product_key(product_id))
+        pipe.incr.assert_called_once_with(GENERATION_KEY)
+        pipe.execute.assert_called_once()
+        redis_conn.scan_iter.assert_not_called()
+        assert recipe_hierarchy_key(recipe_id, 5) != hierarchy_before
+        assert recipes_using_product_key(product_id) != using_before
+        assert recipe_hierarchy_key(recipe_id, 5).startswith('recipe:hierarchy:g1:')
+    
+    def test_generation_read_failure_falls_back(self, redis_conn):
+        """Test an unreachable Redis still yields a usable key."""
+        recipe_id = uuid.uuid4()
+        redis_conn.get.side_effect = RedisError('down')
+        
+        assert recipe_hierarchy_key(recipe_id, 5) == f'recipe:hierarchy:g0:{recipe_id}:5'
+    
+    def test_invalidate_failure_is_logged(self, redis_conn):
+        """Test a Redis error during invalidation does not propagate."""
+        redis_conn.pipeline.return_value.execute.side_effect = RedisError('down')
+        
+        invalidate_recipe(uuid.uuid4())
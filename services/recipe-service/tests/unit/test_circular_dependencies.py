@@ -8,6 +8,10 @@ from app.extensions import db
 from app.utils.exceptions import CircularDependencyError
 
 
+# Tables are emptied after each test; needs PostgreSQL via TEST_DATABASE_URL
+pytestmark = pytest.mark.usefixtures('clean_tables')
+
+
 class TestCircularDependencyPrevention:
     """Test cases for circular dependency prevention."""
     
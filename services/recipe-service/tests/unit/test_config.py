@@ -0,0 +1,30 @@
+"""Unit tests for the testing configuration."""
+import pytest
+from sqlalchemy import text
+
+from app.extensions import db
+
+
+class TestTestingDatabase:
+    """Test cases for the in-memory SQLite test database."""
+    
+    def test_sqlite_pragmas_applied(self, app):
+        """Test the fast PRAGMAs are set on the connection StaticPool keeps."""
+        if db.engine.dialect.name != 'sqlite':
+            pytest.skip('Only applies to the in-memory SQLite database')
+        
+        with db.engine.connect() as connection:
+            assert connection.execute(text('PRAGMA journal_mode')).scalar() == 'memory'
+            assert connection.execute(text('PRAGMA synchronous')).scalar() == 0  # OFF
+            assert connection.execute(text('PRAGMA temp_store')).scalar() == 2  # MEMORY
+    
+    def test_sqlite_connection_shared(self, app):
+        """Test every checkout gets the same connection, so the database survives."""
+        if db.engine.dialect.name != 'sqlite':
+            pytest.skip('Only applies to the in-memory SQLite database')
+        
+        with db.engine.connect() as first:
+            first.execute(text('CREATE TEMP TABLE pool_probe (id INTEGER)'))
+        with db.engine.connect() as second:
+            assert second.execute(text('SELECT count(*) FROM pool_probe')).scalar() == 0
+            second.execute(text('DROP TABLE pool_probe'))
@@ -0,0 +1,37 @@
+"""Unit tests for the API error handlers."""
+import json
+import uuid
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db
+from app.models.recipe import Recipe, RecipeStatus
+from app.utils.exceptions import handle_integrity_error
+
+
+# Tables are emptied after each test; needs PostgreSQL via TEST_DATABASE_URL
+pytestmark = pytest.mark.usefixtures('clean_tables')
+
+
+class TestIntegrityErrorHandler:
+    """Test cases for database integrity error responses."""
+    
+    def test_duplicate_product_version_returns_product_conflict(self, app):
+        """Test a real unique violation on (product_id, version) maps to the recipe conflict."""
+        with app.app_context():
+            product_id = uuid.uuid4()
+            db.session.add(Recipe(product_id=product_id, name="First", status=RecipeStatus.DRAFT))
+            db.session.commit()
+            
+            db.session.add(Recipe(product_id=product_id, name="Second", status=RecipeStatus.DRAFT))
+            with pytest.raises(IntegrityError) as exc_info:
+                db.session.commit()
+            db.session.rollback()
+            
+            response = handle_integrity_error(exc_info.value)
+            body = json.loads(response.get_data())
+            
+            assert response.status_code == 409
+            assert body['error'] == 'Recipe for this product already exists'
+            assert body['details']['field'] == 'product_id'
@@ -1,5 +1,6 @@
 """Unit tests for health check endpoint."""
-import pytest
+from unittest.mock import Mock, patch
+
 from flask import json
 
 
@@ -15,10 +16,21 @@ def test_health_endpoint_success(client, mock_product_client):
     assert 'dependencies' in data
 
 
-def test_health_endpoint_product_service_down(client):
+def test_health_endpoint_deep_check(client, mock_product_client):
+    """Test deep health check queries the database."""
+    response = client.get('/health?deep=1')
+    
+    assert response.status_code == 200
+    
+    data = json.loads(response.data)
+    assert data['dependencies']['database'] == 'connected'
+
+
+def test_health_endpoint_product_service_down(app, client):
     """Test health check when Product Service is down."""
-    with pytest.mock.patch('app.services.product_client.product_client') as mock_client:
-        mock_client.health_check.return_value = False
+    mock_client = Mock()
+    mock_client.health_check.return_value = False
+    with patch.dict(app.extensions, {'product_client': mock_client}):
         
         response = client.get('/health')
         
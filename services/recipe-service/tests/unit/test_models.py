@@ -3,6 +3,7 @@ import pytest
 import uuid
 from datetime import datetime
 from decimal import Decimal
+from sqlalchemy.exc import IntegrityError
 
 from app.models.recipe import (
     Recipe, RecipeIngredient, RecipeVersion, RecipeDependency, 
@@ -12,6 +13,10 @@ from app.models.recipe import (
 from app.extensions import db
 
 
+# Tables are emptied after each test; needs PostgreSQL via TEST_DATABASE_URL
+pytestmark = pytest.mark.usefixtures('clean_tables')
+
+
 class TestRecipeModel:
     """Test cases for Recipe model."""
     
@@ -79,35 +84,25 @@ class TestRecipeModel:
             recipe = Recipe(product_id=uuid.uuid4(), name="  Test Recipe  ")
             assert recipe.name == "Test Recipe"
     
-    def test_recipe_version_validation(self, app):
-        """Test recipe version validation."""
-        with app.app_context():
-            # Test negative version
-            with pytest.raises(ValueError, match="Recipe version must be positive"):
-                Recipe(product_id=uuid.uuid4(), name="Test", version=0)
-            
-            with pytest.raises(ValueError, match="Recipe version must be positive"):
-                Recipe(product_id=uuid.uuid4(), name="Test", version=-1)
-    
-    def test_recipe_yield_quantity_validation(self, app):
-        """Test recipe yield quantity validation."""
+    @pytest.mark.parametrize('field, value', [
+        ('version', 0),
+        ('version', -1),
+        ('yield_quantity', Decimal('-1.0')),
+        ('yield_quantity', Decimal('0.0')),
+        ('preparation_time', -1),
+        ('preparation_time', 0),
+    ])
+    def test_recipe_value_constraints(self, app, field, value):
+        """Test recipe value rules are enforced by check constraints."""
         with app.app_context():
-            # Test negative yield quantity
-            with pytest.raises(ValueError, match="Yield quantity must be positive"):
-                Recipe(product_id=uuid.uuid4(), name="Test", yield_quantity=Decimal('-1.0'))
+            db.create_all()
             
-            with pytest.raises(ValueError, match="Yield quantity must be positive"):
-                Recipe(product_id=uuid.uuid4(), name="Test", yield_quantity=Decimal('0.0'))
-    
-    def test_recipe_preparation_time_validation(self, app):
-        """Test recipe preparation time validation."""
-        with app.app_context():
-            # Test negative preparation time
-            with pytest.raises(ValueError, match="Preparation time must be positive"):
-                Recipe(product_id=uuid.uuid4(), name="Test", preparation_time=-1)
+            recipe = Recipe(product_id=uuid.uuid4(), name="Test", **{field: value})
+            db.session.add(recipe)
             
-            with pytest.raises(ValueError, match="Preparation time must be positive"):
-                Recipe(product_id=uuid.uuid4(), name="Test", preparation_time=0)
+            with pytest.raises(IntegrityError):
+                db.session.commit()
+            db.session.rollback()
     
     def test_recipe_to_dict(self, app):
         """Test recipe to_dict method."""
@@ -190,39 +185,32 @@ class TestRecipeIngredientModel:
             assert ingredient.is_optional is True
             assert ingredient.substitute_ingredients == ['alt1', 'alt2']
     
-    def test_ingredient_quantity_validation(self, app):
-        """Test ingredient quantity validation."""
+    @pytest.mark.parametrize('field, value', [
+        ('quantity', Decimal('-1.0')),
+        ('quantity', Decimal('0.0')),
+        ('sort_order', -1),
+    ])
+    def test_ingredient_value_constraints(self, app, field, value):
+        """Test ingredient value rules are enforced by check constraints."""
         with app.app_context():
-            # Test negative quantity
-            with pytest.raises(ValueError, match="Ingredient quantity must be positive"):
-                RecipeIngredient(
-                    recipe_id=uuid.uuid4(),
-                    ingredient_product_id=uuid.uuid4(),
-                    quantity=Decimal('-1.0'),
-                    unit=IngredientUnit.GRAM
-                )
+            db.create_all()
             
-            # Test zero quantity
-            with pytest.raises(ValueError, match="Ingredient quantity must be positive"):
-                RecipeIngredient(
-                    recipe_id=uuid.uuid4(),
-                    ingredient_product_id=uuid.uuid4(),
-                    quantity=Decimal('0.0'),
-                    unit=IngredientUnit.GRAM
-                )
-    
-    def test_ingredient_sort_order_validation(self, app):
-        """Test ingredient sort order validation."""
-        with app.app_context():
-            # Test negative sort order
-            with pytest.raises(ValueError, match="Sort order must be non-negative"):
-                RecipeIngredient(
-                    recipe_id=uuid.uuid4(),
-                    ingredient_product_id=uuid.uuid4(),
-                    quantity=Decimal('100.0'),
-                    unit=IngredientUnit.GRAM,
-                    sort_order=-1
-                )
+            recipe = Recipe(product_id=uuid.uuid4(), name="Test Recipe")
+            db.session.add(recipe)
+            db.session.flush()
+            
+            values = {'quantity': Decimal('100.0'), 'sort_order': 0, field: value}
+            ingredient = RecipeIngredient(
+                recipe_id=recipe.id,
+                ingredient_product_id=uuid.uuid4(),
+                unit=IngredientUnit.GRAM,
+                **values
+            )
+            db.session.add(ingredient)
+            
+            with pytest.raises(IntegrityError):
+                db.session.commit()
+            db.session.rollback()
     
     def test_ingredient_to_dict(self, app):
         """Test ingredient to_dict method."""
@@ -247,6 +235,35 @@ class TestRecipeIngredientModel:
             assert 'id' in result
             assert 'recipe_id' in result
             assert 'ingredient_product_id' in result
+    
+    def test_ingredient_bulk_create(self, app):
+        """Test inserting several ingredients in one statement."""
+        with app.app_context():
+            recipe = Recipe(product_id=uuid.uuid4(), name="Bulk Recipe")
+            db.session.add(recipe)
+            db.session.flush()
+            
+            RecipeIngredient.bulk_create(db.session, recipe.id, [
+                {
+                    'ingredient_product_id': uuid.uuid4(),
+                    'quantity': Decimal('100.0'),
+                    'unit': IngredientUnit.GRAM,
+                    'sort_order': 0
+                },
+                {
+                    'ingredient_product_id': uuid.uuid4(),
+                    'quantity': Decimal('2'),
+                    'unit': IngredientUnit.PIECE,
+                    'sort_order': 1,
+                    'is_optional': True
+                }
+            ])
+            db.session.expire(recipe, ['ingredients'])
+            
+            assert len(recipe.ingredients) == 2
+            assert recipe.ingredients[0].unit == IngredientUnit.GRAM
+            assert recipe.ingredients[1].is_optional is True
+            assert all(ing.id is not None for ing in recipe.ingredients)
 
 
 class TestRecipeTagModel:
@@ -0,0 +1,228 @@
+"""Unit tests for the Product Service client."""
+import json
+import threading
+import uuid
+
+import httpx
+import pytest
+import requests
+import responses
+from flask import g
+
+from app.services.product_client import BATCH_SIZE, ProductClient, ProductServiceError
+
+
+BASE_URL = 'http://product-service'
+EXISTS_URL = f'{BASE_URL}/api/v1/products/exists'
+BATCH_URL = f'{BASE_URL}/api/v1/products/batch'
+
+
+def _ids(count):
+    return [str(uuid.uuid4()) for _ in range(count)]
+
+
+def _exists_callback(request):
+    """Report every requested product as existing."""
+    ids = json.loads(request.body)['ids']
+    return 200, {}, json.dumps({'exists': {product_id: True for product_id in ids}})
+
+
+@pytest.fixture
+def product_client(app):
+    """Client against a stubbed Product Service, with a fresh request cache."""
+    with app.app_context():
+        yield ProductClient(base_url=BASE_URL, timeout=5)
+
+
+class TestExistsBatch:
+    """Test cases for bulk product existence checks."""
+    
+    @responses.activate
+    def test_chunks_at_batch_size(self, product_client):
+        """Test IDs are sent to the exists endpoint in chunks of BATCH_SIZE."""
+        product_ids = _ids(BATCH_SIZE + 1)
+        responses.add_callback(responses.POST, EXISTS_URL, callback=_exists_callback)
+        
+        result = product_client.exists_batch(product_ids)
+        
+        assert result == dict.fromkeys(product_ids, True)
+        sent = [json.loads(call.request.body)['ids'] for call in responses.calls]
+        assert [len(chunk) for chunk in sent] == [BATCH_SIZE, 1]
+        assert sent[0] + sent[1] == product_ids
+    
+    @responses.activate
+    def test_missing_ids_reported_false(self, product_client):
+        """Test IDs left out of the exists response count as not found."""
+        found_id, missing_id = _ids(2)
+        responses.add(responses.POST, EXISTS_URL, json={'exists': {found_id: True}})
+        
+        assert product_client.exists_batch([found_id, missing_id]) == {found_id: True, missing_id: False}
+    
+    @pytest.mark.parametrize('status_code', [404, 405])
+    @responses.activate
+    def test_falls_back_when_endpoint_unavailable(self, product_client, status_code):
+        """Test a 404/405 disables the exists endpoint for good and fetches the products instead."""
+        found_id, missing_id = _ids(2)
+        responses.add(responses.POST, EXISTS_URL, status=status_code)
+        responses.add(responses.POST, BATCH_URL, json={'products': [{'id': found_id, 'name': 'Flour'}]})
+        
+        assert product_client.exists_batch([found_id, missing_id]) == {found_id: True, missing_id: False}
+        assert product_client._exists_endpoint_available is False
+        
+        # Later checks go straight to the batch endpoint
+        other_id = _ids(1)[0]
+        product_client.exists_batch([other_id])
+        called = [call.request.url for call in responses.calls]
+        assert called == [EXISTS_URL, BATCH_URL, BATCH_URL]
+    
+    @responses.activate
+    def test_chunk_error_maps_to_product_service_error(self, product_client):
+        """Test a failing chunk maps its IDs to ProductServiceError and leaves other chunks intact."""
+        product_ids = _ids(BATCH_SIZE + 1)
+        responses.add_callback(responses.POST, EXISTS_URL, callback=_exists_callback)
+        responses.add(responses.POST, EXISTS_URL, status=503)
+        
+        results = product_client._check_exists_bulk(product_ids)
+        
+        assert all(results[product_id] is True for product_id in product_ids[:BATCH_SIZE])
+        error = results[product_ids[-1]]
+        assert isinstance(error, ProductServiceError)
+        assert error.status_code == 503
+        assert product_client._exists_endpoint_available is True
+    
+    @responses.activate
+    def test_connection_error_maps_to_product_service_error(self, product_client):
+        """Test a transport failure is reported per product, without a status code."""
+        product_id = _ids(1)[0]
+        responses.add(responses.POST, EXISTS_URL, body=requests.exceptions.ConnectionError('refused'))
+        
+        results = product_client._check_exists_bulk([product_id])
+        
+        assert isinstance(results[product_id], ProductServiceError)
+        assert results[product_id].status_code is None
+    
+    @responses.activate
+    def test_exists_batch_raises_on_error(self, product_client):
+        """Test exists_batch raises the error while validate_products_exist reports False."""
+        product_id = _ids(1)[0]
+        responses.add(responses.POST, EXISTS_URL, status=500)
+        
+        with pytest.raises(ProductServiceError) as exc_info:
+            product_client.exists_batch([product_id])
+        assert exc_info.value.status_code == 500
+        
+        assert product_client.validate_products_exist([product_id]) == {product_id: False}
+    
+    @responses.activate
+    def test_request_cache_answers_without_http(self, product_client):
+        """Test products looked up earlier in the request are answered from g, None meaning not found."""
+        found_id, missing_id = _ids(2)
+        g.product_cache = {found_id: {'id': found_id}, missing_id: None}
+        
+        assert product_client.exists_batch([found_id, missing_id]) == {found_id: True, missing_id: False}
+        assert len(responses.calls) == 0
+    
+    @responses.activate
+    def test_ttl_cache_answers_without_http(self, product_client):
+        """Test products in the in-process cache are not checked again."""
+        cached_id, other_id = _ids(2)
+        product_client._set_cached(cached_id, {'id': cached_id})
+        responses.add_callback(responses.POST, EXISTS_URL, callback=_exists_callback)
+        
+        assert product_client.exists_batch([cached_id, other_id]) == {cached_id: True, other_id: True}
+        assert json.loads(responses.calls[0].request.body)['ids'] == [other_id]
+
+
+
+class TestFetchProducts:
+    """Test cases for bulk product fetches."""
+    
+    @responses.activate
+    def test_missing_products_become_none(self, product_client):
+        """Test products left out of the batch response map to None and only found ones are cached."""
+        found_id, missing_id = _ids(2)
+        product = {'id': found_id, 'name': 'Flour'}
+        responses.add(responses.POST, BATCH_URL, json={'products': [product]})
+        
+        assert product_client._fetch_products([found_id, missing_id]) == {found_id: product, missing_id: None}
+        assert product_client._get_cached(found_id) == product
+        assert product_client._get_cached(missing_id) is None
+        assert g.product_cache == {found_id: product, missing_id: None}
+    
+    @responses.activate
+    def test_get_products_batch_skips_missing(self, product_client):
+        """Test get_products_batch returns found products only."""
+        found_id, missing_id = _ids(2)
+        product = {'id': found_id, 'name': 'Flour'}
+        responses.add(responses.POST, BATCH_URL, json={'products': [product]})
+        
+        assert product_client.get_products_batch([found_id, missing_id]) == {found_id: product}
+    
+    @responses.activate
+    def test_not_found_invalidates_ttl_cache(self, product_client):
+        """Test a product reported missing is dropped from the TTL cache even if cached meanwhile."""
+        product_id = _ids(1)[0]
+        
+        def batch_callback(request):
+            # Another request caches the product while this fetch is in flight
+            product_client._set_cached(product_id, {'id': product_id, 'name': 'Stale'})
+            return 200, {}, json.dumps({'products': []})
+        
+        responses.add_callback(responses.POST, BATCH_URL, callback=batch_callback)
+        
+        assert product_client._fetch_products([product_id]) == {product_id: None}
+        assert product_client._get_cached(product_id) is None
+    
+    @responses.activate
+    def test_chunk_error_not_cached(self, product_client):
+        """Test failed chunks map to ProductServiceError and stay out of both caches."""
+        product_ids = _ids(BATCH_SIZE + 1)
+        responses.add(responses.POST, BATCH_URL, json={'products': []})
+        responses.add(responses.POST, BATCH_URL, status=502)
+        
+        results = product_client._fetch_products(product_ids)
+        
+        assert all(results[product_id] is None for product_id in product_ids[:BATCH_SIZE])
+        assert isinstance(results[product_ids[-1]], ProductServiceError)
+        assert results[product_ids[-1]].status_code == 502
+        assert product_ids[-1] not in g.product_cache
+    
+    @pytest.mark.parametrize('status_code', [404, 405])
+    @responses.activate
+    def test_falls_back_to_concurrent_gets(self, product_client, status_code):
+        """Test an unavailable batch endpoint falls back to per-product GETs on the event loop thread."""
+        found_id, missing_id, failing_id = _ids(3)
+        product = {'id': found_id, 'name': 'Flour'}
+        responses.add(responses.POST, BATCH_URL, status=status_code)
+        
+        threads = set()
+        requested = []
+        
+        def handler(request):
+            threads.add(threading.current_thread().name)
+            product_id = request.url.path.rsplit('/', 1)[-1]
+            requested.append(product_id)
+            if product_id == found_id:
+                return httpx.Response(200, json=product)
+            if product_id == missing_id:
+                return httpx.Response(404)
+            return httpx.Response(500)
+        
+        product_client._aclient = httpx.AsyncClient(base_url=BASE_URL, transport=httpx.MockTransport(handler))
+        try:
+            results = product_client._fetch_products([found_id, missing_id, failing_id])
+            
+            assert results[found_id] == product
+            assert results[missing_id] is None
+            assert isinstance(results[failing_id], ProductServiceError)
+            assert results[failing_id].status_code == 500
+            assert sorted(requested) == sorted([found_id, missing_id, failing_id])
+            assert threads == {'product-client-loop'}
+            assert product_client._batch_endpoint_available is False
+            assert product_client._get_cached(found_id) == product
+            
+            # Later fetches skip the batch endpoint
+            product_client._fetch_products([failing_id])
+            assert len(responses.calls) == 1
+        finally:
+            product_client._loop.call_soon_threadsafe(product_client._loop.stop)
@@ -5,7 +5,7 @@ from decimal import Decimal
 from unittest.mock import Mock, patch
 
 from app.services.recipe_repository import RecipeRepository, RecipeIngredientRepository, RecipeTagRepository
-from app.models.recipe import Recipe, RecipeIngredient, RecipeTag, RecipeStatus, IngredientUnit
+from app.models.recipe import Recipe, RecipeIngredient, RecipeTag, RecipeStatus, RecipeVersion, IngredientUnit
 from app.extensions import db
 from app.utils.exceptions import (
     RecipeNotFoundError, RecipeValidationError, CircularDependencyError,
@@ -13,6 +13,10 @@ from app.utils.exceptions import (
 )
 
 
+# Tables are emptied after each test; needs PostgreSQL via TEST_DATABASE_URL
+pytestmark = pytest.mark.usefixtures('clean_tables')
+
+
 class TestRecipeRepository:
     """Test cases for RecipeRepository."""
     
@@ -184,6 +188,38 @@ class TestRecipeRepository:
             assert recipes[0].status == RecipeStatus.ACTIVE
             assert pagination['total'] == 1
     
+    def test_get_all_as_dicts(self, app, repository):
+        """Test getting list rows as dictionaries with ingredient counts."""
+        with app.app_context():
+            db.create_all()
+            
+            recipe = Recipe(
+                product_id=uuid.uuid4(),
+                name="Dict Recipe",
+                status=RecipeStatus.ACTIVE,
+                yield_quantity=Decimal('250.0'),
+                yield_unit=IngredientUnit.GRAM
+            )
+            recipe.ingredients.append(RecipeIngredient(
+                ingredient_product_id=uuid.uuid4(),
+                quantity=Decimal('100.0'),
+                unit=IngredientUnit.GRAM
+            ))
+            db.session.add(recipe)
+            db.session.commit()
+            
+            recipes, pagination = repository.get_all_as_dicts(page=1, per_page=10)
+            
+            assert len(recipes) == 1
+            assert recipes[0]['id'] == recipe.id
+            assert recipes[0]['status'] == 'active'
+            assert recipes[0]['yield_quantity'] == 250.0
+            assert recipes[0]['yield_unit'] == 'gram'
+            assert recipes[0]['ingredients_count'] == 1
+            assert pagination['total'] == 1
+            assert pagination['pages'] == 1
+            assert pagination['has_next'] is False
+    
     @patch('app.services.recipe_repository.product_client')
     def test_create_recipe_success(self, mock_product_client, app, repository, sample_recipe_data):
         """Test creating a recipe successfully."""
@@ -277,6 +313,57 @@ class TestRecipeRepository:
             assert updated_recipe.description == "Updated description"
             assert updated_recipe.status == RecipeStatus.ACTIVE
     
+    def test_update_recipe_writes_version_in_transaction(self, app, repository):
+        """Test a versioned update commits its snapshot with the recipe."""
+        with app.app_context():
+            recipe = Recipe(
+                product_id=uuid.uuid4(),
+                name="Versioned",
+                status=RecipeStatus.DRAFT
+            )
+            recipe.ingredients.append(RecipeIngredient(
+                ingredient_product_id=uuid.uuid4(),
+                quantity=Decimal('100.0'),
+                unit=IngredientUnit.GRAM
+            ))
+            db.session.add(recipe)
+            db.session.commit()
+            recipe_id = recipe.id
+            
+            repository.update(recipe_id, {'yield_quantity': Decimal('750.000')})
+            db.session.remove()
+            
+            versions = db.session.query(RecipeVersion).filter_by(recipe_id=recipe_id).all()
+            assert [version.version_number for version in versions] == [2]
+            assert versions[0].recipe_data['yield_quantity'] == '750.000'
+    
+    def test_update_recipe_rolled_back_when_version_fails(self, app, repository):
+        """Test a failed version snapshot leaves the recipe unchanged."""
+        with app.app_context():
+            recipe = Recipe(
+                product_id=uuid.uuid4(),
+                name="Versioned",
+                status=RecipeStatus.DRAFT
+            )
+            recipe.ingredients.append(RecipeIngredient(
+                ingredient_product_id=uuid.uuid4(),
+                quantity=Decimal('100.0'),
+                unit=IngredientUnit.GRAM
+            ))
+            db.session.add(recipe)
+            db.session.commit()
+            recipe_id = recipe.id
+            
+            with patch.object(RecipeRepository, '_create_version_snapshot',
+                              side_effect=RuntimeError("version write failed")):
+                with pytest.raises(RuntimeError):
+                    repository.update(recipe_id, {'yield_quantity': Decimal('750.000')})
+            db.session.remove()
+            
+            stored = db.session.get(Recipe, recipe_id)
+            assert stored.version == 1
+            assert stored.yield_quantity is None
+    
     def test_update_recipe_not_found(self, app, repository):
         """Test updating a non-existent recipe."""
         with app.app_context():
@@ -386,6 +473,16 @@ class TestRecipeRepository:
                 assert validation_result['is_valid'] is True
                 assert validation_result['validation_errors'] == []
     
+    def test_validate_recipe_not_found(self, app, repository):
+        """Test validating a nonexistent recipe returns None."""
+        with app.app_context():
+            db.create_all()
+            
+            with patch.object(repository.session, 'execute') as mock_execute:
+                mock_execute.return_value.first.return_value = None
+                
+                assert repository.validate_recipe(uuid.uuid4()) is None
+    
     def test_get_recipe_dependencies(self, app, repository):
         """Test getting recipe dependencies."""
         with app.app_context():
@@ -432,7 +529,8 @@ class TestRecipeRepository:
             recipes = repository.get_recipes_using_product(product_id)
             
             assert len(recipes) == 1
-            assert recipes[0].id == recipe.id
+            assert recipes[0][0].id == recipe.id
+            assert recipes[0][1].id == ingredient.id
     
     def test_get_recipe_complexity_metrics(self, app, repository):
         """Test getting recipe complexity metrics."""
@@ -462,10 +560,10 @@ class TestRecipeRepository:
             db.session.commit()
             
             # Mock hierarchy function
-            with patch.object(repository, 'get_recipe_hierarchy') as mock_hierarchy:
-                mock_hierarchy.return_value = [
+            with patch.object(repository, 'iter_recipe_hierarchy') as mock_hierarchy:
+                mock_hierarchy.return_value = iter([
                     {'depth_level': 1}, {'depth_level': 1}, {'depth_level': 2}
-                ]
+                ])
                 
                 metrics = repository.get_recipe_complexity_metrics(recipe.id)
                 
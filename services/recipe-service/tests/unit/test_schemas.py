@@ -0,0 +1,75 @@
+"""Unit tests for recipe API schemas."""
+import copy
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from app.schemas.recipe import (
+    RECIPE_RESPONSE, RECIPE_LIST, RECIPE_CREATE, RECIPE_UPDATE,
+    RECIPE_HIERARCHY, RECIPE_VALIDATION, RecipeResponseSchema, dump_recipe
+)
+
+
+class TestSharedSchemas:
+    """Test cases for the module-level schema instances."""
+    
+    def test_shared_instances_can_be_deep_copied(self):
+        """Test flask-smorest can deep-copy every instance it is given."""
+        for schema in (RECIPE_RESPONSE, RECIPE_LIST, RECIPE_CREATE,
+                       RECIPE_UPDATE, RECIPE_HIERARCHY, RECIPE_VALIDATION):
+            assert copy.deepcopy(schema).fields.keys() == schema.fields.keys()
+    
+    def test_shared_instances_registered_once(self, app):
+        """Test each shared schema is documented as a single component."""
+        api = app.extensions['flask-smorest']['apis']['']['ext_obj']
+        with app.app_context():
+            spec = api.spec.to_dict()
+        
+        components = spec['components']['schemas']
+        assert 'RecipeResponse' in components
+        assert not any(name.startswith('RecipeResponse') and name[-1].isdigit()
+                       for name in components)
+        
+        collection = spec['paths']['/api/v1/recipes/']
+        assert collection['post']['responses']['201']['content']['application/json']['schema'] == {
+            '$ref': '#/components/schemas/RecipeResponse'
+        }
+    
+    def test_dump_recipe_matches_plain_schema(self):
+        """Test the JIT-compiled dump gives the same output as marshmallow."""
+        now = datetime.now(timezone.utc)
+        recipe_id = uuid.uuid4()
+        data = {
+            'id': recipe_id,
+            'product_id': uuid.uuid4(),
+            'name': 'Test Recipe',
+            'description': None,
+            'version': 1,
+            'status': 'draft',
+            'yield_quantity': Decimal('500.000'),
+            'yield_unit': 'gram',
+            'preparation_time': 30,
+            'notes': None,
+            'created_at': now,
+            'updated_at': now,
+            'created_by': None,
+            'updated_by': None,
+            'ingredients': [{
+                'id': uuid.uuid4(),
+                'recipe_id': recipe_id,
+                'ingredient_product_id': uuid.uuid4(),
+                'quantity': Decimal('2.500'),
+                'unit': 'piece',
+                'sort_order': 0,
+                'ingredient_group': None,
+                'notes': None,
+                'is_optional': False,
+                'substitute_ingredients': None,
+                'created_at': now,
+                'updated_at': now
+            }],
+            'tags': [],
+            'nutrition': None
+        }
+        
+        assert dump_recipe(data) == RecipeResponseSchema().dump(data)